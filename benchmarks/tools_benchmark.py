@@ -0,0 +1,249 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from benchmarks.tools_ordergen import DEFAULT_MATCH_ID, OrderGenerator
+from common.tools_registry import play_match_from_file
+from ruleset_core.class_instrumentation import Instrumentation
+
+
+# Phases of MatchData.process_match_turn(), as named in instrumentation timings
+PHASES = ('startup', 'cast', 'attack', 'cleanup')
+
+DEFAULT_SCENARIOS: list[dict] = [
+    {'name': 'warlocks_duel', 'spellbook': 'Warlocks', 'players': 2, 'teams': 0, 'matches': 10,
+     'turns': 60, 'spell_density': 0.6, 'monster_limit': 4, 'aggression': 0.3},
+    {'name': 'warlocks_melee', 'spellbook': 'Warlocks', 'players': 6, 'teams': 0, 'matches': 5,
+     'turns': 60, 'spell_density': 0.6, 'monster_limit': 8, 'aggression': 0.3},
+    {'name': 'warlocks_teams', 'spellbook': 'Warlocks', 'players': 8, 'teams': 2, 'matches': 5,
+     'turns': 60, 'spell_density': 0.8, 'monster_limit': 12, 'aggression': 0.5},
+    {'name': 'spellbinder_duel', 'spellbook': 'Spellbinder', 'players': 2, 'teams': 0, 'matches': 10,
+     'turns': 60, 'spell_density': 0.6, 'monster_limit': 4, 'aggression': 0.3},
+    {'name': 'spellbinder_melee', 'spellbook': 'Spellbinder', 'players': 6, 'teams': 3, 'matches': 5,
+     'turns': 60, 'spell_density': 0.8, 'monster_limit': 8, 'aggression': 0.5},
+]
+
+
+def render_match(match_data: object, spellbook_code: str, lang_code: str='en') -> int:
+    """Render logs and statuses of a finished match for all POVs.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        spellbook_code (str): spellbook code, f.e. "Warlocks"
+        lang_code (str, optional): language code
+
+    Returns:
+        int: number of rendered lines
+    """
+    match_data.match_init_output(spellbook_code, lang_code)
+    lines = 0
+    for pov_id in [-1, 0] + [p.id for p in match_data.participant_list]:
+        lines += len(match_data.print_match_log(pov_id, stay_silent=True))
+        lines += len(match_data.print_actor_statuses(pov_id, stay_silent=True))
+    return lines
+
+
+def run_scenario(scenario: dict, seed: int=0, repeat: int=3, workdir: str='') -> dict:
+    """Generate orders for a scenario and measure the engine on them.
+
+    A scenario is a set of matches with the same settings and consecutive seeds. Every match is timed
+    repeat times and the best run is counted. Peak memory is measured in a separate run of every match
+    with tracemalloc, since tracing slows the engine down, and the largest peak is reported.
+
+    Arguments:
+        scenario (dict): scenario settings (see DEFAULT_SCENARIOS)
+        seed (int, optional): random seed for the order generator of the first match
+        repeat (int, optional): number of timed runs per match
+        workdir (str, optional): directory to keep generated order files in (default: a temporary directory)
+
+    Returns:
+        dict: scenario results
+    """
+    spellbook_code = scenario['spellbook']
+    totals = {'turns': 0, 'log_entries': 0, 'monsters': 0, 'rendered_lines': 0,
+              'play_seconds': 0.0, 'render_seconds': 0.0, 'peak_memory_bytes': 0}
+    step_totals: dict[str, float] = {}
+    counter_totals: dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for match_seed in range(seed, seed + scenario.get('matches', 1)):
+            generator = OrderGenerator(spellbook_code, scenario['players'], scenario.get('teams', 0),
+                                       scenario['turns'], scenario.get('spell_density', 0.5),
+                                       scenario.get('monster_limit', 4), scenario.get('aggression', 0.5),
+                                       match_seed)
+            orders_filename = os.path.join(workdir or tmpdir, f"bench_{scenario['name']}_{match_seed}.json")
+            generator.write(orders_filename)
+
+            best_play_time = math.inf
+            best_report: dict = {}
+            best_render = 0.0
+            for run in range(max(repeat, 1)):
+                instrumentation = Instrumentation()
+                start = time.perf_counter()
+                match_data = play_match_from_file(generator.match_id, spellbook_code, generator.players,
+                                                  orders_filename, instrumentation=instrumentation)
+                play_time = time.perf_counter() - start
+                # Rendering is measured as a whole, without counting its lookups as play
+                match_data.instrumentation = None
+                start = time.perf_counter()
+                lines = render_match(match_data, spellbook_code)
+                render_time = time.perf_counter() - start
+                if play_time < best_play_time:
+                    best_play_time = play_time
+                    best_report = instrumentation.get_report()
+                best_render = render_time if run == 0 else min(best_render, render_time)
+
+            totals['turns'] += match_data.current_turn
+            totals['log_entries'] += len(match_data.match_log)
+            totals['monsters'] += len(match_data.monster_list)
+            totals['rendered_lines'] += lines
+            totals['play_seconds'] += best_play_time
+            totals['render_seconds'] += best_render
+            for name, timing in best_report['timings'].items():
+                step_totals[name] = step_totals.get(name, 0.0) + timing['seconds']
+            for name, value in best_report['counters'].items():
+                counter_totals[name] = counter_totals.get(name, 0) + value
+
+            tracemalloc.start()
+            match_data = play_match_from_file(generator.match_id, spellbook_code, generator.players, orders_filename)
+            render_match(match_data, spellbook_code)
+            totals['peak_memory_bytes'] = max(totals['peak_memory_bytes'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    play_seconds = totals['play_seconds']
+    return {'name': scenario['name'],
+            'settings': dict(scenario, seed=seed),
+            **totals,
+            'turns_per_second': totals['turns'] / play_seconds if play_seconds else 0.0,
+            'phase_seconds': {phase: step_totals.get(phase, 0.0) for phase in PHASES},
+            'step_seconds': {name: seconds for name, seconds in step_totals.items() if name not in PHASES},
+            'counters': counter_totals}
+
+
+def get_environment() -> dict:
+    """Describe the environment of the benchmark run.
+
+    Returns:
+        dict: git commit (if available), python version, platform and timestamp
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run_benchmarks(scenarios: list[dict] | None=None, seed: int=0, repeat: int=3, workdir: str='') -> dict:
+    """Run benchmark scenarios.
+
+    Arguments:
+        scenarios (list, optional): scenario settings (default: DEFAULT_SCENARIOS)
+        seed (int, optional): random seed for the order generator
+        repeat (int, optional): number of timed runs per scenario
+        workdir (str, optional): directory to keep generated order files in
+
+    Returns:
+        dict: environment and results of all scenarios
+    """
+    return {'environment': get_environment(),
+            'results': [run_scenario(s, seed, repeat, workdir) for s in scenarios or DEFAULT_SCENARIOS]}
+
+
+def get_ratio(value: float, base: float) -> float:
+    """Return ratio of two measurements.
+
+    Arguments:
+        value (float): measured value
+        base (float): value to compare with
+
+    Returns:
+        float: value / base, 0 if base is 0
+    """
+    return value / base if base else 0.0
+
+
+def compare_results(baseline: dict, current: dict) -> list[dict]:
+    """Compare benchmark results with a baseline, scenario by scenario.
+
+    Ratios above 1 mean the current run is faster (for throughput) or uses less (for time and memory).
+    A ratio is 0 if it cannot be calculated (f.e. a scenario was too short to measure its render time).
+
+    Arguments:
+        baseline (dict): results of run_benchmarks() for the baseline
+        current (dict): results of run_benchmarks() to compare
+
+    Returns:
+        list: per-scenario comparison
+    """
+    baseline_results = {r['name']: r for r in baseline['results']}
+    comparison = []
+    for r in current['results']:
+        b = baseline_results.get(r['name'])
+        if b is None:
+            continue
+        if b['settings'] != r['settings'] or b['turns'] != r['turns']:
+            # Different settings or engine behaviour, numbers are not comparable
+            comparison.append({'name': r['name'], 'comparable': False})
+            continue
+        comparison.append({'name': r['name'], 'comparable': True,
+                           'turns_per_second': get_ratio(r['turns_per_second'], b['turns_per_second']),
+                           'render_seconds': get_ratio(b['render_seconds'], r['render_seconds']),
+                           'peak_memory_bytes': get_ratio(b['peak_memory_bytes'], r['peak_memory_bytes'])})
+    return comparison
+
+
+def format_results(results: dict, comparison: list[dict] | None=None) -> list[str]:
+    """Format benchmark results as a text table.
+
+    Arguments:
+        results (dict): results of run_benchmarks()
+        comparison (list, optional): results of compare_results()
+
+    Returns:
+        list: text lines
+    """
+    ratios = {c['name']: c for c in comparison or []}
+    lines = [f"{'scenario':<20}{'turns':>7}{'turns/s':>10}"
+             + ''.join(f'{p + " ms":>12}' for p in PHASES)
+             + f"{'render ms':>11}{'peak KiB':>10}" + ('  vs baseline' if comparison else '')]
+    for r in results['results']:
+        line = (f"{r['name']:<20}{r['turns']:>7}{r['turns_per_second']:>10.1f}"
+                + ''.join(f"{r['phase_seconds'].get(p, 0.0) * 1000:>12.2f}" for p in PHASES)
+                + f"{r['render_seconds'] * 1000:>11.2f}{r['peak_memory_bytes'] / 1024:>10.0f}")
+        c = ratios.get(r['name'])
+        if c is not None:
+            line += (f"  x{c['turns_per_second']:.2f} turns/s, x{c['render_seconds']:.2f} render"
+                     if c['comparable'] else '  not comparable')
+        lines.append(line)
+    return lines
+
+
+def save_results(results: dict, filename: str) -> None:
+    """Save benchmark results to a JSON file.
+
+    Arguments:
+        results (dict): results of run_benchmarks()
+        filename (str): name of the JSON file
+    """
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=1)
+
+
+def load_results(filename: str) -> dict:
+    """Load benchmark results from a JSON file.
+
+    Arguments:
+        filename (str): name of the JSON file
+
+    Returns:
+        dict: results of run_benchmarks()
+    """
+    with open(filename, 'r') as f:
+        return dict(json.load(f))
@@ -0,0 +1,197 @@
+import json
+import random
+from common.tools_registry import get_ruleset_class
+
+
+DEFAULT_MATCH_ID = 123456
+# Monster IDs start from this number (see MatchData.get_next_monster_id())
+FIRST_MONSTER_ID = 101
+# Gestures used outside of planned spells, stabs included
+FILLER_GESTURES = ['C', 'D', 'F', 'P', 'S', 'W', '>', '-']
+
+
+def make_players(num_players: int, num_teams: int=0) -> list[dict[str, str | int]]:
+    """Create players setup for a synthetic match.
+
+    Arguments:
+        num_players (int): number of participants
+        num_teams (int, optional): number of teams, players are dealt into teams round-robin;
+            0 means every player is in a team of their own
+
+    Returns:
+        list: a list with basic participant info (see MatchData.init_actors_tmp())
+    """
+    if num_teams <= 0:
+        num_teams = num_players
+    return [{'player_id': i + 1, 'player_name': f'BenchWarlock{i + 1}',
+             'gender': i % 3, 'team_id': (i % num_teams) + 1, 'lang': 'en'}
+            for i in range(num_players)]
+
+
+def make_order(match_id: int, turn_num: int, participant_id: int) -> dict:
+    """Create an empty order (both hands '-', no targets), in the format of JSON order files.
+
+    Arguments:
+        match_id (int): match ID
+        turn_num (int): turn number
+        participant_id (int): participant ID
+
+    Returns:
+        dict: order data
+    """
+    return {'matchID': match_id, 'turnNum': turn_num, 'participantID': participant_id,
+            'gestureLH': '-', 'gestureRH': '-',
+            'orderSpellLH': -1, 'orderSpellRH': -1,
+            'orderTargetLH': -1, 'orderTargetRH': -1,
+            'delaySpell': -1, 'castDelayedSpell': -1, 'makeSpellPermanent': -1, 'commitSuicide': -1,
+            'paralyzeOrders': {}, 'charmOrders': {}, 'attackOrders': {}}
+
+
+class OrderGenerator:
+    """Seeded generator of synthetic match orders.
+
+    Every participant keeps a queue of planned gestures. When the queue is empty, with probability
+    spell_density the participant plans a spell pattern from the spellbook (picked at random, with
+    a random hand as the main one), otherwise makes random gestures for a turn. Lowercase letters of
+    patterns are made with both hands. Both hands never show P at the same time, so nobody surrenders.
+    Summons are planned until monster_limit summons are planned for the whole match.
+
+    The same seed and settings always produce the same orders. Random orders make most matches short
+    (somebody dies in 10-40 turns), so benchmarks play several matches with consecutive seeds.
+    """
+
+    def __init__(self, spellbook_code: str, num_players: int=2, num_teams: int=0, max_turns: int=30,
+                 spell_density: float=0.5, monster_limit: int=4, aggression: float=0.5, seed: int=0,
+                 match_id: int=DEFAULT_MATCH_ID) -> None:
+        """Init OrderGenerator.
+
+        Arguments:
+            spellbook_code (str): spellbook code, f.e. "Warlocks"
+            num_players (int, optional): number of participants
+            num_teams (int, optional): number of teams (0 - everyone for themselves)
+            max_turns (int, optional): number of turns to generate orders for
+            spell_density (float, optional): probability to start a spell pattern when a participant is free
+            monster_limit (int, optional): maximum number of summon spells planned in the match
+            aggression (float, optional): probability to direct a spell or a monster attack at an opponent,
+                instead of the default target (for spells) or nobody (for monsters)
+            seed (int, optional): random seed
+            match_id (int, optional): match ID
+        """
+        self.spellbook_code = spellbook_code
+        self.num_players = num_players
+        self.num_teams = num_teams
+        self.max_turns = max_turns
+        self.spell_density = spell_density
+        self.monster_limit = monster_limit
+        self.aggression = aggression
+        self.seed = seed
+        self.match_id = match_id
+        self.rng = random.Random(seed)
+
+        spellbook = get_ruleset_class(spellbook_code, 'SpellBook')()
+        self.summon_ids = set(spellbook.get_ids_summons())
+        # (spell ID, pattern) pairs that can be planned
+        self.patterns: list[tuple[int, str]] = [(sd['id'], pattern)
+                                                for sd in spellbook.spell_definitions
+                                                if sd['id'] in spellbook.valid_spell_ids
+                                                for pattern in sd['patterns']]
+        self.players = make_players(num_players, num_teams)
+
+    def get_opponent_ids(self, participant_id: int) -> list[int]:
+        """Return IDs of participants in other teams.
+
+        Arguments:
+            participant_id (int): participant ID
+
+        Returns:
+            list: participant IDs
+        """
+        team_id = self.players[participant_id - 1]['team_id']
+        return [i + 1 for i, p in enumerate(self.players) if p['team_id'] != team_id]
+
+    def plan_spell(self, summons_planned: int) -> tuple[list[tuple[str, str]], bool]:
+        """Plan gestures of a random spell pattern.
+
+        Arguments:
+            summons_planned (int): number of summons planned so far
+
+        Returns:
+            tuple: list of (LH gesture, RH gesture) pairs, flag if the spell is a summon
+        """
+        rng = self.rng
+        while True:
+            spell_id, pattern = rng.choice(self.patterns)
+            is_summon = spell_id in self.summon_ids
+            if not is_summon or summons_planned < self.monster_limit:
+                break
+        main_is_lh = rng.random() < 0.5
+        planned = []
+        for g in pattern:
+            if g.islower():
+                pair = (g.upper(), g.upper())
+            else:
+                other = rng.choice(FILLER_GESTURES)
+                if g == 'P' and other == 'P':
+                    other = '-'
+                pair = (g, other) if main_is_lh else (other, g)
+            planned.append(pair)
+        return planned, is_summon
+
+    def random_gestures(self) -> tuple[str, str]:
+        """Return a random pair of gestures that is not a surrender.
+
+        Returns:
+            tuple: LH gesture, RH gesture
+        """
+        gesture_lh = self.rng.choice(FILLER_GESTURES)
+        gesture_rh = self.rng.choice(FILLER_GESTURES)
+        if gesture_lh == 'P' and gesture_rh == 'P':
+            gesture_rh = '-'
+        return gesture_lh, gesture_rh
+
+    def generate(self) -> dict[str, dict]:
+        """Generate orders for all participants for all turns.
+
+        Orders are generated for every participant on every turn, as if everyone stays in the game;
+        orders of participants who are not active on a turn are ignored by the engine.
+
+        Returns:
+            dict: order key -> order data, in the format of JSON order files
+        """
+        # Restart the sequence, so that every call produces the same orders
+        self.rng = random.Random(self.seed)
+        rng = self.rng
+        queues: dict[int, list[tuple[str, str]]] = {i + 1: [] for i in range(self.num_players)}
+        summons_planned = 0
+        monster_ids = list(range(FIRST_MONSTER_ID, FIRST_MONSTER_ID + self.monster_limit))
+        all_orders = {}
+        for turn_num in range(1, self.max_turns + 1):
+            for participant_id, queue in queues.items():
+                if not queue and rng.random() < self.spell_density:
+                    planned, is_summon = self.plan_spell(summons_planned)
+                    queue.extend(planned)
+                    summons_planned += is_summon
+                gesture_lh, gesture_rh = queue.pop(0) if queue else self.random_gestures()
+
+                order = make_order(self.match_id, turn_num, participant_id)
+                order['gestureLH'] = gesture_lh
+                order['gestureRH'] = gesture_rh
+                opponent_ids = self.get_opponent_ids(participant_id) or [participant_id]
+                if rng.random() < self.aggression:
+                    order['orderTargetLH'] = rng.choice(opponent_ids)
+                if rng.random() < self.aggression:
+                    order['orderTargetRH'] = rng.choice(opponent_ids)
+                # Orders for monsters that do not exist or are controlled by others are ignored
+                order['attackOrders'] = {str(m_id): rng.choice(opponent_ids) if rng.random() < self.aggression else 0
+                                         for m_id in monster_ids}
+                all_orders[f'p{participant_id}t{turn_num}'] = order
+        return all_orders
+
+    def write(self, filename: str) -> None:
+        """Generate orders and save them to a JSON order file.
+
+        Arguments:
+            filename (str): name of the JSON file
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.generate(), f, indent=1)
@@ -0,0 +1,315 @@
+import math
+import random
+from common.tools_registry import fork_match, play_turn
+
+
+def get_winning_team(match_data: object) -> int:
+    """Return team ID of the winners of a match.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+
+    Returns:
+        int: team ID if all alive participants belong to the same team, 0 otherwise (draw or more teams left)
+    """
+    team_ids: set[int] = {p.team_id for p in match_data.participant_list if p.is_alive}
+    if len(team_ids) == 1:
+        return team_ids.pop()
+    return 0
+
+
+def evaluate_position(match_data: object, participant_id: int) -> float:
+    """Score the position of a participant's team.
+
+    A won match scores 1, a lost match -1, a draw 0. An ongoing match scores from -0.5 to 0.5
+    by the share of hit points of the team in hit points of all alive participants and monsters
+    (monsters count half), so any win is better than any ongoing position.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        participant_id (int): ID of the participant
+
+    Returns:
+        float: score
+    """
+    team_id = match_data.get_participant_by_id(participant_id, False).team_id
+    if match_data.get_match_status_finished():
+        winning_team_id = get_winning_team(match_data)
+        if winning_team_id == 0:
+            return 0.0
+        return 1.0 if winning_team_id == team_id else -1.0
+
+    team_ids = {p.id: p.team_id for p in match_data.participant_list}
+    own_hp = 0.0
+    other_hp = 0.0
+    for p in match_data.participant_list:
+        if p.is_alive:
+            if p.team_id == team_id:
+                own_hp += max(p.hp, 0)
+            else:
+                other_hp += max(p.hp, 0)
+    for m in match_data.monster_list:
+        if m.is_alive:
+            if team_ids.get(m.controller_id) == team_id:
+                own_hp += max(m.hp, 0) / 2
+            else:
+                other_hp += max(m.hp, 0) / 2
+    if own_hp + other_hp == 0:
+        return 0.0
+    return (own_hp - other_hp) / (own_hp + other_hp) / 2
+
+
+def get_random_orders(match_data: object, match_spellbook: object, bot: 'Bot') -> dict[int, dict]:
+    """Sample random orders for all participants that act this turn.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+        bot (object): Bot instance to sample orders with (see Bot.sample_order())
+
+    Returns:
+        dict: participant ID -> JSON order
+    """
+    orders = {}
+    for participant_id in match_data.get_ids_participants_active():
+        order_space = match_spellbook.get_order_space(match_data, participant_id)
+        if order_space is not None:
+            orders[participant_id] = bot.sample_order(order_space)
+    return orders
+
+
+def play_branch_turn(branch: tuple, orders: dict[int, dict]) -> bool:
+    """Process the current turn of a forked match with given orders.
+
+    Arguments:
+        branch (tuple): result of fork_match()
+        orders (dict): participant ID -> JSON order
+
+    Returns:
+        bool: True if the turn was processed
+    """
+    branch_orders = branch[2]
+    for data in orders.values():
+        branch_orders.add_file_order(data)
+    return play_turn(*branch)
+
+
+class Bot:
+    """Base bot class.
+
+    Bots choose orders of a participant from the order space (see SpellBook.get_order_space()).
+    Every bot has its own random generator, so matches of bots are reproducible.
+    """
+
+    name = 'bot'
+    # P/P gestures surrender in both rulesets, bots never consider them unless told to
+    SURRENDER_GESTURES = ('P', 'P')
+
+    def __init__(self, seed: int=0, allow_surrender: bool=False) -> None:
+        """Init Bot.
+
+        Arguments:
+            seed (int, optional): random seed
+            allow_surrender (bool, optional): flag to consider orders that surrender
+        """
+        self.rng = random.Random(seed)
+        self.allow_surrender = allow_surrender
+
+    def get_order(self, match_data: object, match_spellbook: object, match_orders: object,
+                  participant_id: int) -> dict | None:
+        """Return order of the participant for the current turn. To be overridden by specific bots.
+
+        Arguments:
+            match_data (object): instance of spellbook-specific MatchData-inherited object
+            match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+            match_orders (object): instance of spellbook-specific Orders-inherited object
+            participant_id (int): ID of the participant
+
+        Returns:
+            dict: JSON order, None if the participant gives no order
+        """
+        return None
+
+    def get_hand_options(self, order_space: object) -> list:
+        """Return hand options of the order space the bot considers.
+
+        Arguments:
+            order_space (object): OrderSpace instance
+
+        Returns:
+            list: HandOption instances
+        """
+        all_options: list = order_space.hand_options
+        if self.allow_surrender:
+            return all_options
+        hand_options = [option for option in all_options if option.gestures != self.SURRENDER_GESTURES]
+        return hand_options or all_options
+
+    def make_order(self, order_space: object, option: object) -> dict:
+        """Make an order of a hand option with random targets and choices.
+
+        Arguments:
+            order_space (object): OrderSpace instance
+            option (object): HandOption instance of the order space
+
+        Returns:
+            dict: JSON order
+        """
+        order: dict = order_space.make_order((option.order,)
+                                             + tuple(self.rng.choice(alternatives) for alternatives in option.choices)
+                                             + tuple(self.rng.choice(alternatives) for alternatives in order_space.choices))
+        return order
+
+    def sample_order(self, order_space: object) -> dict:
+        """Return a random order from the order space (see OrderSpace.sample()).
+
+        Arguments:
+            order_space (object): OrderSpace instance
+
+        Returns:
+            dict: JSON order
+        """
+        return self.make_order(order_space, self.rng.choice(self.get_hand_options(order_space)))
+
+    def get_candidates(self, order_space: object, max_candidates: int) -> list[dict]:
+        """Sample candidate orders, one per hand option (gestures and spells).
+
+        Arguments:
+            order_space (object): OrderSpace instance
+            max_candidates (int): maximum number of candidates
+
+        Returns:
+            list: JSON orders
+        """
+        hand_options = self.get_hand_options(order_space)
+        if len(hand_options) > max_candidates:
+            hand_options = self.rng.sample(hand_options, max_candidates)
+        return [self.make_order(order_space, option) for option in hand_options]
+
+
+class RandomBot(Bot):
+    """Bot that gives random orders."""
+
+    name = 'random'
+
+    def get_order(self, match_data: object, match_spellbook: object, match_orders: object,
+                  participant_id: int) -> dict | None:
+        order_space = match_spellbook.get_order_space(match_data, participant_id)
+        if order_space is None:
+            return None
+        return self.sample_order(order_space)
+
+
+class GreedyBot(Bot):
+    """Bot that plays each candidate order for one turn in a fork and picks the best position.
+
+    Other participants are assumed to give random orders, the same for all candidates.
+    """
+
+    name = 'greedy'
+
+    def __init__(self, seed: int=0, allow_surrender: bool=False, max_candidates: int=16) -> None:
+        """Init GreedyBot.
+
+        Arguments:
+            seed (int, optional): random seed
+            allow_surrender (bool, optional): flag to consider orders that surrender
+            max_candidates (int, optional): maximum number of candidate orders to try
+        """
+        super().__init__(seed, allow_surrender)
+        self.max_candidates = max_candidates
+
+    def get_order(self, match_data: object, match_spellbook: object, match_orders: object,
+                  participant_id: int) -> dict | None:
+        order_space = match_spellbook.get_order_space(match_data, participant_id)
+        if order_space is None:
+            return None
+        other_orders = get_random_orders(match_data, match_spellbook, self)
+        best_order = None
+        best_score = -math.inf
+        for order in self.get_candidates(order_space, self.max_candidates):
+            branch = fork_match(match_data, match_spellbook, match_orders)
+            if not play_branch_turn(branch, {**other_orders, participant_id: order}):
+                continue
+            score = evaluate_position(branch[0], participant_id)
+            if score > best_score:
+                best_order = order
+                best_score = score
+        return best_order if best_order is not None else self.sample_order(order_space)
+
+
+class MCTSBot(Bot):
+    """Monte Carlo bot that picks a candidate order by random playouts.
+
+    Turns are simultaneous, so the search is a flat UCB1 bandit over candidate orders at the root:
+    every playout forks the match, plays the candidate against random orders of others,
+    continues with random orders for everybody for a few turns and scores the position.
+    """
+
+    name = 'mcts'
+
+    def __init__(self, seed: int=0, allow_surrender: bool=False, max_candidates: int=8, playouts: int=32,
+                 playout_turns: int=3, exploration: float=1.4) -> None:
+        """Init MCTSBot.
+
+        Arguments:
+            seed (int, optional): random seed
+            allow_surrender (bool, optional): flag to consider orders that surrender
+            max_candidates (int, optional): maximum number of candidate orders to try
+            playouts (int, optional): total number of playouts of all candidate orders,
+                at least one playout per candidate is made
+            playout_turns (int, optional): number of random turns played after the candidate turn
+            exploration (float, optional): UCB1 exploration constant
+        """
+        super().__init__(seed, allow_surrender)
+        self.max_candidates = max_candidates
+        self.playouts = playouts
+        self.playout_turns = playout_turns
+        self.exploration = exploration
+
+    def playout(self, match_data: object, match_spellbook: object, match_orders: object,
+                participant_id: int, order: dict) -> float:
+        """Play a candidate order and random turns after it in a fork.
+
+        Arguments:
+            match_data (object): instance of spellbook-specific MatchData-inherited object
+            match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+            match_orders (object): instance of spellbook-specific Orders-inherited object
+            participant_id (int): ID of the participant
+            order (dict): JSON order of the participant
+
+        Returns:
+            float: score of the position after the playout (see evaluate_position())
+        """
+        branch = fork_match(match_data, match_spellbook, match_orders)
+        orders = get_random_orders(match_data, match_spellbook, self)
+        orders[participant_id] = order
+        if play_branch_turn(branch, orders):
+            for turn in range(self.playout_turns):
+                if branch[0].get_match_status_finished():
+                    break
+                if not play_branch_turn(branch, get_random_orders(branch[0], branch[1], self)):
+                    break
+        return evaluate_position(branch[0], participant_id)
+
+    def get_order(self, match_data: object, match_spellbook: object, match_orders: object,
+                  participant_id: int) -> dict | None:
+        order_space = match_spellbook.get_order_space(match_data, participant_id)
+        if order_space is None:
+            return None
+        candidates = self.get_candidates(order_space, self.max_candidates)
+        visits = [0] * len(candidates)
+        scores = [0.0] * len(candidates)
+        for playout_num in range(max(self.playouts, len(candidates))):
+            if playout_num < len(candidates):
+                c = playout_num
+            else:
+                c = max(range(len(candidates)),
+                        key=lambda i: scores[i] / visits[i]
+                        + self.exploration * math.sqrt(math.log(playout_num) / visits[i]))
+            scores[c] += self.playout(match_data, match_spellbook, match_orders, participant_id, candidates[c])
+            visits[c] += 1
+        return candidates[max(range(len(candidates)), key=lambda i: (visits[i], scores[i]))]
+
+
+BOTS: dict[str, type[Bot]] = {bot.name: bot for bot in [RandomBot, GreedyBot, MCTSBot]}
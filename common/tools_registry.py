@@ -0,0 +1,154 @@
+from functools import cache
+from common.tools_engine import import_name
+from ruleset_core.class_instrumentation import Instrumentation
+from ruleset_core.class_texttemplate import TextTemplate, compile_text_templates
+
+
+@cache
+def get_ruleset_class(spellbook_code: str, class_name: str) -> type:
+    """Resolve a spellbook-specific class once per process.
+
+    For example, for Warlocks spellbook and 'MatchData' class name we load
+    WarlocksMatchData from ruleset_warlocks.class_warlocks_matchdata.
+
+    Arguments:
+        spellbook_code (str): selected spellbook code, f.e. "Warlocks"
+        class_name (str): class name without spellbook code: 'MatchData', 'SpellBook' or 'Orders'
+
+    Returns:
+        type: spellbook-specific class
+    """
+    lib_name = 'ruleset_' + spellbook_code.lower() + '.'
+    ruleset_class: type = import_name(lib_name + 'class_' + spellbook_code.lower() + '_' + class_name.lower(),
+                                      spellbook_code + class_name)
+    return ruleset_class
+
+
+@cache
+def get_localization(spellbook_code: str, lang_code: str) -> dict:
+    """Load localized texts of a spellbook once per process.
+
+    We load common text strings from respective lang file, f.e. loc_common_en,
+    and text strings from spellbook lang file, f.e. warlocks_text_strings_en,
+    warlocks_spell_names_en, warlocks_spell_effects_en, warlocks_monster_names_en,
+    warlocks_monster_classes_en from loc_warlocks_en. Text strings are also compiled
+    into templates. Returned objects are shared between matches and should not be modified.
+
+    Arguments:
+        spellbook_code (str): selected spellbook code, f.e. "Warlocks"
+        lang_code (str): code of the language (f.e. 'en')
+
+    Returns:
+        dict: text_strings, text_templates, spell_names, spell_effects, monster_names, monster_classes
+    """
+    core_name = 'ruleset_core.'
+    lib_name = 'ruleset_' + spellbook_code.lower() + '.'
+    module_name = lib_name + 'loc_' + spellbook_code.lower() + '_' + lang_code.lower()
+    sb_code_l = spellbook_code.lower()
+
+    common_text_strings = import_name(core_name + 'loc_common_' + lang_code.lower(),
+                                      'common_text_strings_' + lang_code)
+    text_strings = common_text_strings | import_name(module_name, sb_code_l + '_text_strings_' + lang_code)
+    text_templates: dict[str, TextTemplate] = compile_text_templates(text_strings)
+    return {'text_strings': text_strings,
+            'text_templates': text_templates,
+            'spell_names': import_name(module_name, sb_code_l + '_spell_names_' + lang_code),
+            'spell_effects': import_name(module_name, sb_code_l + '_spell_effects_' + lang_code),
+            'monster_names': import_name(module_name, sb_code_l + '_monster_names_' + lang_code),
+            'monster_classes': import_name(module_name, sb_code_l + '_monster_classes_' + lang_code)}
+
+
+def create_match(match_id: int, spellbook_code: str, instrumentation: Instrumentation | None=None) -> tuple:
+    """Create objects for a new match.
+
+    Classes are resolved once per process, and spellbooks share immutable spell data
+    between instances (see SpellBook.init_spells()), so only per-match state is allocated.
+
+    Arguments:
+        match_id (int): match ID
+        spellbook_code (str): selected spellbook code, f.e. "Warlocks"
+        instrumentation (object, optional): Instrumentation instance to collect timings and counters into
+
+    Returns:
+        tuple: instances of spellbook-specific MatchData, SpellBook and Orders classes
+    """
+    match_data = get_ruleset_class(spellbook_code, 'MatchData')(match_id)
+    match_spellbook = get_ruleset_class(spellbook_code, 'SpellBook')()
+    match_orders = get_ruleset_class(spellbook_code, 'Orders')()
+    match_data.instrumentation = instrumentation
+    match_orders.instrumentation = instrumentation
+    return match_data, match_spellbook, match_orders
+
+
+def fork_match(match_data: object, match_spellbook: object, match_orders: object) -> tuple:
+    """Create an independent branch of a match, f.e. to try hypothetical orders.
+
+    Meant to be called between turns, like snapshot_match() in common/tools_snapshot.py,
+    but the branch refers to the history of finished turns in the original match instead of copying it
+    (see MatchData.fork()), so the cost of a fork does not grow with the length of the match,
+    and forks are cheap enough to be created for every candidate move.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+        match_orders (object): instance of spellbook-specific Orders-inherited object
+
+    Returns:
+        tuple: new instances of spellbook-specific MatchData, SpellBook and Orders classes
+    """
+    return match_data.fork(), match_spellbook.fork(), match_orders.fork()
+
+
+def play_turn(match_data: object, match_spellbook: object, match_orders: object) -> bool:
+    """Process the current turn of a match if the match is not over and all orders for the turn are available.
+
+    Orders are read from the file, from the order provider (see Orders.set_provider())
+    and from add_file_order() calls, then the turn is processed and the next turn is started.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+        match_orders (object): instance of spellbook-specific Orders-inherited object
+
+    Returns:
+        bool: True if the turn was processed
+    """
+    if match_data.get_match_status_finished():
+        return False
+    match_orders.get_turn_orders(match_data.match_id,
+                                 match_data.current_turn,
+                                 match_data.DATA_HAND_ID_OFFSET,
+                                 match_data.get_ids_participants_active(),
+                                 match_spellbook.valid_gestures,
+                                 match_spellbook.valid_spell_ids)
+    if match_orders.check_missing_orders(match_data):
+        return False
+    match_data.process_match_turn(match_orders, match_spellbook)
+    if match_data.get_match_status_ongoing():
+        match_data.set_current_turn(match_data.current_turn + 1)
+    return True
+
+
+def play_match_from_file(match_id: int, spellbook_code: str, match_players_init: list[dict[str, str | int]],
+                         match_json_fname: str, streaming_orders: bool=False,
+                         instrumentation: Instrumentation | None=None) -> object:
+    """Play a match using JSON file as a source of orders, until the match ends or orders run out.
+
+    Arguments:
+        match_id (int): match number that should match match ID in orders
+        spellbook_code (str): selected spellbook code, f.e. "Warlocks"
+        match_players_init (list): a list with basic participant info (usernames, etc.)
+        match_json_fname (str): name of the json file to parse orders from
+        streaming_orders (bool, optional): flag to read orders file gradually, turn by turn (for huge archives)
+        instrumentation (object, optional): Instrumentation instance to collect timings and counters into
+
+    Returns:
+        object: instance of spellbook-specific MatchData-inherited object
+    """
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code, instrumentation)
+    match_orders.set_filename(match_json_fname, streaming_orders)
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    while play_turn(match_data, match_spellbook, match_orders):
+        pass
+    return match_data
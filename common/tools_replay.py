@@ -0,0 +1,218 @@
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from common.tools_registry import play_match_from_file
+
+
+DEFAULT_MATCH_ID = 123456
+DEFAULT_PLAYERS: list[dict[str, str | int]] = [
+    {'player_id': 2, 'player_name': 'TestWarlock',
+        'gender': 1, 'team_id': 1, 'lang': 'en'},
+    {'player_id': 3, 'player_name': 'TestFoe',
+        'gender': 0, 'team_id': 2, 'lang': 'en'},
+]
+
+
+def make_replay_task(orders_filename: str, spellbook_code: str, match_players_init: list[dict[str, str | int]],
+                     match_id: int=DEFAULT_MATCH_ID, expected: dict | None=None, lang_code: str='en',
+                     pov_ids: list[int] | None=None, streaming_orders: bool=False) -> dict:
+    """Create a replay task, i.e. a picklable dict with everything needed to replay a single match.
+
+    Arguments:
+        orders_filename (str): name of the json file to parse orders from
+        spellbook_code (str): spellbook code, f.e. "Warlocks"
+        match_players_init (list): a list with basic participant info (usernames, etc.)
+        match_id (int, optional): match ID that should match match ID in orders
+        expected (dict, optional): expected final state, see check_replay_expectations()
+        lang_code (str, optional): language code for logs and statuses
+        pov_ids (list, optional): IDs of participants to output logs and statuses for (-1 for global POV)
+        streaming_orders (bool, optional): flag to read orders file gradually, turn by turn
+
+    Returns:
+        dict: replay task
+    """
+    return {'orders_filename': orders_filename,
+            'spellbook_code': spellbook_code,
+            'match_players_init': match_players_init,
+            'match_id': match_id,
+            'expected': expected or {},
+            'lang_code': lang_code,
+            'pov_ids': pov_ids or [],
+            'streaming_orders': streaming_orders}
+
+
+def is_replay_manifest(filename: str) -> bool:
+    """Check if a JSON file is a replay manifest (see load_replay_tasks()) rather than an orders file.
+
+    Arguments:
+        filename (str): name of a JSON file
+
+    Returns:
+        bool: True if the file is a JSON object with "matches"
+    """
+    try:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(data, dict) and 'matches' in data
+
+
+def load_replay_tasks(path: str, spellbook_code: str='', match_players_init: list[dict[str, str | int]] | None=None,
+                      match_id: int=DEFAULT_MATCH_ID, lang_code: str='en', pov_ids: list[int] | None=None,
+                      streaming_orders: bool=False) -> list[dict]:
+    """Create replay tasks from a directory with order files or from a manifest file.
+
+    A directory is replayed file by file (in alphabetical order) with the same spellbook and players,
+    so the spellbook code is required. Manifests found in a directory are skipped.
+    Files in a directory have no expectations, so such a game passes as long as it replays without errors.
+    A manifest is a JSON file with default settings and a list of matches, f.e.
+    {"spellbook": "Warlocks", "matchID": 123456, "players": [...],
+     "matches": [{"orders": "tests_warlocks/test_action_02_surrender.json",
+                  "players": [...], "expected": {"matchStatus": 2, "participants": {"1": {"hp": 15}}}}]}
+    Order file names in a manifest are relative to the manifest location.
+
+    Arguments:
+        path (str): directory with JSON order files or a JSON manifest
+        spellbook_code (str, optional): spellbook code, overrides manifest default
+        match_players_init (list, optional): players setup, overrides manifest default
+        match_id (int, optional): match ID, used when manifest has none
+        lang_code (str, optional): language code for logs and statuses
+        pov_ids (list, optional): IDs of participants to output logs and statuses for
+        streaming_orders (bool, optional): flag to read orders files gradually, turn by turn
+
+    Returns:
+        list: replay tasks
+    """
+    tasks = []
+    if os.path.isdir(path):
+        if not spellbook_code:
+            raise ValueError(f'Spellbook code is required to replay order files from directory {path}')
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith('.json') and not is_replay_manifest(os.path.join(path, filename)):
+                tasks.append(make_replay_task(os.path.join(path, filename), spellbook_code,
+                                              match_players_init or DEFAULT_PLAYERS, match_id,
+                                              None, lang_code, pov_ids, streaming_orders))
+        return tasks
+
+    with open(path, 'r') as f:
+        manifest = dict(json.load(f))
+    manifest_dir = os.path.dirname(path)
+    default_spellbook = spellbook_code or manifest.get('spellbook', '')
+    default_players = match_players_init or manifest.get('players', DEFAULT_PLAYERS)
+    default_match_id = manifest.get('matchID', match_id)
+    for entry in manifest.get('matches', []):
+        tasks.append(make_replay_task(os.path.join(manifest_dir, entry['orders']),
+                                      entry.get('spellbook', default_spellbook),
+                                      entry.get('players', default_players),
+                                      entry.get('matchID', default_match_id),
+                                      entry.get('expected'), lang_code, pov_ids, streaming_orders))
+    return tasks
+
+
+def check_replay_expectations(match_data: object, expected: dict) -> list[str]:
+    """Compare the final match state with expectations.
+
+    Supported expectations are "matchStatus", "currentTurn" and per-participant
+    (and per-monster) "hp" and "is_alive" values, keyed by actor ID.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        expected (dict): expected final state
+
+    Returns:
+        list: descriptions of failed expectations
+    """
+    failures = []
+    if 'matchStatus' in expected and match_data.match_status != expected['matchStatus']:
+        failures.append(f"matchStatus is {match_data.match_status}, expected {expected['matchStatus']}")
+    if 'currentTurn' in expected and match_data.current_turn != expected['currentTurn']:
+        failures.append(f"currentTurn is {match_data.current_turn}, expected {expected['currentTurn']}")
+    for group in ['participants', 'monsters']:
+        for actor_id, actor_expected in expected.get(group, {}).items():
+            actor = match_data.get_actor_by_id(int(actor_id), search_alive_only=False)
+            if actor is None:
+                failures.append(f"actor {actor_id} not found")
+                continue
+            for attr in ['hp', 'is_alive']:
+                if attr in actor_expected and getattr(actor, attr) != actor_expected[attr]:
+                    failures.append(f"actor {actor_id} {attr} is {getattr(actor, attr)}, expected {actor_expected[attr]}")
+    return failures
+
+
+def replay_match(task: dict) -> dict:
+    """Replay a single match and collect its results.
+
+    A match passes if it replays without errors and its final state meets the expectations
+    of the task (see check_replay_expectations()), so a task without expectations only checks for errors.
+
+    Arguments:
+        task (dict): replay task, see make_replay_task()
+
+    Returns:
+        dict: replay result with final state, logs, statuses and pass / fail flag
+    """
+    result: dict = {'orders_filename': task['orders_filename'],
+                    'spellbook_code': task['spellbook_code'],
+                    'match_id': task['match_id'],
+                    'passed': False,
+                    'failures': [],
+                    'error': '',
+                    'duration': 0.0}
+    start_time = time.perf_counter()
+    try:
+        match_data = play_match_from_file(task['match_id'],
+                                          task['spellbook_code'],
+                                          task['match_players_init'],
+                                          task['orders_filename'],
+                                          task['streaming_orders'])
+        result['match_status'] = match_data.match_status
+        result['current_turn'] = match_data.current_turn
+        result['participants'] = [{'id': p.id, 'name': p.name, 'team_id': p.team_id,
+                                   'hp': p.hp, 'is_alive': p.is_alive}
+                                  for p in match_data.participant_list]
+        result['monsters'] = [{'id': m.id, 'monster_type': m.monster_type, 'controller_id': m.controller_id,
+                               'hp': m.hp, 'is_alive': m.is_alive}
+                              for m in match_data.monster_list]
+        if task['pov_ids']:
+            match_data.match_init_output(task['spellbook_code'], task['lang_code'])
+            result['logs'] = {}
+            result['statuses'] = {}
+            for pov_id in task['pov_ids']:
+                result['logs'][pov_id] = match_data.print_match_log(pov_id, stay_silent=True)
+                result['statuses'][pov_id] = match_data.print_actor_statuses(pov_id, stay_silent=True)
+        result['failures'] = check_replay_expectations(match_data, task['expected'])
+        result['passed'] = not result['failures']
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['duration'] = time.perf_counter() - start_time
+    return result
+
+
+def replay_batch(tasks: list[dict], workers: int | None=None) -> dict:
+    """Replay many matches across a pool of worker processes.
+
+    Arguments:
+        tasks (list): replay tasks, see make_replay_task()
+        workers (int, optional): number of worker processes, defaults to the number of CPUs;
+            1 replays all matches in the current process
+
+    Returns:
+        dict: summary and a list of replay results, in the same order as tasks
+    """
+    start_time = time.perf_counter()
+    if workers == 1 or len(tasks) < 2:
+        results = [replay_match(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(replay_match, tasks, chunksize=chunksize))
+
+    passed = sum(1 for r in results if r['passed'])
+    return {'summary': {'total': len(results),
+                        'passed': passed,
+                        'failed': len(results) - passed,
+                        'duration': time.perf_counter() - start_time},
+            'results': results}
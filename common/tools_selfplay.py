@@ -0,0 +1,136 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from common.tools_bots import BOTS, get_winning_team
+from common.tools_registry import create_match, play_turn
+from ruleset_core.class_orderprovider import CallbackOrderProvider
+
+
+DEFAULT_MATCH_ID = 100000
+# Matches still ongoing after this turn are stopped and counted as unfinished
+DEFAULT_MAX_TURNS = 100
+
+
+def make_selfplay_players(bot_names: list[str], num_teams: int=0) -> list[dict[str, str | int]]:
+    """Create players setup for a self-play match, one participant per bot.
+
+    Arguments:
+        bot_names (list): bot names (keys of BOTS), in the order of participant IDs
+        num_teams (int, optional): number of teams, bots are dealt into teams round-robin;
+            0 means every bot is in a team of their own
+
+    Returns:
+        list: a list with basic participant info (see MatchData.init_actors_tmp())
+    """
+    if num_teams <= 0:
+        num_teams = len(bot_names)
+    return [{'player_id': i + 1, 'player_name': f'{name.capitalize()}Bot{i + 1}',
+             'gender': i % 3, 'team_id': (i % num_teams) + 1, 'lang': 'en'}
+            for i, name in enumerate(bot_names)]
+
+
+def play_selfplay_match(task: dict) -> dict:
+    """Play a match between bots.
+
+    Orders come from bots through CallbackOrderProvider, every bot gets its own seed.
+
+    Arguments:
+        task (dict): match settings {'spellbook', 'bots', 'teams', 'seed', 'max_turns'}
+
+    Returns:
+        dict: match result
+    """
+    start_time = time.perf_counter()
+    players = make_selfplay_players(task['bots'], task['teams'])
+    match_data, match_spellbook, match_orders = create_match(DEFAULT_MATCH_ID + task['seed'], task['spellbook'])
+    bots = [BOTS[name](task['seed'] * len(task['bots']) + i) for i, name in enumerate(task['bots'])]
+
+    def get_bot_order(match_id: int, turn_num: int, participant_id: int) -> dict | None:
+        return bots[participant_id - 1].get_order(match_data, match_spellbook, match_orders, participant_id)
+
+    match_orders.set_provider(CallbackOrderProvider(get_bot_order))
+    match_data.init_actors_tmp(players)
+    match_data.process_match_start()
+    while match_data.current_turn <= task['max_turns'] and play_turn(match_data, match_spellbook, match_orders):
+        pass
+
+    finished = match_data.get_match_status_finished()
+    return {'seed': task['seed'],
+            'turns': match_data.current_turn,
+            'finished': finished,
+            'winning_team': get_winning_team(match_data) if finished else 0,
+            'teams': [p['team_id'] for p in players],
+            'duration': time.perf_counter() - start_time}
+
+
+def run_selfplay(spellbook_code: str, bot_names: list[str], matches: int, seed: int=0, num_teams: int=0,
+                 max_turns: int=DEFAULT_MAX_TURNS, workers: int | None=None) -> dict:
+    """Play matches between bots across a pool of worker processes.
+
+    Matches have consecutive seeds (used for the match ID and bot random generators), so results
+    do not depend on the number of workers.
+
+    Arguments:
+        spellbook_code (str): spellbook code, f.e. "Warlocks"
+        bot_names (list): bot names (keys of BOTS), one per participant
+        matches (int): number of matches
+        seed (int, optional): seed of the first match
+        num_teams (int, optional): number of teams, see make_selfplay_players()
+        max_turns (int, optional): the last turn to play in a match
+        workers (int, optional): number of worker processes, defaults to the number of CPUs;
+            1 plays all matches in the current process
+
+    Returns:
+        dict: summary, per-seat win rates and a list of match results
+    """
+    for name in bot_names:
+        if name not in BOTS:
+            raise ValueError(f"Unknown bot {name}, expected one of {', '.join(BOTS)}")
+    tasks = [{'spellbook': spellbook_code, 'bots': bot_names, 'teams': num_teams, 'seed': match_seed,
+              'max_turns': max_turns} for match_seed in range(seed, seed + matches)]
+
+    start_time = time.perf_counter()
+    if workers == 1 or len(tasks) < 2:
+        results = [play_selfplay_match(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(play_selfplay_match, tasks, chunksize=chunksize))
+    duration = time.perf_counter() - start_time
+
+    turns = sum(r['turns'] for r in results)
+    seats = []
+    for i, name in enumerate(bot_names):
+        wins = sum(1 for r in results if r['winning_team'] == r['teams'][i])
+        seats.append({'participant_id': i + 1, 'bot': name, 'team_id': results[0]['teams'][i] if results else 0,
+                      'wins': wins, 'win_rate': wins / len(results) if results else 0.0})
+    return {'summary': {'spellbook': spellbook_code,
+                        'matches': len(results),
+                        'turns': turns,
+                        'draws': sum(1 for r in results if r['finished'] and r['winning_team'] == 0),
+                        'unfinished': sum(1 for r in results if not r['finished']),
+                        'duration': duration,
+                        'games_per_second': len(results) / duration if duration else 0.0,
+                        'turns_per_second': turns / duration if duration else 0.0},
+            'seats': seats,
+            'results': results}
+
+
+def format_selfplay_results(selfplay_results: dict) -> list[str]:
+    """Format results of run_selfplay() as a text table.
+
+    Arguments:
+        selfplay_results (dict): results of run_selfplay()
+
+    Returns:
+        list: text lines
+    """
+    summary = selfplay_results['summary']
+    lines = [f"{'seat':<6}{'bot':<10}{'team':>6}{'wins':>8}{'win rate':>10}"]
+    for seat in selfplay_results['seats']:
+        lines.append(f"{seat['participant_id']:<6}{seat['bot']:<10}{seat['team_id']:>6}{seat['wins']:>8}"
+                     f"{seat['win_rate'] * 100:>9.1f}%")
+    lines.append(f"{summary['matches']} {summary['spellbook']} matches, {summary['draws']} draws, "
+                 f"{summary['unfinished']} unfinished, {summary['turns']} turns in {summary['duration']:.2f}s: "
+                 f"{summary['games_per_second']:.2f} games/s, {summary['turns_per_second']:.1f} turns/s")
+    return lines
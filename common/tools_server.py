@@ -0,0 +1,670 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from common.tools_registry import create_match, fork_match, get_ruleset_class, play_turn
+from ruleset_core.class_orderprovider import QueueOrderProvider
+
+
+# State of the turn worker run by the current thread (see get_hosted_matches())
+WORKER_STATE = threading.local()
+# Number of recent turns to calculate latency percentiles over
+LATENCY_WINDOW = 10000
+# Gestures used by load test clients
+LOAD_TEST_GESTURES = ['C', 'D', 'F', 'P', 'S', 'W', '>', '-']
+
+
+# WORKER functions, run in worker processes (or a worker thread)
+
+def get_hosted_matches() -> dict[int, tuple]:
+    """Return matches hosted by the current worker.
+
+    Every worker runs in its own thread (the only thread of a worker process, or the thread of the executor
+    with workers=0), so servers never share hosted matches, and matches are gone when the worker is shut down.
+
+    Returns:
+        dict: match ID -> (match data, spellbook, orders, provider)
+    """
+    hosted_matches: dict[int, tuple] | None = getattr(WORKER_STATE, 'hosted_matches', None)
+    if hosted_matches is None:
+        hosted_matches = WORKER_STATE.hosted_matches = {}
+    return hosted_matches
+
+
+def get_match_state(match_data: object, turn_nums: list[int]) -> dict:
+    """Describe a hosted match for clients.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        turn_nums (list): turns to include logs of
+
+    Returns:
+        dict: match ID, current turn, status, participants expected to act and logs by POV ID (public and participants)
+    """
+    finished = match_data.get_match_status_finished()
+    pov_ids = [0] + [p.id for p in match_data.participant_list]
+    return {'matchID': match_data.match_id,
+            'turnNum': match_data.current_turn,
+            'finished': finished,
+            'activeIDs': [] if finished else match_data.get_ids_participants_active(),
+            'log': {str(pov_id): [line for turn_num in turn_nums for line in match_data.get_turn_log(turn_num, pov_id)]
+                    for pov_id in pov_ids}}
+
+
+def worker_get_pid() -> int:
+    """Return process ID of the worker.
+
+    Returns:
+        int: process ID
+    """
+    return os.getpid()
+
+
+def worker_host_match(match_id: int, spellbook_code: str, match_players_init: list[dict[str, str | int]],
+                      lang_code: str) -> dict:
+    """Create a match in the worker and start it.
+
+    Arguments:
+        match_id (int): match ID
+        spellbook_code (str): spellbook code, f.e. "Warlocks"
+        match_players_init (list): a list with basic participant info
+        lang_code (str): language of match logs
+
+    Returns:
+        dict: match state (see get_match_state())
+    """
+    hosted_matches = get_hosted_matches()
+    if match_id in hosted_matches:
+        raise ValueError(f'Match {match_id} is already hosted')
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+    provider = QueueOrderProvider()
+    match_orders.set_provider(provider)
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    match_data.match_init_output(spellbook_code, lang_code)
+    hosted_matches[match_id] = (match_data, match_spellbook, match_orders, provider)
+    return get_match_state(match_data, list(range(match_data.current_turn)))
+
+
+def worker_resolve_turn(match_id: int, orders: list[dict]) -> dict:
+    """Add orders to a hosted match and process the turn if all orders are in.
+
+    Finished matches are removed from the worker. If processing of the turn fails, the match is brought back
+    to the start of the turn from a fork made before the turn (see fork_match(), much cheaper than
+    snapshot_match() for every turn), so the turn can be processed again from scratch.
+
+    Arguments:
+        match_id (int): match ID
+        orders (list): JSON orders for the current turn
+
+    Returns:
+        dict: match state (see get_match_state()) with the log of the processed turn,
+            processing flag, IDs of participants with missing (or invalid) orders and time spent
+    """
+    start_time = time.perf_counter()
+    hosted_matches = get_hosted_matches()
+    match_data, match_spellbook, match_orders, provider = hosted_matches[match_id]
+    for data in orders:
+        provider.put(data)
+    turn_num = match_data.current_turn
+    backup = fork_match(match_data, match_spellbook, match_orders)
+    try:
+        processed = play_turn(match_data, match_spellbook, match_orders)
+    except Exception:
+        match_data, match_spellbook, match_orders = backup
+        match_orders.set_provider(provider)
+        hosted_matches[match_id] = (match_data, match_spellbook, match_orders, provider)
+        raise
+    state = get_match_state(match_data, [turn_num] if processed else [])
+    state['resolvedTurnNum'] = turn_num if processed else 0
+    state['missingIDs'] = [] if processed else match_orders.check_missing_orders(match_data)
+    if state['finished']:
+        del hosted_matches[match_id]
+    state['resolveSeconds'] = time.perf_counter() - start_time
+    return state
+
+
+def worker_close_match(match_id: int) -> bool:
+    """Remove a match from the worker.
+
+    Arguments:
+        match_id (int): match ID
+
+    Returns:
+        bool: True if the match was hosted
+    """
+    return get_hosted_matches().pop(match_id, None) is not None
+
+
+# SERVER classes
+
+class HostedMatch:
+    """Server-side state of a hosted match: its worker, current turn and orders collected for the turn."""
+
+    def __init__(self, match_id: int, worker_num: int, spellbook_code: str) -> None:
+        """Init HostedMatch.
+
+        Arguments:
+            match_id (int): match ID
+            worker_num (int): index of the worker that hosts the match
+            spellbook_code (str): spellbook code, f.e. "Warlocks"
+        """
+        self.match_id = match_id
+        self.worker_num = worker_num
+        # Orders instance to validate orders before they are sent to the worker
+        self.orders = get_ruleset_class(spellbook_code, 'Orders')()
+        self.turn_num = 0
+        # The match is over or closed, it is not hosted by the worker anymore
+        self.finished = False
+        # IDs of participants who act this turn, and of those whose orders have not arrived yet
+        self.active_ids: list[int] = []
+        self.waiting_ids: set[int] = set()
+        # Orders that arrived for the turn and were not sent to the worker yet
+        self.turn_orders: list[dict] = []
+        # Task that processes the turn in the worker, None if the turn is not being processed
+        self.resolve_task: asyncio.Task | None = None
+        # Connections to notify of processed turns -> POV ID of their logs
+        self.subscribers: dict[asyncio.StreamWriter, int] = {}
+
+
+class MatchServer:
+    """Asyncio server that hosts many concurrent matches.
+
+    Orders are accepted as they arrive, and a turn is processed as soon as all participants who act
+    this turn have given their orders. Matches live in worker processes (every worker is a separate
+    single-process pool, so a match always goes to the same worker) and turns are processed there,
+    so the event loop only routes messages. With workers=0 matches are processed in a single thread
+    of the server process instead.
+
+    Clients talk JSON lines over TCP or a Unix socket (see handle_client()).
+    """
+
+    def __init__(self, workers: int | None=None, lang_code: str='en') -> None:
+        """Init MatchServer.
+
+        Arguments:
+            workers (int, optional): number of worker processes, defaults to the number of CPUs;
+                0 processes turns in a thread of the server process
+            lang_code (str, optional): language of match logs
+        """
+        self.lang_code = lang_code
+        self.executors: list[Executor]
+        if workers == 0:
+            self.executors = [ThreadPoolExecutor(max_workers=1)]
+        else:
+            self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers or os.cpu_count() or 1)]
+        self.worker_pids: list[int] = [0] * len(self.executors)
+        # Number of hosted unfinished matches per worker, and the largest number seen
+        self.worker_matches = [0] * len(self.executors)
+        self.worker_matches_peak = [0] * len(self.executors)
+        self.matches: dict[int, HostedMatch] = {}
+        self.next_match_id = 1
+        self.matches_created = 0
+        self.matches_finished = 0
+        self.turns = 0
+        # Milliseconds from the last order of a turn to its result, and spent in workers, for recent turns
+        self.turn_latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.resolve_times: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.tasks: set[asyncio.Task] = set()
+
+    async def run_in_worker(self, worker_num: int, function, *args):
+        """Run a worker function in the executor of a worker without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executors[worker_num], function, *args)
+
+    async def start_workers(self) -> None:
+        """Start worker processes, so the first matches do not wait for them."""
+        self.worker_pids = list(await asyncio.gather(*[self.run_in_worker(i, worker_get_pid)
+                                                       for i in range(len(self.executors))]))
+
+    def shutdown(self) -> None:
+        """Stop worker processes (or the worker thread), matches hosted by them are dropped."""
+        for executor in self.executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def create_match(self, spellbook_code: str, match_players_init: list[dict[str, str | int]],
+                           match_id: int=0) -> dict:
+        """Create a match on the least loaded worker.
+
+        Arguments:
+            spellbook_code (str): spellbook code, f.e. "Warlocks"
+            match_players_init (list): a list with basic participant info
+            match_id (int, optional): match ID, assigned by the server if 0
+
+        Returns:
+            dict: match state (see get_match_state())
+        """
+        if match_id <= 0:
+            while self.next_match_id in self.matches:
+                self.next_match_id += 1
+            match_id = self.next_match_id
+            self.next_match_id += 1
+        if match_id in self.matches:
+            raise ValueError(f'Match {match_id} already exists')
+        worker_num = min(range(len(self.executors)), key=lambda i: self.worker_matches[i])
+        match = HostedMatch(match_id, worker_num, spellbook_code)
+        self.matches[match_id] = match
+        self.worker_matches[worker_num] += 1
+        try:
+            state: dict = await self.run_in_worker(worker_num, worker_host_match, match_id, spellbook_code,
+                                                   match_players_init, self.lang_code)
+        except Exception:
+            del self.matches[match_id]
+            self.worker_matches[worker_num] -= 1
+            raise
+        self.worker_matches_peak[worker_num] = max(self.worker_matches_peak[worker_num],
+                                                   self.worker_matches[worker_num])
+        self.matches_created += 1
+        match.turn_num = state['turnNum']
+        match.active_ids = state['activeIDs']
+        match.waiting_ids = set(state['activeIDs'])
+        return state
+
+    def get_match(self, match_id: int) -> HostedMatch:
+        """Return a hosted match.
+
+        Arguments:
+            match_id (int): match ID
+
+        Returns:
+            object: HostedMatch instance
+        """
+        match = self.matches.get(match_id)
+        if match is None:
+            raise ValueError(f'Unknown match {match_id}')
+        return match
+
+    def submit_order(self, data: dict) -> dict:
+        """Accept an order for the current turn of a match.
+
+        Orders are validated the same way as in the worker (see Orders.validate_json_order()).
+        When the last order of the turn arrives, the turn is processed in the background
+        and subscribers of the match are notified (see resolve_turn()).
+
+        Arguments:
+            data (dict): JSON order
+
+        Returns:
+            dict: match ID, turn number and participant ID of the accepted order
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Order is not an object')
+        match = self.get_match(data.get('matchID', 0))
+        if match.resolve_task is not None:
+            raise ValueError(f'Turn {match.turn_num} of match {match.match_id} is being processed')
+        validation_error_codes = match.orders.validate_json_order(data, match.match_id, match.turn_num,
+                                                                  sorted(match.waiting_ids))
+        if match.orders.ORDER_INVALID_TURN_NUM in validation_error_codes:
+            raise ValueError(f"Match {match.match_id} expects orders for turn {match.turn_num}, "
+                             f"not {data.get('turnNum')}")
+        if match.orders.ORDER_INVALID_PARTICIPANT_ID in validation_error_codes:
+            raise ValueError(f"No order is expected from participant {data.get('participantID')} "
+                             f"on turn {match.turn_num}")
+        if validation_error_codes:
+            raise ValueError(f'Invalid order, error codes {validation_error_codes}')
+        for field in ['gestureLH', 'gestureRH']:
+            if field in data and not isinstance(data[field], str):
+                raise ValueError(f'{field} is not a string')
+        participant_id = int(data['participantID'])
+        match.waiting_ids.discard(participant_id)
+        match.turn_orders.append(data)
+        if not match.waiting_ids:
+            task = asyncio.get_running_loop().create_task(self.resolve_turn(match, time.perf_counter()))
+            match.resolve_task = task
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return {'matchID': match.match_id, 'turnNum': match.turn_num, 'participantID': participant_id}
+
+    async def resolve_turn(self, match: HostedMatch, last_order_time: float) -> None:
+        """Process the turn of a match in its worker and notify subscribers.
+
+        If some orders turn out to be invalid, the match waits for new orders of these participants.
+        If the worker fails to process the turn, the match is back at the start of the turn (see worker_resolve_turn()),
+        it waits for new orders of all participants whose orders were sent, and subscribers get a turn message
+        with the error.
+
+        Arguments:
+            match (object): HostedMatch instance
+            last_order_time (float): perf_counter() time of the last order of the turn
+        """
+        orders = match.turn_orders
+        match.turn_orders = []
+        try:
+            state: dict = await self.run_in_worker(match.worker_num, worker_resolve_turn, match.match_id, orders)
+        except Exception as e:
+            match.waiting_ids |= {int(data['participantID']) for data in orders}
+            state = {'matchID': match.match_id, 'turnNum': match.turn_num, 'finished': False,
+                     'activeIDs': match.active_ids, 'log': {}, 'resolvedTurnNum': 0,
+                     'missingIDs': sorted(match.waiting_ids), 'error': f'Turn {match.turn_num} failed: {e}'}
+        else:
+            match.turn_num = state['turnNum']
+            match.active_ids = state['activeIDs']
+            if state['resolvedTurnNum']:
+                self.turns += 1
+                self.turn_latencies.append((time.perf_counter() - last_order_time) * 1000)
+                self.resolve_times.append(state['resolveSeconds'] * 1000)
+                match.waiting_ids = set(state['activeIDs'])
+            else:
+                match.waiting_ids = set(state['missingIDs'])
+            if state['finished']:
+                match.finished = True
+                self.matches_finished += 1
+                self.worker_matches[match.worker_num] -= 1
+                # The match may have been closed while the turn was processed (see close_match())
+                self.matches.pop(match.match_id, None)
+        finally:
+            match.resolve_task = None
+        await self.notify(match, {'type': 'turn', **state})
+
+    async def close_match(self, match_id: int) -> None:
+        """Stop hosting an unfinished match.
+
+        A turn that is being processed is finished first, subscribers are notified of it as usual.
+
+        Arguments:
+            match_id (int): match ID
+        """
+        match = self.get_match(match_id)
+        del self.matches[match_id]
+        if match.resolve_task is not None:
+            await asyncio.gather(match.resolve_task, return_exceptions=True)
+        if match.finished:
+            return
+        match.finished = True
+        self.worker_matches[match.worker_num] -= 1
+        await self.run_in_worker(match.worker_num, worker_close_match, match_id)
+
+    async def notify(self, match: HostedMatch, message: dict) -> None:
+        """Send a message to subscribers of a match, with logs for their POV only.
+
+        Arguments:
+            match (object): HostedMatch instance
+            message (dict): message with logs by POV ID (see get_match_state())
+        """
+        logs = message.pop('log', {})
+        for writer, pov_id in list(match.subscribers.items()):
+            try:
+                await self.send(writer, {**message, 'log': logs.get(str(pov_id), logs.get('0', []))})
+            except (ConnectionError, RuntimeError):
+                del match.subscribers[writer]
+
+    async def send(self, writer: asyncio.StreamWriter, message: dict) -> None:
+        """Send a JSON line to a client.
+
+        Arguments:
+            writer (object): asyncio.StreamWriter of the client connection
+            message (dict): message
+        """
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+
+    def get_stats(self) -> dict:
+        """Return server statistics: matches, turns, turn latency and matches per worker process.
+
+        Returns:
+            dict: statistics (latencies in milliseconds)
+        """
+        latencies = sorted(self.turn_latencies)
+
+        def percentile(values: list[float], share: float) -> float:
+            return values[min(len(values) - 1, int(len(values) * share))] if values else 0.0
+
+        return {'matchesHosted': len(self.matches),
+                'matchesCreated': self.matches_created,
+                'matchesFinished': self.matches_finished,
+                'turns': self.turns,
+                'latencyMs': {'mean': statistics.fmean(latencies) if latencies else 0.0,
+                              'p50': percentile(latencies, 0.5),
+                              'p95': percentile(latencies, 0.95),
+                              'p99': percentile(latencies, 0.99),
+                              'max': latencies[-1] if latencies else 0.0},
+                'resolveMs': {'mean': statistics.fmean(self.resolve_times) if self.resolve_times else 0.0},
+                'workers': [{'pid': self.worker_pids[i], 'matches': self.worker_matches[i],
+                             'peakMatches': self.worker_matches_peak[i]} for i in range(len(self.executors))]}
+
+    async def handle_request(self, writer: asyncio.StreamWriter, request: dict) -> dict:
+        """Handle a client request.
+
+        Requests (JSON objects with "type"):
+        - create: {"spellbook", "players", "matchID" (optional), "povID" (optional)} creates a match
+          and subscribes to it, the reply is the match state
+        - order: {"order"} accepts a JSON order and subscribes to the match with the POV of the participant
+        - subscribe: {"matchID", "povID" (optional, 0 - public)} subscribes to processed turns of a match
+        - close: {"matchID"} stops hosting a match
+        - stats: server statistics (see get_stats())
+        Subscribers get {"type": "turn"} messages with the match state and the log of processed turn,
+        or with "error" if the turn could not be processed (the orders listed in "missingIDs" are expected again).
+
+        Arguments:
+            writer (object): asyncio.StreamWriter of the client connection
+            request (dict): request
+
+        Returns:
+            dict: reply
+        """
+        request_type = request.get('type')
+        if request_type == 'create':
+            state = await self.create_match(request.get('spellbook', ''), request.get('players', []),
+                                            request.get('matchID', 0))
+            self.get_match(state['matchID']).subscribers[writer] = request.get('povID', 0)
+            state['log'] = state['log'].get(str(request.get('povID', 0)), [])
+            return {'type': 'created', **state}
+        if request_type == 'order':
+            reply = self.submit_order(request.get('order', {}))
+            match = self.matches.get(reply['matchID'])
+            if match is not None and writer not in match.subscribers:
+                match.subscribers[writer] = reply['participantID']
+            return {'type': 'accepted', **reply}
+        if request_type == 'subscribe':
+            self.get_match(request.get('matchID', 0)).subscribers[writer] = request.get('povID', 0)
+            return {'type': 'subscribed', 'matchID': request.get('matchID')}
+        if request_type == 'close':
+            await self.close_match(request.get('matchID', 0))
+            return {'type': 'closed', 'matchID': request.get('matchID')}
+        if request_type == 'stats':
+            return {'type': 'stats', **self.get_stats()}
+        raise ValueError(f'Unknown request type {request_type}')
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a client connection: one JSON request per line, one reply per request.
+
+        Arguments:
+            reader (object): asyncio.StreamReader of the client connection
+            writer (object): asyncio.StreamWriter of the client connection
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('Request is not an object')
+                    reply = await self.handle_request(writer, request)
+                except Exception as e:
+                    reply = {'type': 'error', 'error': str(e)}
+                await self.send(writer, reply)
+        except ConnectionError:
+            pass
+        finally:
+            for match in self.matches.values():
+                match.subscribers.pop(writer, None)
+            writer.close()
+
+    async def serve(self, host: str='127.0.0.1', port: int=0, path: str='') -> asyncio.AbstractServer:
+        """Start workers and listen for clients.
+
+        Arguments:
+            host (str, optional): TCP host
+            port (int, optional): TCP port, 0 picks a free port
+            path (str, optional): Unix socket path, used instead of TCP if set
+
+        Returns:
+            object: asyncio server
+        """
+        await self.start_workers()
+        if path:
+            return await asyncio.start_unix_server(self.handle_client, path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+class MatchClient:
+    """Client of MatchServer.
+
+    Replies come in the order of requests, turn notifications are queued by match ID.
+    """
+
+    def __init__(self) -> None:
+        """Init MatchClient (not connected)."""
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.replies: asyncio.Queue[dict] = asyncio.Queue()
+        self.turns: dict[int, asyncio.Queue[dict]] = {}
+        self.read_task: asyncio.Task | None = None
+
+    async def connect(self, host: str='127.0.0.1', port: int=0, path: str='') -> None:
+        """Connect to a server.
+
+        Arguments:
+            host (str, optional): TCP host
+            port (int, optional): TCP port
+            path (str, optional): Unix socket path, used instead of TCP if set
+        """
+        if path:
+            self.reader, self.writer = await asyncio.open_unix_connection(path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.read_task = asyncio.get_running_loop().create_task(self.read_messages())
+
+    async def read_messages(self) -> None:
+        """Read messages from the server and dispatch them to replies and turn queues."""
+        if self.reader is None:
+            raise ValueError('Client is not connected')
+        while line := await self.reader.readline():
+            message = json.loads(line)
+            if message.get('type') == 'turn':
+                self.get_turn_queue(message['matchID']).put_nowait(message)
+            else:
+                self.replies.put_nowait(message)
+        self.replies.put_nowait({'type': 'error', 'error': 'Connection closed'})
+
+    def get_turn_queue(self, match_id: int) -> asyncio.Queue[dict]:
+        """Return the queue of turn notifications of a match.
+
+        Arguments:
+            match_id (int): match ID
+
+        Returns:
+            object: asyncio.Queue
+        """
+        return self.turns.setdefault(match_id, asyncio.Queue())
+
+    async def request(self, message: dict) -> dict:
+        """Send a request and wait for the reply.
+
+        Arguments:
+            message (dict): request (see MatchServer.handle_request())
+
+        Returns:
+            dict: reply
+        """
+        if self.writer is None:
+            raise ValueError('Client is not connected')
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+        return await self.replies.get()
+
+    async def next_turn(self, match_id: int) -> dict:
+        """Wait for the next turn notification of a match.
+
+        Arguments:
+            match_id (int): match ID
+
+        Returns:
+            dict: turn notification
+        """
+        return await self.get_turn_queue(match_id).get()
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self.writer is not None:
+            self.writer.close()
+        if self.read_task is not None:
+            await asyncio.gather(self.read_task, return_exceptions=True)
+
+
+async def play_load_test_match(client: MatchClient, spellbook_code: str, num_players: int, seed: int,
+                               max_turns: int) -> int:
+    """Play a match with random orders for all participants through a client.
+
+    Arguments:
+        client (object): connected MatchClient instance
+        spellbook_code (str): spellbook code, f.e. "Warlocks"
+        num_players (int): number of participants
+        seed (int): random seed of orders
+        max_turns (int): the last turn to play, longer matches are closed
+
+    Returns:
+        int: number of processed turns
+    """
+    rng = random.Random(seed)
+    players = [{'player_id': i + 1, 'player_name': f'LoadWarlock{i + 1}', 'gender': i % 3, 'team_id': i + 1,
+                'lang': 'en'} for i in range(num_players)]
+    state = await client.request({'type': 'create', 'spellbook': spellbook_code, 'players': players})
+    if state['type'] == 'error':
+        raise ValueError(state['error'])
+    match_id = state['matchID']
+    turns = 0
+    while not state['finished']:
+        if state['turnNum'] > max_turns:
+            await client.request({'type': 'close', 'matchID': match_id})
+            break
+        for participant_id in state['activeIDs']:
+            gestures = ('P', 'P')
+            # P/P surrenders, load test matches should last
+            while gestures == ('P', 'P'):
+                gestures = (rng.choice(LOAD_TEST_GESTURES), rng.choice(LOAD_TEST_GESTURES))
+            reply = await client.request({'type': 'order', 'order': {
+                'matchID': match_id, 'turnNum': state['turnNum'], 'participantID': participant_id,
+                'gestureLH': gestures[0], 'gestureRH': gestures[1]}})
+            if reply['type'] == 'error':
+                raise ValueError(reply['error'])
+        state = await client.next_turn(match_id)
+        turns += 1 if state['resolvedTurnNum'] else 0
+    return turns
+
+
+async def run_load_test(matches: int, spellbook_code: str='Warlocks', num_players: int=2, workers: int | None=None,
+                        max_turns: int=50, path: str='') -> dict:
+    """Start a server and play concurrent matches against it, one client connection per match.
+
+    Arguments:
+        matches (int): number of concurrent matches
+        spellbook_code (str, optional): spellbook code
+        num_players (int, optional): number of participants per match
+        workers (int, optional): number of worker processes (see MatchServer)
+        max_turns (int, optional): the last turn to play in a match
+        path (str, optional): Unix socket path, TCP on a free local port is used if empty
+
+    Returns:
+        dict: server statistics (see MatchServer.get_stats()) with wall time and turns per second
+    """
+    server = MatchServer(workers)
+    listener = await server.serve(path=path)
+    port = 0 if path else listener.sockets[0].getsockname()[1]
+    try:
+        clients = [MatchClient() for _ in range(matches)]
+        await asyncio.gather(*[client.connect(port=port, path=path) for client in clients])
+        start_time = time.perf_counter()
+        turns = await asyncio.gather(*[play_load_test_match(client, spellbook_code, num_players, seed, max_turns)
+                                       for seed, client in enumerate(clients)])
+        duration = time.perf_counter() - start_time
+        await asyncio.gather(*[client.close() for client in clients])
+        stats = server.get_stats()
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.shutdown()
+    return {**stats, 'duration': duration, 'turnsPerSecond': sum(turns) / duration if duration else 0.0}
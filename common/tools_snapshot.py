@@ -0,0 +1,134 @@
+import io
+import pickle
+import struct
+import zlib
+from common.tools_registry import create_match, get_localization
+from ruleset_core.class_instrumentation import Instrumentation
+
+
+# Snapshot layout: header (magic, format version, lengths of spellbook code and language code),
+# spellbook code and language code (ascii, language code is empty if the match was never rendered),
+# then zlib-compressed pickle of (match data state, spellbook state, orders state)
+SNAPSHOT_MAGIC = b'SWSNAP'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct('>6sBBB')
+
+
+def get_shared_objects(match_spellbook: object, lang_code: str) -> dict[tuple, object]:
+    """Collect objects that are shared between matches and must not be stored in snapshots.
+
+    These are spell templates and their patterns (see SpellBook.init_spells()) and localized texts
+    (see get_localization()). Snapshots refer to them by key, and restore resolves keys to
+    the same objects of the current process.
+
+    Arguments:
+        match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+        lang_code (str): language of rendered match output, empty if the match was not rendered
+
+    Returns:
+        dict: key -> shared object
+    """
+    shared: dict[tuple, object] = {}
+    for spell in match_spellbook.spells:
+        shared[('spell', spell.id)] = spell
+        for position, pattern in enumerate(spell.patterns):
+            shared[('pattern', spell.id, position)] = pattern
+    if lang_code:
+        for name, value in get_localization(match_spellbook.spellbook_code, lang_code).items():
+            shared[('loc', name)] = value
+    return shared
+
+
+class SnapshotPickler(pickle.Pickler):
+    """Pickler that stores shared objects as references (see get_shared_objects())."""
+
+    def __init__(self, file: io.BytesIO, shared: dict[tuple, object]) -> None:
+        """Init SnapshotPickler.
+
+        Arguments:
+            file (object): binary stream to write to
+            shared (dict): key -> shared object
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_keys = {id(obj): key for key, obj in shared.items()}
+
+    def persistent_id(self, obj: object) -> tuple | None:
+        return self.shared_keys.get(id(obj))
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Unpickler that resolves references to shared objects (see get_shared_objects())."""
+
+    def __init__(self, file: io.BytesIO, shared: dict[tuple, object]) -> None:
+        """Init SnapshotUnpickler.
+
+        Arguments:
+            file (object): binary stream to read from
+            shared (dict): key -> shared object
+        """
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid: tuple) -> object:
+        if pid not in self.shared:
+            raise pickle.UnpicklingError(f'Unknown shared object {pid}')
+        return self.shared[pid]
+
+
+def snapshot_match(match_data: object, match_spellbook: object, match_orders: object) -> bytes:
+    """Save the state of a match to bytes.
+
+    Meant to be called between turns, f.e. after process_match_turn() and set_current_turn().
+    Caches (rendered log strings, visibility matrices) and instrumentation are not stored.
+
+    Arguments:
+        match_data (object): instance of spellbook-specific MatchData-inherited object
+        match_spellbook (object): instance of spellbook-specific SpellBook-inherited object
+        match_orders (object): instance of spellbook-specific Orders-inherited object
+
+    Returns:
+        bytes: snapshot
+    """
+    spellbook_code: bytes = match_spellbook.spellbook_code.encode('ascii')
+    lang_code: bytes = match_data.lang_code.encode('ascii')
+    buffer = io.BytesIO()
+    SnapshotPickler(buffer, get_shared_objects(match_spellbook, match_data.lang_code)).dump(
+        (match_data.get_snapshot_state(), match_spellbook.get_snapshot_state(), match_orders.get_snapshot_state()))
+    return (SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(spellbook_code), len(lang_code))
+            + spellbook_code + lang_code + zlib.compress(buffer.getvalue()))
+
+
+def restore_match(snapshot: bytes, instrumentation: Instrumentation | None=None) -> tuple:
+    """Create match objects from a snapshot.
+
+    The payload of a snapshot is a pickle, and unpickling can run arbitrary code,
+    so snapshots must only come from trusted storage (never from clients).
+
+    Arguments:
+        snapshot (bytes): result of snapshot_match()
+        instrumentation (object, optional): Instrumentation instance to collect timings and counters into
+
+    Returns:
+        tuple: instances of spellbook-specific MatchData, SpellBook and Orders classes
+    """
+    if len(snapshot) < SNAPSHOT_HEADER.size:
+        raise ValueError('Snapshot is too short')
+    magic, version, code_length, lang_length = SNAPSHOT_HEADER.unpack_from(snapshot)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError('Not a match snapshot')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}')
+    offset = SNAPSHOT_HEADER.size
+    spellbook_code = snapshot[offset:offset + code_length].decode('ascii')
+    offset += code_length
+    lang_code = snapshot[offset:offset + lang_length].decode('ascii')
+    payload = zlib.decompress(snapshot[offset + lang_length:])
+
+    match_data, match_spellbook, match_orders = create_match(0, spellbook_code, instrumentation)
+    unpickler = SnapshotUnpickler(io.BytesIO(payload), get_shared_objects(match_spellbook, lang_code))
+    match_data_state, spellbook_state, orders_state = unpickler.load()
+
+    match_data.set_snapshot_state(match_data_state)
+    match_spellbook.set_snapshot_state(spellbook_state)
+    match_orders.set_snapshot_state(orders_state)
+    return match_data, match_spellbook, match_orders
@@ -0,0 +1,196 @@
+import ast
+import contextlib
+import importlib
+import inspect
+import io
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+
+MATCH_ID = 123456
+LANG_CODE = 'en'
+# -1 sees everything (p1 | p2 | ...), 0 sees only public (p1 & p2 & ...), 1.. see from participant perspective
+DEF_POV_ID = -1
+# 0 - no output code runs, 1 - output code runs but is silent, 2 - output code runs normally
+SILENT_RUN = 1
+
+AVAILABLE_SPELLBOOKS = {
+    1: {'code': 'Warlocks', 'title': "RavenBlack's Warlocks - ParaFC Maladroit"},
+    2: {'code': 'Spellbinder', 'title': "Bartle's Spellbinder - Original Ruleset"},
+    3: {'code': 'TBD', 'title': "TBD"},
+}
+
+PLAYERS_DUEL: list[dict[str, str | int]] = [
+    {'player_id': 2, 'player_name': 'TestWarlock',
+        'gender': 1, 'team_id': 1, 'lang': 'en'},
+    {'player_id': 3, 'player_name': 'TestFoe',
+        'gender': 0, 'team_id': 2, 'lang': 'en'},
+]
+PLAYERS_TEAMS: list[dict[str, str | int]] = PLAYERS_DUEL + [
+    {'player_id': 4, 'player_name': 'TestAlly',
+        'gender': 2, 'team_id': 1, 'lang': 'en'},
+    {'player_id': 5, 'player_name': 'TestFoe2',
+        'gender': 2, 'team_id': 2, 'lang': 'en'},
+]
+PLAYERS_MELEE: list[dict[str, str | int]] = PLAYERS_DUEL + [
+    {'player_id': 4, 'player_name': 'TestFoe2',
+        'gender': 2, 'team_id': 3, 'lang': 'en'},
+]
+
+# Groups of tests in the order of the test suite: module, run_* function that calls the tests,
+# spellbook (key of AVAILABLE_SPELLBOOKS) and players setup
+TEST_GROUPS: list[dict] = [
+    {'module': 'tests_core.tests_engine_core', 'runner': 'run_common_tests',
+     'spellbook': 1, 'players': PLAYERS_DUEL},
+    {'module': 'tests_warlocks.tests_spellbook_warlocks', 'runner': 'run_warlocks_tests',
+     'spellbook': 1, 'players': PLAYERS_DUEL},
+    {'module': 'tests_warlocks.tests_spellbook_warlocks', 'runner': 'run_warlocks_attack_seed_test',
+     'spellbook': 1, 'players': PLAYERS_TEAMS},
+    {'module': 'tests_core.tests_engine_core', 'runner': 'run_common_tests',
+     'spellbook': 2, 'players': PLAYERS_DUEL},
+    {'module': 'tests_spellbinder.tests_spellbook_spellbinder', 'runner': 'run_spellbinder_tests',
+     'spellbook': 2, 'players': PLAYERS_DUEL},
+    {'module': 'tests_spellbinder.tests_spellbook_spellbinder', 'runner': 'run_spellbinder_tests_melee',
+     'spellbook': 2, 'players': PLAYERS_MELEE},
+]
+
+
+def get_group_args(group: dict) -> tuple:
+    """Return arguments of run_* and test_* functions for a test group.
+
+    Arguments:
+        group (dict): test group, see TEST_GROUPS
+
+    Returns:
+        tuple: available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run
+    """
+    return (AVAILABLE_SPELLBOOKS, group['spellbook'], MATCH_ID, group['players'], LANG_CODE, DEF_POV_ID, SILENT_RUN)
+
+
+def run_tests_sequential(groups: list[dict] | None=None) -> None:
+    """Run test groups one by one in the current process, stopping at the first failure.
+
+    Arguments:
+        groups (list, optional): test groups (default: TEST_GROUPS)
+    """
+    for group in groups or TEST_GROUPS:
+        runner = getattr(importlib.import_module(group['module']), group['runner'])
+        runner(*get_group_args(group))
+
+
+def discover_tests(groups: list[dict] | None=None) -> list[dict]:
+    """Find test_* functions called by run_* functions of test groups.
+
+    Calls are read from the source of run_* functions, so tests keep the order (and repetitions)
+    of the sequential suite and get players setup of their group.
+
+    Arguments:
+        groups (list, optional): test groups (default: TEST_GROUPS)
+
+    Returns:
+        list: test tasks {'module', 'function', 'group'}
+    """
+    tasks = []
+    for group in groups or TEST_GROUPS:
+        tree = ast.parse(inspect.getsource(importlib.import_module(group['module'])))
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name == group['runner']:
+                for call in ast.walk(node):
+                    if (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+                            and call.func.id.startswith('test_')):
+                        tasks.append({'module': group['module'], 'function': call.func.id, 'group': group})
+    return tasks
+
+
+def run_test_task(task: dict) -> dict:
+    """Run a single test function and collect its result.
+
+    Output of the test (f.e. 'Testing ...' lines) is captured, not printed.
+
+    Arguments:
+        task (dict): test task, see discover_tests()
+
+    Returns:
+        dict: test result with pass / fail flag, error traceback and duration
+    """
+    result = {'module': task['module'],
+              'function': task['function'],
+              'runner': task['group']['runner'],
+              'passed': False,
+              'error': '',
+              'duration': 0.0}
+    start_time = time.perf_counter()
+    try:
+        test_function = getattr(importlib.import_module(task['module']), task['function'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            test_function(*get_group_args(task['group']))
+        result['passed'] = True
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['duration'] = time.perf_counter() - start_time
+    return result
+
+
+def run_tests_parallel(tasks: list[dict], workers: int | None=None) -> dict:
+    """Run test tasks across a pool of worker processes.
+
+    Every test replays its own JSON file with its own match objects, so tests are independent
+    and can run in any process.
+
+    Arguments:
+        tasks (list): test tasks, see discover_tests()
+        workers (int, optional): number of worker processes, defaults to the number of CPUs;
+            1 runs all tests in the current process
+
+    Returns:
+        dict: summary and a list of test results, in the same order as tasks
+    """
+    start_time = time.perf_counter()
+    if workers == 1 or len(tasks) < 2:
+        results = [run_test_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(run_test_task, tasks, chunksize=chunksize))
+
+    passed = sum(1 for r in results if r['passed'])
+    return {'summary': {'total': len(results),
+                        'passed': passed,
+                        'failed': len(results) - passed,
+                        'test_duration': sum(r['duration'] for r in results),
+                        'duration': time.perf_counter() - start_time},
+            'results': results}
+
+
+def format_test_summary(test_results: dict, slowest: int=10) -> list[str]:
+    """Format results of run_tests_parallel() as a summary table.
+
+    The table lists failed tests (with the last line of their traceback) and the slowest tests,
+    followed by totals.
+
+    Arguments:
+        test_results (dict): results of run_tests_parallel()
+        slowest (int, optional): number of slowest tests to list
+
+    Returns:
+        list: text lines
+    """
+    lines = []
+    results = test_results['results']
+    failed = [r for r in results if not r['passed']]
+    if failed:
+        lines.append('FAILED:')
+        for r in failed:
+            error_lines = r['error'].strip().splitlines()
+            lines.append(f"  {r['function']:<60} {r['duration'] * 1000:>9.1f} ms  "
+                         f"{error_lines[-1] if error_lines else ''}")
+    if slowest > 0:
+        lines.append('SLOWEST:')
+        for r in sorted(results, key=lambda r: r['duration'], reverse=True)[:slowest]:
+            lines.append(f"  {r['function']:<60} {r['duration'] * 1000:>9.1f} ms")
+    summary = test_results['summary']
+    lines.append(f"{summary['total']} tests: {summary['passed']} passed, {summary['failed']} failed "
+                 f"in {summary['duration']:.2f}s (sum of test durations {summary['test_duration']:.2f}s)")
+    return lines
@@ -1,4 +1,4 @@
-from typing import Final
+from typing import Final, Self
 
 
 class Actor:
@@ -14,6 +14,8 @@ class Actor:
     PLAYER_NO_HAND_ID: Final[int] = 0
     PLAYER_LEFT_HAND_ID: Final[int] = 1
     PLAYER_RIGHT_HAND_ID: Final[int] = 2
+    # Names of per-turn TurnTable attributes, forked by fork()
+    TURN_TABLES: tuple[str, ...] = ()
 
     def __init__(self, actor_type: int, hp: int, max_hp: int) -> None:
         """Init Actor."""
@@ -24,6 +26,25 @@ class Actor:
         self.is_alive: bool = True
         self.gender: int = -1
 
+    def fork(self, turn_num: int) -> Self:
+        """Return an independent copy of the actor for a forked match (see MatchData.fork()).
+
+        Attributes are copied as they are, except per-turn tables (see TURN_TABLES),
+        which are forked with TurnTable.fork(). Objects stored in the tables (f.e. banked spells)
+        are shared with the copy, so they are never changed once stored.
+
+        Arguments:
+            turn_num (int): current turn of the match, turns before it are shared with the copy
+
+        Returns:
+            object: an instance of the same class
+        """
+        actor = object.__new__(type(self))
+        actor.__dict__.update(self.__dict__)
+        for name in self.TURN_TABLES:
+            setattr(actor, name, getattr(self, name).fork(turn_num))
+        return actor
+
     def set_actor_id(self, actor_id: int) -> None:
         """Set actor ID.
 
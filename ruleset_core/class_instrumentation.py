@@ -0,0 +1,100 @@
+import time
+from contextlib import nullcontext
+
+
+# Context manager returned by MatchData.measure() when instrumentation is disabled
+NO_MEASURE = nullcontext()
+
+
+class StepTimer:
+    """Context manager that adds wall time and a call to a named timing of Instrumentation.
+
+    There is one timer per name, reused for every call. Phases and steps of a turn
+    do not call themselves recursively, so a single start time per name is enough.
+    """
+
+    __slots__ = ('timing', 'start')
+
+    def __init__(self, timing: list) -> None:
+        """Init StepTimer.
+
+        Arguments:
+            timing (list): [number of calls, total seconds], updated on exit
+        """
+        self.timing = timing
+        self.start = 0.0
+
+    def __enter__(self) -> 'StepTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        timing = self.timing
+        timing[1] += time.perf_counter() - self.start
+        timing[0] += 1
+
+
+class Instrumentation:
+    """Wall time and call counts of turn phases and steps, and counters of hot operations.
+
+    Disabled by default: MatchData, SpellBook and Orders keep instrumentation = None and only check
+    for None before counting, so the engine pays a single comparison per instrumented operation.
+    To enable, pass an instance to create_match() (or assign it to the instrumentation attribute
+    of the match objects), play the match, then read get_report(). One instance can collect
+    data of many matches.
+
+    Timings are named after phases ('startup', 'cast', 'attack', 'cleanup') and cast steps
+    (f.e. 'cast.1.3_match_spell_pattern'). Counters:
+        pattern_searches - gesture histories matched against spell patterns
+        actor_lookups - participants and monsters looked up by ID
+        order_lookups - orders looked up by turn and participant
+        log_appends - match log entries added
+    """
+
+    def __init__(self) -> None:
+        """Init Instrumentation with no data."""
+        # Name -> [number of calls, total seconds]
+        self.timings: dict[str, list] = {}
+        self.timers: dict[str, StepTimer] = {}
+        self.counters: dict[str, int] = {}
+
+    def measure(self, name: str) -> StepTimer:
+        """Return a context manager that records time of a phase or step.
+
+        Arguments:
+            name (str): phase or step name
+
+        Returns:
+            object: StepTimer instance
+        """
+        timer = self.timers.get(name)
+        if timer is None:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timer = self.timers[name] = StepTimer(timing)
+        return timer
+
+    def count(self, name: str, amount: int=1) -> None:
+        """Increase a counter.
+
+        Arguments:
+            name (str): counter name
+            amount (int, optional): value to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        """Forget all collected data."""
+        for timing in self.timings.values():
+            timing[0] = 0
+            timing[1] = 0.0
+        self.counters.clear()
+
+    def get_report(self) -> dict:
+        """Return collected data.
+
+        Returns:
+            dict: {'timings': {name: {'calls': int, 'seconds': float}}, 'counters': {name: int}}
+        """
+        return {'timings': {name: {'calls': calls, 'seconds': seconds}
+                            for name, (calls, seconds) in self.timings.items()},
+                'counters': dict(self.counters)}
@@ -1,7 +1,14 @@
 import random
-from typing import Final, TypeVar, Generic
+from contextlib import AbstractContextManager
+from typing import Final, Generic, Self, TypeVar
 from ruleset_core.class_actor import Actor
-from common.tools_engine import import_name
+from ruleset_core.class_instrumentation import NO_MEASURE, Instrumentation, StepTimer
+from ruleset_core.class_matchlog import MatchLog
+from ruleset_core.class_spellmatcher import SpellMatchState
+from ruleset_core.class_texttemplate import TextTemplate, compile_text_templates
+from ruleset_core.class_turntable import TurnHistory
+from ruleset_core.class_visibility import VisibilityMatrix
+from common.tools_registry import get_localization
 
 
 P = TypeVar('P', bound=Actor)
@@ -65,6 +72,10 @@ class MatchData(Generic[P, M]):
         24: 'pronounHis',
         }
 
+    # Attributes that are not stored in match snapshots: caches that are rebuilt on demand
+    # and optional instrumentation (see get_snapshot_state())
+    SNAPSHOT_SKIPPED_ATTRIBUTES: tuple[str, ...] = ('rendered_log_strings', 'visibility_matrices',
+                                                    'current_visibility_matrix', 'instrumentation')
 
     def __init__(self, match_id: int) -> None:
         """Init MatchData.
@@ -78,14 +89,42 @@ class MatchData(Generic[P, M]):
 
         self.participant_list: list[P] = []
         self.monster_list: list[M] = []
-        self.match_log: list[dict] = []
+        # Indexes for actor lookups, updated in add_participant(), add_monster() and set_actor_alive()
+        self.participants_by_id: dict[int, P] = {}
+        self.monsters_by_id: dict[int, M] = {}
+        self.participants_by_hand_id: dict[int, P] = {}
+        self.monsters_by_turn_and_hand: dict[tuple[int, int], M] = {}
+        # Alive-only views, in the same order as participant_list and monster_list
+        self.alive_participants: dict[int, P] = {}
+        self.alive_monsters: dict[int, M] = {}
+        # Match log is stored column by column and indexed by turn, see MatchLog
+        self.match_log: MatchLog = MatchLog()
 
         self.monster_classes: dict[int, str] = {}
 
         self.monster_name_codes: dict[int, list[int]] = {}
         self.monster_names: dict[int, list[str]] = {}
-
-        self.match_gestures: dict[int, dict[int, dict[str, str]]] = {}
+        # Number of monsters of each type summoned so far, and the ordinal of each monster within its type
+        self.monster_type_counts: dict[int, int] = {}
+        self.monster_type_ordinals: dict[int, int] = {}
+        # Localized monster names by monster ID, reset in init_text_vars()
+        self.monster_display_names: dict[int, str] = {}
+        # Compiled text_strings, see init_text_vars()
+        self.text_templates: dict[str, TextTemplate] = {}
+        # Language of loaded text strings and log strings rendered in it, by (log_id, pov_id, lang_code)
+        self.lang_code = ''
+        self.rendered_log_strings: dict[tuple[int, int, str], str] = {}
+        # Visibility between participants by turn number, only for turns that cannot change anymore
+        self.visibility_matrices: TurnHistory[VisibilityMatrix] = TurnHistory()
+        # Visibility of a turn that can still change (the current turn of an ongoing match),
+        # cached with visibility flags of participants it was built for (see get_visibility_matrix())
+        self.current_visibility_matrix: tuple[int, tuple[int, ...], VisibilityMatrix] | None = None
+        # Optional timings and counters, see Instrumentation (None - disabled)
+        self.instrumentation: Instrumentation | None = None
+
+        self.match_gestures: dict[int, TurnHistory[dict[str, str]]] = {}
+        # Incremental gesture histories used for spell matching, by participant ID
+        self.spell_match_states: dict[int, SpellMatchState] = {}
         self.text_strings: dict[str, str] = {}
         self.spell_names: dict[int, str] = {}
         self.effect_names: dict[str, str] = {}
@@ -104,7 +143,36 @@ class MatchData(Generic[P, M]):
             new_participant.set_actor_id(self.get_next_participant_id())
             new_participant.set_hands_ids(self.DATA_HAND_ID_OFFSET)
             # Add participant to the match
-            self.participant_list.append(new_participant)
+            self.add_participant(new_participant)
+
+    def add_participant(self, participant: P) -> None:
+        """Add participant to the match and to the lookup indexes.
+
+        Arguments:
+            participant (object): an instance of Spellbook-specific Participant class with ID and hand IDs set
+        """
+        self.participant_list.append(participant)
+        self.participants_by_id[participant.id] = participant
+        self.participants_by_hand_id[participant.lh_id] = participant
+        self.participants_by_hand_id[participant.rh_id] = participant
+        if participant.is_alive:
+            self.alive_participants[participant.id] = participant
+
+    def add_monster(self, monster: M) -> None:
+        """Add monster to the match and to the lookup indexes.
+
+        Arguments:
+            monster (object): an instance of Spellbook-specific Monster class with ID set
+        """
+        self.monster_list.append(monster)
+        self.monsters_by_id[monster.id] = monster
+        # Only the first monster summoned by this hand on this turn can be targeted by hand ID
+        self.monsters_by_turn_and_hand.setdefault((monster.turn_created, monster.summoner_hand_id), monster)
+        if monster.is_alive:
+            self.alive_monsters[monster.id] = monster
+        # Ordinal within monster type is used to pick a name for the monster
+        self.monster_type_ordinals[monster.id] = self.monster_type_counts.get(monster.monster_type, 0)
+        self.monster_type_counts[monster.monster_type] = self.monster_type_ordinals[monster.id] + 1
 
     def add_gestures(self, participant_id: int, turn_num: int, gesture_lh: str, gesture_rh: str) -> None:
         """Add gestures to the match history, i.e. to self.match_gestures.
@@ -125,9 +193,22 @@ class MatchData(Generic[P, M]):
         }
 
         if participant_id not in self.match_gestures:
-            self.match_gestures.update({participant_id: {}})
+            self.match_gestures.update({participant_id: TurnHistory()})
         self.match_gestures[participant_id].update({turn_num: g})
 
+    def measure(self, name: str) -> StepTimer | AbstractContextManager:
+        """Return a context manager that records wall time of a turn phase or step.
+
+        Arguments:
+            name (str): phase or step name, f.e. 'cast' or 'cast.1.3_match_spell_pattern'
+
+        Returns:
+            object: StepTimer instance, or a no-op context manager if instrumentation is disabled
+        """
+        if self.instrumentation is None:
+            return NO_MEASURE
+        return self.instrumentation.measure(name)
+
     # GET functions
 
     def get_match_status_ongoing(self) -> bool:
@@ -237,13 +318,15 @@ class MatchData(Generic[P, M]):
             object: an instance of Spellbook-specific Participant or Monster class.
         """
         target: P | M | None = None
-        if actor_id in self.get_ids_participants(search_alive_only):
+        if actor_id in self.participants_by_id:
             target = self.get_participant_by_id(actor_id, search_alive_only)
-        elif actor_id in self.get_ids_monsters(search_alive_only):
+        elif actor_id in self.monsters_by_id:
             target = self.get_monster_by_id(actor_id, search_alive_only)
-        elif actor_id in self.get_ids_hands(search_alive_only):
-            target = self.get_monster_by_turn_and_hand(
-                self.current_turn, actor_id, search_alive_only)
+        elif actor_id in self.participants_by_hand_id:
+            participant = self.participants_by_hand_id[actor_id]
+            if (not search_alive_only) or participant.is_alive:
+                target = self.get_monster_by_turn_and_hand(
+                    self.current_turn, actor_id, search_alive_only)
         return target
 
     def get_ids_targets(self, search_alive_only: bool=True) -> list[int]:
@@ -268,11 +351,9 @@ class MatchData(Generic[P, M]):
         Returns:
             list: a list of integer IDs.
         """
-        plist = []
-        for p in self.participant_list:
-            if (not search_alive_only) or (search_alive_only and p.is_alive):
-                plist.append(p.id)
-        return plist
+        if search_alive_only:
+            return list(self.alive_participants)
+        return list(self.participants_by_id)
 
     def get_ids_opponents(self, participant_id: int, search_alive_only: bool=True) -> list[int]:
         """Return a list of all viable IDs of opponents.
@@ -338,10 +419,9 @@ class MatchData(Generic[P, M]):
             list: a list of integer IDs.
         """
         hlist = []
-        for p in self.participant_list:
-            if (not search_alive_only) or (search_alive_only and p.is_alive):
-                hlist.append(p.lh_id)
-                hlist.append(p.rh_id)
+        for p in (self.alive_participants.values() if search_alive_only else self.participant_list):
+            hlist.append(p.lh_id)
+            hlist.append(p.rh_id)
         return hlist
 
     def get_ids_monsters(self, search_alive_only: bool=True, monster_type: int=0) -> list[int]:
@@ -354,12 +434,10 @@ class MatchData(Generic[P, M]):
         Returns:
             A list of integer IDs.
         """
-        mlist = []
-        for m in self.monster_list:
-            if monster_type == 0 or m.monster_type == monster_type:
-                if (not search_alive_only) or (search_alive_only and m.is_alive):
-                    mlist.append(m.id)
-        return mlist
+        monsters = self.alive_monsters if search_alive_only else self.monsters_by_id
+        if monster_type == 0:
+            return list(monsters)
+        return [m.id for m in monsters.values() if m.monster_type == monster_type]
 
     def get_participant_by_id(self, participant_id: int, search_alive_only: bool=True) -> P | None:
         """Return an instance of SpellBook-specific subclass of Participant class.
@@ -371,12 +449,11 @@ class MatchData(Generic[P, M]):
         Returns:
             object: An instance of a SpellBook-specific subclass of Participant class.
         """
-        for p in self.participant_list:
-            if p.id == participant_id:
-                if (not search_alive_only) or (search_alive_only and p.is_alive):
-                    return p
-                else:
-                    break
+        if self.instrumentation is not None:
+            self.instrumentation.count('actor_lookups')
+        p = self.participants_by_id.get(participant_id)
+        if p is not None and ((not search_alive_only) or p.is_alive):
+            return p
         return None
 
     def get_monster_by_id(self, monster_id: int, search_alive_only: bool=True) -> M | None:
@@ -389,12 +466,11 @@ class MatchData(Generic[P, M]):
         Returns:
             object: An instance of a SpellBook-specific subclass of Monster class.
         """
-        for m in self.monster_list:
-            if m.id == monster_id:
-                if (not search_alive_only) or (search_alive_only and m.is_alive):
-                    return m
-                else:
-                    break
+        if self.instrumentation is not None:
+            self.instrumentation.count('actor_lookups')
+        m = self.monsters_by_id.get(monster_id)
+        if m is not None and ((not search_alive_only) or m.is_alive):
+            return m
         return None
 
     def get_monster_by_turn_and_hand(self, turn_num: int, hand_id: int, search_alive_only: bool=True) -> M | None:
@@ -410,12 +486,11 @@ class MatchData(Generic[P, M]):
         Returns:
             object: An instance of a SpellBook-specific subclass of Monster class.
         """
-        for m in self.monster_list:
-            if (m.summoner_hand_id == hand_id) and (m.turn_created == turn_num):
-                if (not search_alive_only) or (search_alive_only and m.is_alive):
-                    return m
-                else:
-                    break
+        if self.instrumentation is not None:
+            self.instrumentation.count('actor_lookups')
+        m = self.monsters_by_turn_and_hand.get((turn_num, hand_id))
+        if m is not None and ((not search_alive_only) or m.is_alive):
+            return m
         return None
 
     # SET functions
@@ -435,6 +510,7 @@ class MatchData(Generic[P, M]):
             turn_num (int): turn number
         """
         self.current_turn = turn_num
+        self.current_visibility_matrix = None
 
     def set_destroy_monster_now_by_id(self, monster_id: int) -> None:
         """Mark monster as dead.
@@ -442,11 +518,31 @@ class MatchData(Generic[P, M]):
         Arguments:
             monster_id (int): monster ID
         """
-        for m in self.monster_list:
-            if m.is_alive and (m.id == monster_id):
-                m.is_alive = False
-                m.turn_destroyed = self.current_turn
-                break
+        m = self.get_monster_by_id(monster_id)
+        if m is not None:
+            self.set_actor_alive(m, False)
+            m.turn_destroyed = self.current_turn
+
+    def set_actor_alive(self, actor: P | M, is_alive: bool) -> None:
+        """Kill or revive actor, keeping alive-only views up to date.
+
+        Arguments:
+            actor (object): an instance of Spellbook-specific Participant or Monster class
+            is_alive (bool): new value of is_alive flag
+        """
+        actor.is_alive = is_alive
+        if actor.type == Actor.ACTOR_TYPE_PLAYER:
+            actor_list: list = self.participant_list
+            alive_actors: dict = self.alive_participants
+        else:
+            actor_list = self.monster_list
+            alive_actors = self.alive_monsters
+        if not is_alive:
+            alive_actors.pop(actor.id, None)
+        elif actor.id not in alive_actors:
+            # Revived actors have to keep their place in the list order
+            alive_actors.clear()
+            alive_actors.update((a.id, a) for a in actor_list if a.is_alive)
 
     def set_destroy_monster_before_attack_by_id(self, monster_id: int) -> None:
         """Flag monster to die this turn before attacks.
@@ -456,11 +552,12 @@ class MatchData(Generic[P, M]):
         Arguments:
             monster_id (int): monster ID
         """
-        if monster_id in self.get_ids_monsters():
+        if monster_id in self.alive_monsters:
             m = self.get_monster_by_id(monster_id)
             if m is not None:
                 m.set_destroy_before_attack()
-        elif monster_id in self.get_ids_hands():
+        elif (monster_id in self.participants_by_hand_id
+                and self.participants_by_hand_id[monster_id].is_alive):
             m = self.get_monster_by_turn_and_hand(
                 self.current_turn, monster_id)
             if m is not None:
@@ -474,27 +571,20 @@ class MatchData(Generic[P, M]):
         Arguments:
             actor_id (int): actor ID
         """
-        for participant_id in self.get_ids_participants():
-            if participant_id == actor_id:
-                p = self.get_participant_by_id(participant_id)
-                if p is not None:
-                    p.set_destroy_eot()
-                return
+        if actor_id in self.alive_participants:
+            self.alive_participants[actor_id].set_destroy_eot()
+            return
 
-        for monster_id in self.get_ids_monsters():
-            if monster_id == actor_id:
-                m = self.get_monster_by_id(monster_id)
-                if m is not None:
-                    m.set_destroy_eot()
-                return
-
-        for hand_id in self.get_ids_hands():
-            if hand_id == actor_id:
-                m = self.get_monster_by_turn_and_hand(
-                    self.current_turn, hand_id)
-                if m is not None:
-                    m.set_destroy_eot()
-                return
+        if actor_id in self.alive_monsters:
+            self.alive_monsters[actor_id].set_destroy_eot()
+            return
+
+        if actor_id in self.participants_by_hand_id and self.participants_by_hand_id[actor_id].is_alive:
+            m = self.get_monster_by_turn_and_hand(
+                self.current_turn, actor_id)
+            if m is not None:
+                m.set_destroy_eot()
+            return
 
     def set_gestures(self, participant_id: int, turn_num: int, gesture_lh: str, gesture_rh: str) -> None:
         """Save gestures made by participant_id on turn_num.
@@ -513,12 +603,14 @@ class MatchData(Generic[P, M]):
 
         if participant_id in self.match_gestures:
             self.match_gestures[participant_id].update({turn_num: g})
+            # Previously added gestures were changed, so the matching history has to be rebuilt
+            self.spell_match_states.pop(participant_id, None)
 
     def kill_monsters_before_attack(self) -> None:
         """Set is_alive to False for monsters marked to be destroyed before attack phase."""
         for m in self.monster_list:
             if m.is_alive and m.destroy_before_attack:
-                m.is_alive = False
+                self.set_actor_alive(m, False)
                 m.turn_destroyed = self.current_turn
                 self.add_log_entry(self.LOG_ACTOR_DEATH, 'resultActorDies', actor_id=m.id)
 
@@ -526,7 +618,7 @@ class MatchData(Generic[P, M]):
         """Set is_alive to False for monsters marked to be destroyed in the end of turn."""
         for m in self.monster_list:
             if m.is_alive and (m.hp <= 0 or m.destroy_eot):
-                m.is_alive = False
+                self.set_actor_alive(m, False)
                 m.turn_destroyed = self.current_turn
                 self.add_log_entry(self.LOG_ACTOR_DEATH, 'resultActorDies', actor_id=m.id)
 
@@ -534,7 +626,7 @@ class MatchData(Generic[P, M]):
         """Set is_alive to False for participants marked to be destroyed in the end of turn."""
         for p in self.participant_list:
             if p.is_alive and (p.hp <= 0 or p.destroy_eot):
-                p.is_alive = False
+                self.set_actor_alive(p, False)
                 p.turn_destroyed = self.current_turn
                 self.add_log_entry(self.LOG_ACTOR_DEATH, 'resultActorDies', actor_id=p.id)
 
@@ -681,27 +773,80 @@ class MatchData(Generic[P, M]):
             hand_type (int, optional): hand type {1: left, 2: right}
             tmpstr (str, optional): a string, for edge cases
         """
-        log_entry = self.get_log_entry_template()
-        log_entry['log_id'] = len(self.match_log)
-        log_entry['match_id'] = self.match_id
-        log_entry['turn_num'] = self.current_turn
-        log_entry['str_type'] = str_type
-        log_entry['str_code'] = str_code
-        log_entry['actor_id'] = actor_id
-        log_entry['pronoun_owner_id'] = pronoun_owner_id
-        log_entry['target_id'] = target_id
-        log_entry['spell_id'] = spell_id
-        log_entry['attack_id'] = attack_id
-        log_entry['damage_amount'] = damage_amount
-        log_entry['hand_type'] = hand_type
-        log_entry['tmpstr'] = tmpstr
-
-        self.match_log.append(log_entry)
+        if self.instrumentation is not None:
+            self.instrumentation.count('log_appends')
+        self.match_log.append(self.match_id, self.current_turn, str_type, str_code, actor_id, pronoun_owner_id,
+                              target_id, spell_id, attack_id, damage_amount, hand_type, tmpstr)
+
+    # FORK functions
+
+    def fork(self) -> Self:
+        """Return an independent branch of the match, f.e. to process a turn with hypothetical orders.
+
+        The branch shares everything that does not change anymore: localized texts, spellbook data
+        and the history of finished turns. Per-turn tables of actors, the log, gesture histories
+        and cached visibility matrices are forked (see TurnTable.fork()), so that the branch refers to
+        turns before the current turn and copies only the current and later turns, and a fork costs
+        the same at any point of a match. Lookup indexes are rebuilt for the copied actors.
+        Rendered log strings are not copied, since log IDs of the branch may differ after the fork.
+
+        Returns:
+            object: an instance of the same MatchData-inherited class
+        """
+        match_data = object.__new__(type(self))
+        match_data.__dict__.update(self.__dict__)
+        turn_num = self.current_turn
+
+        participants = {p.id: p.fork(turn_num) for p in self.participant_list}
+        match_data.participant_list = list(participants.values())
+        match_data.participants_by_id = participants
+        match_data.participants_by_hand_id = {hand_id: participants[p.id]
+                                              for hand_id, p in self.participants_by_hand_id.items()}
+        match_data.alive_participants = {p_id: participants[p_id] for p_id in self.alive_participants}
+
+        monsters = {m.id: m.fork(turn_num) for m in self.monster_list}
+        match_data.monster_list = list(monsters.values())
+        match_data.monsters_by_id = {m_id: monsters[m_id] for m_id in self.monsters_by_id}
+        match_data.monsters_by_turn_and_hand = {key: monsters[m.id] for key, m in self.monsters_by_turn_and_hand.items()}
+        match_data.alive_monsters = {m_id: monsters[m_id] for m_id in self.alive_monsters}
+        match_data.monster_type_counts = self.monster_type_counts.copy()
+        match_data.monster_type_ordinals = self.monster_type_ordinals.copy()
+        match_data.monster_display_names = self.monster_display_names.copy()
+        match_data.monster_name_codes = self.monster_name_codes.copy()
+        match_data.monster_names = self.monster_names.copy()
+        match_data.monster_classes = self.monster_classes.copy()
+
+        match_data.match_log = self.match_log.fork(turn_num)
+        match_data.rendered_log_strings = {}
+        match_data.visibility_matrices = self.visibility_matrices.fork(turn_num)
+        # Gestures of a turn are replaced as a whole (see add_gestures()), so turn dictionaries are shared
+        match_data.match_gestures = {p_id: gestures.fork(turn_num) for p_id, gestures in self.match_gestures.items()}
+        match_data.spell_match_states = {p_id: state.fork() for p_id, state in self.spell_match_states.items()}
+        return match_data
+
+    # SNAPSHOT functions
+
+    def get_snapshot_state(self) -> dict:
+        """Return match state to be stored in a snapshot (see common/tools_snapshot.py).
+
+        Returns:
+            dict: attribute name -> value, for all attributes except SNAPSHOT_SKIPPED_ATTRIBUTES
+        """
+        return {name: value for name, value in vars(self).items() if name not in self.SNAPSHOT_SKIPPED_ATTRIBUTES}
+
+    def set_snapshot_state(self, state: dict) -> None:
+        """Restore match state from a snapshot into a new MatchData instance.
+
+        Arguments:
+            state (dict): result of get_snapshot_state()
+        """
+        self.__dict__.update(state)
 
     # OUTPUT functions
 
     def init_text_vars(self, text_strings_loc: dict, spell_names_loc: dict,
-                       effect_names_loc: dict, monster_names_loc: dict, monster_classes_loc: dict[int, str]) -> None:
+                       effect_names_loc: dict, monster_names_loc: dict, monster_classes_loc: dict[int, str],
+                       lang_code: str='', text_templates: dict[str, TextTemplate] | None=None) -> None:
         """Import localized text string patterns (for user's language).
 
         Patterns would later be formatted and used to display in-game messages.
@@ -716,10 +861,17 @@ class MatchData(Generic[P, M]):
             effect_names_loc (dict): effect names
             monster_names_loc (dict): list of names for each monster_type
             monster_classes_loc (dict): monster class names
+            lang_code (str, optional): language code, used to cache rendered log strings (no caching if empty)
+            text_templates (dict, optional): text_strings_loc already compiled with compile_text_templates()
         """
         self.text_strings = text_strings_loc
+        if text_templates is None:
+            text_templates = compile_text_templates(text_strings_loc)
+        self.text_templates = text_templates
+        self.lang_code = lang_code
         self.spell_names = spell_names_loc
         self.effect_names = effect_names_loc
+        self.monster_display_names = {}
 
         for monster_type in monster_names_loc:
             self.monster_names[monster_type] = monster_names_loc[monster_type]
@@ -742,32 +894,37 @@ class MatchData(Generic[P, M]):
             spellbook_code (str): selected spellbook code, f.e. "Warlocks"
             lang_code (str): code of the language to use for rendering (f.e. 'en')
         """
-        # Init text strings
-        core_name = 'ruleset_core.'
-        lib_name = 'ruleset_' + spellbook_code.lower() + '.'
+        # Localized texts are loaded and compiled once per process for each spellbook and language
+        loc = get_localization(spellbook_code, lang_code)
+        self.init_text_vars(loc['text_strings'], loc['spell_names'], loc['spell_effects'],
+                            loc['monster_names'], loc['monster_classes'], lang_code, loc['text_templates'])
 
-        """
-        We load common text strings from respective lang file, f.e. loc_common_en.
+    def get_visibility_matrix(self, turn_num: int) -> VisibilityMatrix:
+        """Return visibility between participants on a turn.
 
-        We load text strings from spellbook land file, f.e.:
-        from loc_warlocks_en import warlocks_text_strings_en,
-                                    warlocks_spell_names_en,
-                                    warlocks_spell_effects_en,
-                                    warlocks_monster_names_en,
-                                    warlocks_monster_classes_en
-        """
+        Matrices of turns that are over (or of any turn, if the match is finished) are cached,
+        since effects and states of such turns do not change anymore. The matrix of the current turn
+        is cached until the turn ends or Blindness, Invisibility or Timestop of a participant changes
+        on the turn (see VisibilityMatrix.get_visibility_flags()).
 
-        module_name = lib_name + 'loc_' + spellbook_code.lower() + '_' + lang_code.lower()
-        sb_code_l = spellbook_code.lower()
-        common_text_strings = import_name(core_name + 'loc_common_' + lang_code.lower(),
-                                          'common_text_strings_' + lang_code)
-        spellbook_text_strings = import_name(module_name, sb_code_l + '_text_strings_' + lang_code)
-        spellbook_spell_names = import_name(module_name, sb_code_l + '_spell_names_' + lang_code)
-        spellbook_spell_effects = import_name(module_name, sb_code_l + '_spell_effects_' + lang_code)
-        spellbook_monster_names = import_name(module_name, sb_code_l + '_monster_names_' + lang_code)
-        spellbook_monster_classes = import_name(module_name, sb_code_l + '_monster_classes_' + lang_code)
-        self.init_text_vars(common_text_strings | spellbook_text_strings, spellbook_spell_names,
-                            spellbook_spell_effects, spellbook_monster_names, spellbook_monster_classes)
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            object: VisibilityMatrix instance
+        """
+        if turn_num in self.visibility_matrices:
+            return self.visibility_matrices[turn_num]
+        if turn_num < self.current_turn or self.get_match_status_finished():
+            matrix = self.visibility_matrices[turn_num] = VisibilityMatrix(self.participant_list, turn_num)
+            return matrix
+        visibility_flags = VisibilityMatrix.get_visibility_flags(self.participant_list, turn_num)
+        cached = self.current_visibility_matrix
+        if cached is not None and cached[0] == turn_num and cached[1] == visibility_flags:
+            return cached[2]
+        matrix = VisibilityMatrix(self.participant_list, turn_num)
+        self.current_visibility_matrix = (turn_num, visibility_flags, matrix)
+        return matrix
 
     def get_log_string_by_log_id(self, log_id: int, turn_num: int, pov_id: int) -> str:
         """Format and output a log entry.
@@ -782,90 +939,81 @@ class MatchData(Generic[P, M]):
         Returns:
             string: formatted log string
         """
+        # Strings of turns that are over do not change anymore, so they are rendered once per POV and language
+        cache_key = (log_id, pov_id, self.lang_code)
+        if cache_key in self.rendered_log_strings:
+            return self.rendered_log_strings[cache_key]
+
         log_entry = self.match_log[log_id]
 
-        print_flag = True
         # If POV is global or log is not about gestures or log belongs to POV, then print
         if (pov_id == -1
                 or log_entry['str_type'] != 1
                 or log_entry['actor_id'] == pov_id):
             print_flag = True
-        # If we use non-participant vision (limited to only things everyone sees)
-        elif pov_id == 0:
-            search_alive_only = False
-            log_actor = self.get_participant_by_id(
-                log_entry['actor_id'], search_alive_only)
-            if log_actor is None:
-                print_flag = False
-            elif (log_actor.affected_by_invisibility(turn_num)
-                    or log_actor.affected_by_timestop(turn_num)):
-                print_flag = False
-            else:
-                print_flag = True
-                for participant in self.participant_list:
-                    if participant.affected_by_blindness(turn_num):
-                        print_flag = False
-                        break
-        # If we use POV of specific participant
+        # Otherwise check visibility between POV (or spectators for POV 0) and log actor
         else:
-            search_alive_only = False
-            pov_actor = self.get_participant_by_id(pov_id, search_alive_only)
-            log_actor = self.get_participant_by_id(
-                log_entry['actor_id'], search_alive_only)
-            if pov_actor is None or log_actor is None:
-                print_flag = False
-            elif (pov_actor.affected_by_blindness(turn_num)
-                    or log_actor.affected_by_invisibility(turn_num)
-                    or log_actor.affected_by_timestop(turn_num)):
-                print_flag = False
-            else:
-                print_flag = True
+            print_flag = self.get_visibility_matrix(turn_num).check_action_visibility(pov_id, log_entry['actor_id'])
 
+        strf = ''
         if print_flag:
-            strt = self.get_text_strings_by_code(log_entry['str_code'])
-            if strt:
-                actor_name = self.get_name_by_id(log_entry['actor_id'])
-                target_name = self.get_name_by_id(log_entry['target_id'])
-                attack_name = self.get_name_by_id(log_entry['attack_id'])
-                if log_entry['spell_id']:
-                    spell_name = self.spell_names[log_entry['spell_id']]
-                else:
-                    spell_name = ''
-                hand_name = ''
-                if log_entry['hand_type'] == Actor.PLAYER_LEFT_HAND_ID:
-                    hand_name = self.get_text_strings_by_code('nameLeftHand')
-                elif log_entry['hand_type'] == Actor.PLAYER_RIGHT_HAND_ID:
-                    hand_name = self.get_text_strings_by_code('nameRightHand')
-                a = self.get_actor_by_id(log_entry['pronoun_owner_id'], search_alive_only=False)
-                if a is not None:
-                    actor_gender = a.gender
-                    pronoun1form1_code = self.get_pronoun_code(actor_gender, self.PRONOUN_FORM_SUB)
-                    pronoun1form1_text = self.get_text_strings_by_code(pronoun1form1_code)
-                    pronoun1form2_code = self.get_pronoun_code(actor_gender, self.PRONOUN_FORM_OBJ)
-                    pronoun1form2_text = self.get_text_strings_by_code(pronoun1form2_code)
-                    pronoun1form3_code = self.get_pronoun_code(actor_gender, self.PRONOUN_FORM_DP)
-                    pronoun1form3_text = self.get_text_strings_by_code(pronoun1form3_code)
-                    pronoun1form4_code = self.get_pronoun_code(actor_gender, self.PRONOUN_FORM_IP)
-                    pronoun1form4_text = self.get_text_strings_by_code(pronoun1form4_code)
-                else:
-                    pronoun1form1_text = ''
-                    pronoun1form2_text = ''
-                    pronoun1form3_text = ''
-                    pronoun1form4_text = ''
-
-                strf = strt.format(name=actor_name,
-                                   pronoun1form1=pronoun1form1_text,
-                                   pronoun1form2=pronoun1form2_text,
-                                   pronoun1form3=pronoun1form3_text,
-                                   pronoun1form4=pronoun1form4_text,
-                                   targetname=target_name,
-                                   spellname=spell_name,
-                                   attackname=attack_name,
-                                   damage=log_entry['damage_amount'],
-                                   handname=hand_name,
-                                   tmpstr=log_entry['tmpstr'])
-                return strf
-        return ''
+            template = self.text_templates.get(log_entry['str_code'])
+            if template is not None and template.text:
+                strf = self.render_log_entry(template, log_entry)
+
+        if self.lang_code and (turn_num < self.current_turn or self.get_match_status_finished()):
+            self.rendered_log_strings[cache_key] = strf
+        return strf
+
+    def render_log_entry(self, template: TextTemplate, log_entry: dict) -> str:
+        """Format a log entry with a compiled localized template.
+
+        Only placeholders that are present in the template are calculated.
+
+        Arguments:
+            template (object): TextTemplate instance for the log entry string code
+            log_entry (dict): log entry
+
+        Returns:
+            string: formatted log string
+        """
+        fields = template.fields
+        values: dict[str, str | int] = {}
+        if 'name' in fields:
+            values['name'] = self.get_name_by_id(log_entry['actor_id'])
+        if 'targetname' in fields:
+            values['targetname'] = self.get_name_by_id(log_entry['target_id'])
+        if 'attackname' in fields:
+            values['attackname'] = self.get_name_by_id(log_entry['attack_id'])
+        if 'spellname' in fields:
+            if log_entry['spell_id']:
+                values['spellname'] = self.spell_names[log_entry['spell_id']]
+            else:
+                values['spellname'] = ''
+        if 'handname' in fields:
+            hand_name = ''
+            if log_entry['hand_type'] == Actor.PLAYER_LEFT_HAND_ID:
+                hand_name = self.get_text_strings_by_code('nameLeftHand')
+            elif log_entry['hand_type'] == Actor.PLAYER_RIGHT_HAND_ID:
+                hand_name = self.get_text_strings_by_code('nameRightHand')
+            values['handname'] = hand_name
+        if 'damage' in fields:
+            values['damage'] = log_entry['damage_amount']
+        if 'tmpstr' in fields:
+            values['tmpstr'] = log_entry['tmpstr']
+        pronoun_forms = {'pronoun1form1': self.PRONOUN_FORM_SUB,
+                         'pronoun1form2': self.PRONOUN_FORM_OBJ,
+                         'pronoun1form3': self.PRONOUN_FORM_DP,
+                         'pronoun1form4': self.PRONOUN_FORM_IP}
+        if not fields.isdisjoint(pronoun_forms):
+            a = self.get_actor_by_id(log_entry['pronoun_owner_id'], search_alive_only=False)
+            for placeholder, form_id in pronoun_forms.items():
+                if placeholder in fields:
+                    if a is not None:
+                        values[placeholder] = self.get_text_strings_by_code(self.get_pronoun_code(a.gender, form_id))
+                    else:
+                        values[placeholder] = ''
+        return template.render(values)
 
     def get_log_entries_by_turn(self, turn_num: int) -> list[dict]:
         """Filter match log for turn_num.
@@ -876,19 +1024,35 @@ class MatchData(Generic[P, M]):
         Returns:
             list: match log subset
         """
-        elist = []
-        for entry in self.match_log:
-            if entry['turn_num'] == turn_num:
-                elist.append(entry)
+        return self.match_log.get_entries_by_turn(turn_num)
 
-        return elist
+    def get_turn_log(self, turn_num: int, pov_id: int) -> list[str]:
+        """Return match log strings of a turn, the same as printed by print_match_log().
 
-    def print_match_log(self, pov_id: int, stay_silent: bool=False) -> None:
+        Arguments:
+            turn_num (int): turn number
+            pov_id (int): ID of participant to output for
+
+        Returns:
+            list: output strings (turn header, log strings and an empty line)
+        """
+        s = [self.get_text_strings_by_code('turnNum').format(tmpstr=turn_num)]
+        for log_id in self.match_log.get_ids_by_turn(turn_num):
+            output_string = self.get_log_string_by_log_id(log_id, turn_num, pov_id)
+            if output_string:
+                s.append(output_string)
+        s.append('')
+        return s
+
+    def print_match_log(self, pov_id: int, stay_silent: bool=False) -> list[str]:
         """Print match log.
 
         Arguments:
             pov_id (int): ID of participant to output for
             stay_silent (bool, optional): flag to omit actual prints
+
+        Returns:
+            list: output strings
         """
         if self.get_match_status_finished():
             last_turn = self.current_turn + 1
@@ -897,25 +1061,21 @@ class MatchData(Generic[P, M]):
 
         s = []
         for turn_num in range(0, last_turn):
-            s.append(self.get_text_strings_by_code(
-                'turnNum').format(tmpstr=turn_num))
-            turn_log = self.get_log_entries_by_turn(turn_num)
-            for entry in turn_log:
-                output_string = self.get_log_string_by_log_id(
-                    entry['log_id'], turn_num, pov_id)
-                if output_string:
-                    s.append(output_string)
-            s.append('')
+            s.extend(self.get_turn_log(turn_num, pov_id))
         if not stay_silent: 
             for ss in s:
                 print(ss)
+        return s
 
-    def print_actor_statuses(self, pov_id: int, stay_silent: bool=False) -> None:
+    def print_actor_statuses(self, pov_id: int, stay_silent: bool=False) -> list[str]:
         """Print actor statuses.
 
         Arguments:
             pov_id (int): ID of participant to output for
             stay_silent (bool, optional): flag to omit actual prints
+
+        Returns:
+            list: output strings
         """
         tstr = ''
         for i in range(0, self.current_turn + 1):
@@ -937,3 +1097,4 @@ class MatchData(Generic[P, M]):
         if not stay_silent: 
             for ss in s:
                 print(ss)
+        return s
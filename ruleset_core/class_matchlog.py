@@ -0,0 +1,237 @@
+from array import array
+from collections.abc import Iterator, Sequence
+from ruleset_core.class_turntable import TurnTable
+
+
+class MatchLog(Sequence):
+    """Columnar storage of match log entries.
+
+    Every integer field of log entries is kept in its own typed array, string codes are
+    stored as indexes into a table of unique codes, so a log entry costs a few dozens of bytes
+    instead of a dictionary. Entries are still available as dictionaries (see get_entry()),
+    with the same keys as MatchData.get_log_entry_template().
+
+    The log also keeps an index of turn number -> ranges of log IDs, updated on every append,
+    so that entries of a single turn can be fetched without scanning the whole log.
+
+    Entries are never changed once added, so a fork of the log (see fork()) refers to the entries
+    of the parent log and stores only entries added after the fork.
+    """
+
+    # Integer fields in the order of add_log_entry arguments, each stored in its own array
+    INT_FIELDS = ('turn_num', 'str_type', 'actor_id', 'pronoun_owner_id', 'target_id',
+                  'spell_id', 'attack_id', 'damage_amount', 'hand_type')
+
+    def __init__(self) -> None:
+        """Init MatchLog with empty columns."""
+        self.match_ids = array('q')
+        self.columns: dict[str, array] = {name: array('i') for name in self.INT_FIELDS}
+        # String codes are repeated a lot, so we store indexes into the table of unique codes.
+        # Codes are only added to the table, so it is shared with forks of the log
+        self.str_code_ids = array('i')
+        self.str_codes: list[str] = []
+        self.str_code_index: dict[str, int] = {}
+        self.tmpstrs: list[str] = []
+        # Turn number -> list of [first log ID, last log ID + 1] ranges
+        self.turn_ranges: dict[int, list[list[int]]] = {}
+        # Parent log of a fork, which stores entries with IDs below base_length (and their turn ranges before base_turn)
+        self.base: MatchLog | None = None
+        self.base_length = 0
+        self.base_turn = 0
+        # Length of the chain of parent logs
+        self.depth = 0
+        # The highest turn number of entries (entries of the parent log included)
+        self.last_turn = -1
+
+    def append(self, match_id: int, turn_num: int, str_type: int, str_code: str, actor_id: int=0,
+               pronoun_owner_id: int=0, target_id: int=0, spell_id: int=0, attack_id: int=0,
+               damage_amount: int=0, hand_type: int=0, tmpstr: str='') -> int:
+        """Add a log entry.
+
+        Arguments:
+            match_id (int): match ID
+            turn_num (int): turn number
+            str_type (int): type of action
+            str_code (string): code to fetch unformatted string from localization files
+            actor_id (int, optional): ID of actor related to the action
+            pronoun_owner_id (int, optional): pronoun owner ID
+            target_id (int, optional): target ID
+            spell_id (int, optional): spell ID
+            attack_id (int, optional): ID of attack target
+            damage_amount (int, optional): amount of damage dealt
+            hand_type (int, optional): hand type {1: left, 2: right}
+            tmpstr (str, optional): a string, for edge cases
+
+        Returns:
+            int: ID of the added log entry
+        """
+        log_id = self.base_length + len(self.match_ids)
+        self.match_ids.append(match_id)
+        columns = self.columns
+        columns['turn_num'].append(turn_num)
+        columns['str_type'].append(str_type)
+        columns['actor_id'].append(actor_id)
+        columns['pronoun_owner_id'].append(pronoun_owner_id)
+        columns['target_id'].append(target_id)
+        columns['spell_id'].append(spell_id)
+        columns['attack_id'].append(attack_id)
+        columns['damage_amount'].append(damage_amount)
+        columns['hand_type'].append(hand_type)
+
+        str_code_id = self.str_code_index.get(str_code)
+        if str_code_id is None:
+            str_code_id = len(self.str_codes)
+            self.str_codes.append(str_code)
+            self.str_code_index[str_code] = str_code_id
+        self.str_code_ids.append(str_code_id)
+        self.tmpstrs.append(tmpstr)
+
+        # Entries are normally added turn by turn, so this usually extends the last range
+        ranges = self.turn_ranges.setdefault(turn_num, [])
+        if ranges and ranges[-1][1] == log_id:
+            ranges[-1][1] = log_id + 1
+        else:
+            ranges.append([log_id, log_id + 1])
+        if turn_num > self.last_turn:
+            self.last_turn = turn_num
+        return log_id
+
+    def branch(self, base: 'MatchLog | None', base_turn: int) -> 'MatchLog':
+        """Return a new log that shares the table of string codes with this log.
+
+        Arguments:
+            base (object): MatchLog instance to refer to for entries before the new log, or None
+            base_turn (int): the first turn with turn ranges that are not looked up in base
+
+        Returns:
+            object: MatchLog instance
+        """
+        match_log = MatchLog()
+        match_log.str_codes = self.str_codes
+        match_log.str_code_index = self.str_code_index
+        match_log.base = base
+        if base is not None:
+            match_log.base_length = len(base)
+            match_log.base_turn = base_turn
+            match_log.depth = base.depth + 1
+            match_log.last_turn = base.last_turn
+        return match_log
+
+    def flatten(self) -> 'MatchLog':
+        """Return a copy of the log that stores all entries itself.
+
+        Returns:
+            object: MatchLog instance
+        """
+        match_log = self.branch(None, 0)
+        for entry in self:
+            match_log.append(entry['match_id'], entry['turn_num'], entry['str_type'], entry['str_code'],
+                             entry['actor_id'], entry['pronoun_owner_id'], entry['target_id'], entry['spell_id'],
+                             entry['attack_id'], entry['damage_amount'], entry['hand_type'], entry['tmpstr'])
+        return match_log
+
+    def fork(self, turn_num: int) -> 'MatchLog':
+        """Return an independent branch of the log for a forked match (see MatchData.fork()).
+
+        The branch refers to the entries of this log instead of copying them, only turn ranges
+        of turn_num and later turns (which may still get new entries) are copied.
+
+        Arguments:
+            turn_num (int): the first turn that may still get new entries (the current turn of a match)
+
+        Returns:
+            object: MatchLog instance
+        """
+        base = self if self.depth < TurnTable.MAX_FORK_DEPTH else self.flatten()
+        match_log = self.branch(base, turn_num)
+        for ranges_turn in range(turn_num, self.last_turn + 1):
+            ranges = self.get_turn_ranges(ranges_turn)
+            if ranges:
+                match_log.turn_ranges[ranges_turn] = ranges
+        return match_log
+
+    def __getstate__(self) -> dict:
+        # Forks are stored without their parent logs
+        return vars(self if self.base is None else self.flatten())
+
+    def get_entry(self, log_id: int) -> dict:
+        """Return a log entry as a dictionary.
+
+        Arguments:
+            log_id (int): log entry ID
+
+        Returns:
+            dict: log entry (see MatchData.get_log_entry_template())
+        """
+        if self.base is not None and log_id < self.base_length:
+            return self.base.get_entry(log_id)
+        columns = self.columns
+        index = log_id - self.base_length
+        return {'log_id': log_id, 'match_id': self.match_ids[index],
+                'turn_num': columns['turn_num'][index],
+                'str_type': columns['str_type'][index],
+                'str_code': self.str_codes[self.str_code_ids[index]],
+                'actor_id': columns['actor_id'][index],
+                'pronoun_owner_id': columns['pronoun_owner_id'][index],
+                'target_id': columns['target_id'][index],
+                'spell_id': columns['spell_id'][index],
+                'attack_id': columns['attack_id'][index],
+                'damage_amount': columns['damage_amount'][index],
+                'hand_type': columns['hand_type'][index],
+                'tmpstr': self.tmpstrs[index]}
+
+    def get_turn_ranges(self, turn_num: int) -> list[list[int]]:
+        """Return ranges of IDs of log entries of a turn.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            list: new list of [first log ID, last log ID + 1] ranges
+        """
+        ranges: list[list[int]] = []
+        if self.base is not None and turn_num < self.base_turn:
+            ranges.extend(self.base.get_turn_ranges(turn_num))
+        ranges.extend(r[:] for r in self.turn_ranges.get(turn_num, []))
+        return ranges
+
+    def get_ids_by_turn(self, turn_num: int) -> list[int]:
+        """Return IDs of log entries of a turn.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            list: log entry IDs, in the order they were added
+        """
+        log_ids: list[int] = []
+        for first_id, end_id in self.get_turn_ranges(turn_num):
+            log_ids.extend(range(first_id, end_id))
+        return log_ids
+
+    def get_entries_by_turn(self, turn_num: int) -> list[dict]:
+        """Return log entries of a turn.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            list: log entries as dictionaries, in the order they were added
+        """
+        return [self.get_entry(log_id) for log_id in self.get_ids_by_turn(turn_num)]
+
+    def __getitem__(self, log_id):
+        if isinstance(log_id, slice):
+            return [self.get_entry(i) for i in range(*log_id.indices(len(self)))]
+        if log_id < 0:
+            log_id += len(self)
+        if not 0 <= log_id < len(self):
+            raise IndexError('log entry ID out of range')
+        return self.get_entry(log_id)
+
+    def __len__(self) -> int:
+        return self.base_length + len(self.match_ids)
+
+    def __iter__(self) -> Iterator[dict]:
+        for log_id in range(len(self)):
+            yield self.get_entry(log_id)
@@ -0,0 +1,86 @@
+from typing import Callable
+from ruleset_core.class_orders import Order, Orders
+
+
+class OrderProvider:
+    """Base order provider class.
+
+    An order provider is a source of JSON orders that Orders asks for orders of participants
+    who have not given orders for the turn yet (see Orders.set_provider()).
+    Orders are unvalidated JSON order dictionaries, the same as read from order files.
+    """
+
+    def get_orders(self, match_id: int, turn_num: int, participant_ids: list[int]) -> list[dict]:
+        """Return orders for the turn. To be overridden by specific providers.
+
+        Arguments:
+            match_id (int): match ID
+            turn_num (int): turn number
+            participant_ids (list): IDs of participants who are expected to act and have no orders yet
+
+        Returns:
+            list: JSON data of orders
+        """
+        return []
+
+
+class FileOrderProvider(OrderProvider):
+    """Order provider that reads orders from a JSON file, the same way as Orders.set_filename() does."""
+
+    def __init__(self, filename: str, streaming: bool=False) -> None:
+        """Init FileOrderProvider.
+
+        Arguments:
+            filename (string): name of a JSON file with Orders
+            streaming (bool, optional): flag to read the file gradually (for huge archives)
+        """
+        self.reader: Orders[Order] = Orders()
+        self.reader.set_filename(filename, streaming)
+
+    def get_orders(self, match_id: int, turn_num: int, participant_ids: list[int]) -> list[dict]:
+        return self.reader.get_file_orders(turn_num)
+
+
+class QueueOrderProvider(OrderProvider):
+    """Order provider for orders that are put into memory as they arrive (f.e. from a network client)."""
+
+    def __init__(self) -> None:
+        """Init QueueOrderProvider with no orders."""
+        # Unvalidated orders are kept by turn number, the same way as orders read from a file
+        self.queue: Orders[Order] = Orders()
+
+    def put(self, data: dict) -> None:
+        """Queue an order for its turn.
+
+        Arguments:
+            data (dict): JSON data
+        """
+        self.queue.add_file_order(data)
+
+    def get_orders(self, match_id: int, turn_num: int, participant_ids: list[int]) -> list[dict]:
+        # Orders for previous turns are never requested again
+        for old_turn_num in [t for t in self.queue.file_orders if t < turn_num]:
+            del self.queue.file_orders[old_turn_num]
+        return self.queue.file_orders.pop(turn_num, [])
+
+
+class CallbackOrderProvider(OrderProvider):
+    """Order provider that asks a function for the order of every participant (f.e. a bot)."""
+
+    def __init__(self, callback: Callable[[int, int, int], dict | None]) -> None:
+        """Init CallbackOrderProvider.
+
+        Arguments:
+            callback (function): callback(match_id, turn_num, participant_id) that returns
+                JSON data of the order, or None if the participant gives no order
+        """
+        self.callback = callback
+
+    def get_orders(self, match_id: int, turn_num: int, participant_ids: list[int]) -> list[dict]:
+        # All callbacks are made before any order is added, so no participant sees orders of others
+        orders = []
+        for participant_id in participant_ids:
+            data = self.callback(match_id, turn_num, participant_id)
+            if data is not None:
+                orders.append(data)
+        return orders
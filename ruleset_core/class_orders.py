@@ -1,4 +1,6 @@
 import json
+from typing import Generic, Iterator, TypeVar
+from ruleset_core.class_instrumentation import Instrumentation
 
 
 class Order:
@@ -30,23 +32,105 @@ class Order:
         self.attack_orders = {}
 
 
-class Orders:
+O = TypeVar('O', bound=Order)
+
+
+class Orders(Generic[O]):
     """Base orders class.
 
-    Contains a list of orders.
+    Contains orders indexed by turn number, then by match ID and participant ID.
     """
 
+    # Size of chunks read from JSON file in streaming mode
+    STREAM_CHUNK_SIZE = 65536
+
     def __init__(self):
         """Init base orders."""
         self.filename = ''
+        # Streaming mode reads the file gradually, turn by turn, instead of parsing it as a whole
+        self.streaming = False
+        # Unvalidated orders read from the file, by turn number
+        self.file_orders: dict[int, list[dict]] = {}
+        self.file_orders_loaded = False
+        self.file_orders_stream: Iterator[dict] | None = None
+        # The largest turn number read from the file so far
+        self.file_orders_last_turn = 0
+        # Orders by turn number, then by (match ID, participant ID)
+        self.orders: dict[int, dict[tuple[int, int], O]] = {}
+        # Optional counters, see Instrumentation (None - disabled)
+        self.instrumentation: Instrumentation | None = None
+        # Optional source of orders missing from the file, see set_provider()
+        self.provider: 'OrderProvider | None' = None
 
-    def set_filename(self, filename: str) -> None:
-        """Set filename to import orders from. Placeholder.
+    def set_filename(self, filename: str, streaming: bool=False) -> None:
+        """Set filename to import orders from.
+
+        The file is parsed only once. In streaming mode the file is read only as far as
+        the requested turn, so orders in the file are expected to be sorted by turn:
+        an order that comes after an order for a later turn is read too late and is ignored.
 
         Arguments:
             filename (string): name of a JSON file with Orders
+            streaming (bool, optional): flag to read the file gradually (for huge archives)
         """
         self.filename = filename
+        self.streaming = streaming
+        self.file_orders = {}
+        self.file_orders_loaded = False
+        self.file_orders_stream = None
+        self.file_orders_last_turn = 0
+
+    def set_provider(self, provider: 'OrderProvider | None') -> None:
+        """Set order provider to ask for orders of participants who have no orders from the file.
+
+        See ruleset_core/class_orderprovider.py. Orders from the provider are validated the same way
+        as orders from the file. A match can be played with a provider only, without a file.
+
+        Arguments:
+            provider (object): an instance of OrderProvider-inherited class, None to remove the provider
+        """
+        self.provider = provider
+
+    def fork(self) -> 'Orders':
+        """Return a copy of orders for a forked match (see MatchData.fork()).
+
+        The copy keeps validated orders, but does not read orders from the file or the provider
+        of the original match: orders for the branch are added with add_file_order() or add_order().
+
+        Returns:
+            object: an instance of the same Orders-inherited class
+        """
+        orders = object.__new__(type(self))
+        orders.__dict__.update(self.__dict__)
+        orders.set_filename('')
+        orders.file_orders_loaded = True
+        orders.provider = None
+        orders.orders = {turn_num: turn_orders.copy() for turn_num, turn_orders in self.orders.items()}
+        return orders
+
+    def get_snapshot_state(self) -> dict:
+        """Return orders state to be stored in a snapshot (see common/tools_snapshot.py).
+
+        Orders read from a file are not stored, since the file is read again (lazily) after restore.
+        Unvalidated orders added without a file are stored as they are.
+
+        Returns:
+            dict: attribute name -> value
+        """
+        state = {'filename': self.filename, 'streaming': self.streaming, 'orders': self.orders}
+        if not self.filename:
+            state['file_orders'] = self.file_orders
+            state['file_orders_loaded'] = self.file_orders_loaded
+            state['file_orders_last_turn'] = self.file_orders_last_turn
+        return state
+
+    def set_snapshot_state(self, state: dict) -> None:
+        """Restore orders state from a snapshot into a new Orders instance.
+
+        Arguments:
+            state (dict): result of get_snapshot_state()
+        """
+        self.__dict__.update(state)
 
     def load_orders_from_file(self) -> dict:
         """Load orders from JSON file (for console engine implementation).
@@ -57,6 +141,119 @@ class Orders:
         with open(self.filename, 'r') as f:
             return dict(json.load(f))
 
+    def stream_orders_from_file(self) -> Iterator[dict]:
+        """Read orders from JSON file one by one, without loading the whole file.
+
+        The file is expected to contain a single JSON object of orders, same as for load_orders_from_file().
+
+        Yields:
+            dict: JSON data of a single order
+        """
+        decoder = json.JSONDecoder()
+        with open(self.filename, 'r') as f:
+            buffer = ''
+            position = 0
+            eof = False
+
+            def read_token(expected: str) -> str:
+                """Skip whitespaces and return the next char, which should be one of expected chars."""
+                nonlocal buffer, position, eof
+                while True:
+                    while position < len(buffer) and buffer[position].isspace():
+                        position += 1
+                    if position < len(buffer):
+                        break
+                    if eof:
+                        raise ValueError(f"Unexpected end of file {self.filename}")
+                    chunk = f.read(self.STREAM_CHUNK_SIZE)
+                    eof = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                if buffer[position] not in expected:
+                    raise ValueError(f"Unexpected '{buffer[position]}' in {self.filename}")
+                position += 1
+                return buffer[position - 1]
+
+            def read_value() -> object:
+                """Skip whitespaces and decode the next JSON value, reading more of the file if needed."""
+                nonlocal buffer, position, eof
+                while True:
+                    while position < len(buffer) and buffer[position].isspace():
+                        position += 1
+                    try:
+                        value, end = decoder.raw_decode(buffer, position)
+                        # A value that ends with the buffer (f.e. a number) might continue in the next chunk
+                        if end < len(buffer) or eof:
+                            position = end
+                            return value
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    chunk = f.read(self.STREAM_CHUNK_SIZE)
+                    eof = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+
+            read_token('{')
+            if read_token('"}') == '}':
+                return
+            position -= 1
+            while True:
+                read_value()
+                read_token(':')
+                data = read_value()
+                if isinstance(data, dict):
+                    yield data
+                if read_token(',}') == '}':
+                    return
+
+    def add_file_order(self, data: dict) -> None:
+        """Put unvalidated order read from the file into its turn bucket.
+
+        Arguments:
+            data (dict): JSON data
+        """
+        if not isinstance(data, dict) or 'turnNum' not in data:
+            return
+        turn_num = self.validate_int(data['turnNum'])
+        if turn_num is None:
+            return
+        self.file_orders.setdefault(turn_num, []).append(data)
+        if turn_num > self.file_orders_last_turn:
+            self.file_orders_last_turn = turn_num
+
+    def get_file_orders(self, turn_num: int) -> list[dict]:
+        """Return unvalidated orders for the turn, reading the file if needed.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            list: JSON data of orders for this turn
+        """
+        if not self.streaming:
+            # Without a file (f.e. orders come from a provider) only orders added with add_file_order() are used
+            if not self.file_orders_loaded and self.filename:
+                data = self.load_orders_from_file()
+                for key in data:
+                    self.add_file_order(data[key])
+                self.file_orders_loaded = True
+        else:
+            if not self.file_orders_loaded:
+                self.file_orders_stream = self.stream_orders_from_file()
+                self.file_orders_loaded = True
+            # Read until the first order for a later turn (or until the end of file)
+            while self.file_orders_stream is not None and self.file_orders_last_turn <= turn_num:
+                try:
+                    self.add_file_order(next(self.file_orders_stream))
+                except StopIteration:
+                    self.file_orders_stream = None
+            # Orders for previous turns are never requested again
+            for old_turn_num in [t for t in self.file_orders if t < turn_num]:
+                del self.file_orders[old_turn_num]
+
+        return self.file_orders.get(turn_num, [])
+
     def get_turn_orders(self, match_id: int, current_turn: int, hand_id_offset: int,
                         valid_participant_ids: list[int], valid_gestures: list[str], 
                         valid_spell_ids: list[int]) -> None:
@@ -70,18 +267,68 @@ class Orders:
             valid_gestures (list): gestures (str(1)) that are valid for selected SpellBook
             valid_spell_ids (list): spell IDs (integer) that are valid for selected SpellBook
         """
-        data = self.load_orders_from_file()
-        for key in data:
-            validation_error_codes = self.validate_json_order(data[key],
-                                                              match_id,
-                                                              current_turn,
-                                                              valid_participant_ids)
-            if not validation_error_codes:
-                new_order = self.parse_json_order(data[key],
-                                                  hand_id_offset,
-                                                  valid_gestures,
-                                                  valid_spell_ids)
-                self.orders.append(new_order)
+        # Orders for previous turns are never requested again
+        self.prune_orders(current_turn)
+        for data in self.get_file_orders(current_turn):
+            self.add_json_order(data, match_id, current_turn, hand_id_offset,
+                                valid_participant_ids, valid_gestures, valid_spell_ids)
+        if self.provider is not None:
+            turn_orders = self.orders.get(current_turn, {})
+            missing_ids = [participant_id for participant_id in valid_participant_ids
+                           if (match_id, participant_id) not in turn_orders]
+            if missing_ids:
+                for data in self.provider.get_orders(match_id, current_turn, missing_ids):
+                    self.add_json_order(data, match_id, current_turn, hand_id_offset,
+                                        valid_participant_ids, valid_gestures, valid_spell_ids)
+
+    def add_json_order(self, data: dict, match_id: int, current_turn: int, hand_id_offset: int,
+                       valid_participant_ids: list[int], valid_gestures: list[str],
+                       valid_spell_ids: list[int]) -> list[int]:
+        """Validate JSON order and add it to the index if it is valid.
+
+        Arguments:
+            data (dict): JSON data
+            match_id (int): match ID
+            current_turn (int): turn number
+            hand_id_offset (int): offset to calculate hand IDs (set to 10 for Spellbinder)
+            valid_participant_ids (list): list of participant IDs (int)
+            valid_gestures (list): gestures (str(1)) that are valid for selected SpellBook
+            valid_spell_ids (list): spell IDs (integer) that are valid for selected SpellBook
+
+        Returns:
+            list: validation error codes, empty if the order was added
+        """
+        validation_error_codes = self.validate_json_order(data,
+                                                          match_id,
+                                                          current_turn,
+                                                          valid_participant_ids)
+        if not validation_error_codes:
+            new_order = self.parse_json_order(data,
+                                              hand_id_offset,
+                                              valid_gestures,
+                                              valid_spell_ids)
+            self.add_order(new_order)
+        return validation_error_codes
+
+    def add_order(self, order: O) -> None:
+        """Add order to the index.
+
+        If a participant submitted several orders for the same turn, the first one is used.
+
+        Arguments:
+            order (object): an instance of Spellbook-specific Order-inherited class
+        """
+        turn_orders = self.orders.setdefault(order.turn_num, {})
+        turn_orders.setdefault((order.match_id, order.participant_id), order)
+
+    def prune_orders(self, turn_num: int) -> None:
+        """Remove orders for turns before turn_num.
+
+        Arguments:
+            turn_num (int): the first turn to keep orders for
+        """
+        for old_turn_num in [t for t in self.orders if t < turn_num]:
+            del self.orders[old_turn_num]
 
     def validate_int(self, var: str | int, vrange: list[int]=[], strict: bool=False) -> int | None:
         """Validate int.
@@ -0,0 +1,122 @@
+import random
+from itertools import product
+from typing import Iterator
+
+
+class HandOption:
+    """Orders for the hands of a participant that lead to the same gestures and spells.
+
+    Contains a partial JSON order (gestures and ordered spell IDs), the gestures the engine
+    would record for it, the spells it casts and the alternatives for targets and spell options
+    (delay, permanency) that lead to different outcomes for these spells.
+    """
+
+    __slots__ = ('order', 'gestures', 'spells', 'choices')
+
+    def __init__(self, order: dict, gestures: tuple[str, str], spells: tuple[tuple[int, int], ...],
+                 choices: list[list[dict]]) -> None:
+        """Init HandOption.
+
+        Arguments:
+            order (dict): partial JSON order with gestures and ordered spell IDs
+            gestures (tuple): left and right hand gestures recorded by the engine, as far as known before the turn
+            spells (tuple): (hand type, spell ID) of spells cast this turn, sorted by hand type
+            choices (list): lists of alternative partial JSON orders (targets, delay, permanency)
+        """
+        self.order = order
+        self.gestures = gestures
+        self.spells = spells
+        self.choices = choices
+
+    def count(self) -> int:
+        """Return the number of distinct orders of this option.
+
+        Returns:
+            int: number of orders
+        """
+        total = 1
+        for alternatives in self.choices:
+            total *= len(alternatives)
+        return total
+
+
+class OrderSpace:
+    """Distinct meaningful orders of one participant for the current turn of a match.
+
+    Orders are split into hand options (gestures, spells and their targets, see HandOption)
+    and independent choices that do not depend on gestures (monster attacks, orders for participants
+    affected by the participant's Paralysis and Charm Person, special actions). Every order of the space
+    is a combination of a hand option, one alternative of each of its choices and one alternative
+    of each independent choice. Orders that would lead to the same outcome are listed once.
+
+    Orders are JSON order dictionaries, the same as read from order files, so they can be passed
+    to Orders.add_file_order(). See SpellBook.get_order_space().
+    """
+
+    def __init__(self, match_id: int, turn_num: int, participant_id: int) -> None:
+        """Init OrderSpace with no options.
+
+        Arguments:
+            match_id (int): match ID
+            turn_num (int): turn number
+            participant_id (int): ID of the participant who gives the orders
+        """
+        self.match_id = match_id
+        self.turn_num = turn_num
+        self.participant_id = participant_id
+        # Ordered (LH, RH) gestures -> gestures recorded by the engine, as far as known before the turn
+        self.effective_gestures: dict[tuple[str, str], tuple[str, str]] = {}
+        self.hand_options: list[HandOption] = []
+        # Lists of alternative partial JSON orders
+        self.choices: list[list[dict]] = []
+
+    def count(self) -> int:
+        """Return the number of distinct orders in the space.
+
+        Returns:
+            int: number of orders
+        """
+        total = sum(option.count() for option in self.hand_options)
+        for alternatives in self.choices:
+            total *= len(alternatives)
+        return total
+
+    def make_order(self, parts: tuple[dict, ...]) -> dict:
+        """Merge partial orders into a JSON order of the participant.
+
+        Arguments:
+            parts (tuple): partial JSON orders, dictionary values (f.e. attackOrders) are merged
+
+        Returns:
+            dict: JSON order
+        """
+        order: dict = {'matchID': self.match_id, 'turnNum': self.turn_num, 'participantID': self.participant_id}
+        for part in parts:
+            for key, value in part.items():
+                if isinstance(value, dict):
+                    order[key] = {**order.get(key, {}), **value}
+                else:
+                    order[key] = value
+        return order
+
+    def __iter__(self) -> Iterator[dict]:
+        for option in self.hand_options:
+            for parts in product([option.order], *option.choices, *self.choices):
+                yield self.make_order(parts)
+
+    def sample(self, rng: random.Random) -> dict:
+        """Return a random order from the space.
+
+        Hand options are picked with equal probability, no matter how many targets they have,
+        so orders are not uniformly distributed.
+
+        Arguments:
+            rng (object): random.Random instance
+
+        Returns:
+            dict: JSON order
+        """
+        option = rng.choice(self.hand_options)
+        return self.make_order((option.order,)
+                               + tuple(rng.choice(alternatives) for alternatives in option.choices)
+                               + tuple(rng.choice(alternatives) for alternatives in self.choices))
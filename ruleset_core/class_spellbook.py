@@ -1,13 +1,32 @@
-import re
+from copy import copy
+from types import MappingProxyType
+from typing import Callable, Mapping
 from ruleset_core.class_actor import Actor
+from ruleset_core.class_orderspace import HandOption, OrderSpace
+from ruleset_core.class_spellmatcher import SpellCandidates, SpellMatcher
 
 
-class Spell:
-    """Base class for Spells."""
+class SpellTemplate:
+    """Immutable spell definition, shared by all matches that use the spellbook.
+
+    Holds everything that does not depend on a specific cast: ID, priority,
+    default target and duration, gesture patterns and default flags.
+    Patterns and flags are read-only mappings, so casts that refer to them cannot change them.
+    """
+
+    __slots__ = ('id', 'priority', 'default_target', 'duration', 'patterns', 'flags')
+
+    id: int
+    priority: int
+    default_target: str
+    duration: int
+    patterns: tuple[Mapping, ...]
+    flags: Mapping[str, bool]
 
     def __init__(self, spell_id: int, spell_priority: int, spell_gestures: list[str],
-                 spell_default_target: str, spell_duration: int, spellbook_dictionary: dict) -> None:
-        """Init function for Spells class.
+                 spell_default_target: str, spell_duration: int, spellbook_dictionary: dict,
+                 flags: dict | None=None) -> None:
+        """Init function for SpellTemplate class.
 
         Arguments:
             spell_id (int): spell ID (based on spell_definitions)
@@ -16,18 +35,9 @@ class Spell:
             spell_default_target (string): spell default target (self, opponent, nobody)
             spell_duration (int): number of turns for which the spell effect lingers
             spellbook_dictionary (dict): Spellbook dictionary with spells info
+            flags (dict, optional): default values of Spellbook-specific flags, like 'delayed'
         """
-        # Spell ID
-        self.id = spell_id
-        # spell priority, the lower priority = the earlier spell is cast
-        self.priority = spell_priority
-        # A string with default target types {nobody, self, opponent}
-        self.default_target = spell_default_target
-        # Integer, spell duration in turns
-        self.duration = spell_duration
-        # Gesture pattern(s) that can be used to cast this spell
-        self.patterns: list[dict] = []
-
+        patterns = []
         # Transform ingame pattern notation to (reversed) patterns for both hands.
         # For example, 'SWDDc' is transformed into 'CDDWS' for the main hand
         # and 'C....' for the offhand.
@@ -43,50 +53,87 @@ class Spell:
                        'mainhand_reversed': mainhand_reversed,
                        'offhand_reversed': offhand_reversed,
                        'length': len(spell_notation),
-                       'hands_required': requires_both_hands_tmp,
-                       'mainhand_re': re.compile('^' + mainhand_reversed + '.*$'),
-                       'offhand_re': re.compile('^' + offhand_reversed + '.*$')}
-            self.patterns.append(pattern)
+                       'hands_required': requires_both_hands_tmp}
+            patterns.append(MappingProxyType(pattern))
 
-        # Dictionary entry with info about pattern used to cast an instance of a spell
-        self.used_pattern: dict = {}
+        # Spell ID
+        object.__setattr__(self, 'id', spell_id)
+        # spell priority, the lower priority = the earlier spell is cast
+        object.__setattr__(self, 'priority', spell_priority)
+        # A string with default target types {nobody, self, opponent}
+        object.__setattr__(self, 'default_target', spell_default_target)
+        # Integer, default spell duration in turns
+        object.__setattr__(self, 'duration', spell_duration)
+        # Gesture pattern(s) that can be used to cast this spell
+        object.__setattr__(self, 'patterns', tuple(patterns))
+        # Default flags for Spellbook-specific conditions, copied to every cast
+        object.__setattr__(self, 'flags', MappingProxyType(dict(flags or {})))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"SpellTemplate is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"SpellTemplate is immutable, cannot delete {name}")
+
+
+class SpellCast:
+    """A spell selected to be cast: a shared SpellTemplate plus fields of this specific cast."""
+
+    __slots__ = ('template', 'used_pattern', 'duration', 'caster_id', 'target_id',
+                 'used_hand', 'cast_turn', 'resolve', 'flags')
+
+    def __init__(self, template: SpellTemplate, used_pattern: Mapping | None=None,
+                 caster_id: int=0, used_hand: int=Actor.PLAYER_NO_HAND_ID) -> None:
+        """Init function for SpellCast class.
 
+        Arguments:
+            template (object): SpellTemplate instance of the spell
+            used_pattern (Mapping, optional): pattern (one of template.patterns) used to cast the spell
+            caster_id (int, optional): ID of caster
+            used_hand (int, optional): hand used to cast the spell {1: left, 2: right}
+        """
+        self.template = template
+        # Dictionary entry with info about pattern used to cast an instance of a spell
+        self.used_pattern: Mapping = used_pattern if used_pattern is not None else {}
+        # Integer, spell duration in turns (can be made permanent)
+        self.duration = template.duration
         # Integer ID of caster
-        self.caster_id = 0
+        self.caster_id = caster_id
         # Integer ID of target
         self.target_id = 0
         # Integer [1, 2] of [left, right] hand used to cast the spell
-        self.used_hand = Actor.PLAYER_NO_HAND_ID
+        self.used_hand = used_hand
         # Integer, number of the turn on which the spell was cast
         self.cast_turn = 0
         # Boolean flag to mark spell for future resolution
         self.resolve = False
         # Dictionary of flags to check Spellbook-specific conditions (f.e. if the spell was delayed)
-        self.flags: dict[str, bool] = {}
+        self.flags: dict[str, bool] = dict(template.flags)
 
-    def clone(self, pattern: dict | None = None) -> 'Spell':
-        """Create a fresh copy of this spell, optionally with a specific pattern.
-
-        Arguments:
-            pattern (dict, optional): pattern dict to use; if None, copies all patterns.
+    def copy(self) -> 'SpellCast':
+        """Return a copy of the cast that can be changed independently (f.e. by resolution).
 
         Returns:
-            Spell: a new Spell instance with the same base attributes.
+            object: SpellCast instance
         """
-        clone = object.__new__(Spell)
-        clone.id = self.id
-        clone.priority = self.priority
-        clone.default_target = self.default_target
-        clone.duration = self.duration
-        clone.patterns = [pattern] if pattern else list(self.patterns)
-        clone.used_pattern = dict(pattern) if pattern else {}
-        clone.caster_id = self.caster_id
-        clone.target_id = 0
-        clone.used_hand = Actor.PLAYER_NO_HAND_ID
-        clone.cast_turn = 0
-        clone.resolve = False
-        clone.flags = self.flags.copy()
-        return clone
+        spell = copy(self)
+        spell.flags = dict(self.flags)
+        return spell
+
+    @property
+    def id(self) -> int:
+        """Spell ID."""
+        return self.template.id
+
+    @property
+    def priority(self) -> int:
+        """Spell priority, the lower priority = the earlier spell is cast."""
+        return self.template.priority
+
+    @property
+    def default_target(self) -> str:
+        """Default target type {nobody, self, opponent}."""
+        return self.template.default_target
 
 
 class SpellBook:
@@ -97,6 +144,14 @@ class SpellBook:
     """
 
     MAX_SPELL_LENGTH: int = 0
+    # Whether spells can target only alive actors, see select_spell_target() calls in select_spells_for_stack()
+    SPELL_TARGETS_ALIVE_ONLY: bool = True
+    # Attributes that change during a match and are stored in match snapshots, see get_snapshot_state();
+    # everything else is set up by the constructor
+    SNAPSHOT_ATTRIBUTES: tuple[str, ...] = ('possible_spells_lh', 'possible_spells_rh', 'stack')
+    # Spell data that does not change during a match, shared by all instances of a spellbook class
+    # (spellbook class -> tuple of attributes set by add_spell()), see init_spells()
+    shared_spell_data: dict[type, tuple] = {}
 
     def __init__(self, spellbook_title: str, gesture_dictionary: dict) -> None:
         """Spellbook init.
@@ -108,17 +163,80 @@ class SpellBook:
         self.title = spellbook_title
         # Dictionary of possible gestures
         self.dictionary = gesture_dictionary
-        # List of Spell instances possible for this spellbook
-        self.spells: list[Spell] = []
-
-        # Lists of Spell instances that were matched with gestures on a specific turn for a specific player
-        self.possible_spells_lh: list[Spell] = []
-        self.possible_spells_rh: list[Spell] = []
-
-        # List of Spell instances that were selected to cast for a specific turn
-        self.stack: list[Spell] = []
+        # List of SpellTemplate instances possible for this spellbook
+        self.spells: list[SpellTemplate] = []
+        # Spell ID -> SpellTemplate
+        self.spell_templates: dict[int, SpellTemplate] = {}
+        # Compiled matcher over the (reversed) patterns of all spells in self.spells
+        self.matcher = SpellMatcher()
+        # Compiled matcher over the same patterns without their last gesture
+        self.lookahead_matcher = SpellMatcher()
+        # Compiled matcher over the patterns of summon spells without their last gesture
+        self.summons_lookahead_matcher = SpellMatcher()
+
+        # Spells that were matched with gestures on a specific turn, by caster ID, for each hand.
+        # These are (SpellTemplate, pattern) pairs indexed by spell ID and hands required,
+        # a SpellCast is created only for the spell selected to cast.
+        self.possible_spells_lh: dict[int, SpellCandidates] = {}
+        self.possible_spells_rh: dict[int, SpellCandidates] = {}
+
+        # List of SpellCast instances that were selected to cast for a specific turn
+        self.stack: list[SpellCast] = []
         # List of spell definitions, to be populated by specific Spellbook
         self.spell_definitions: list[dict] = []
+        # Spell ID -> (cast function, resolve function, spell definition), populated in add_spell()
+        self.spell_handlers: dict[int, tuple[Callable, Callable, dict]] = {}
+
+    def init_spells(self, flags: dict) -> None:
+        """Populate spells, matchers and handlers from self.spell_definitions.
+
+        Spells are built only for the first instance of a spellbook class in the process,
+        further instances share them, since spell templates and matchers are never modified.
+
+        Arguments:
+            flags (dict): flags for Spellbook-specific spell states, like 'delayed'
+        """
+        shared = SpellBook.shared_spell_data.get(type(self))
+        if shared is None:
+            for spell_definition in self.spell_definitions:
+                self.add_spell(spell_definition, flags)
+            SpellBook.shared_spell_data[type(self)] = (self.spell_definitions, self.spells, self.spell_templates,
+                                                      self.matcher, self.lookahead_matcher,
+                                                      self.summons_lookahead_matcher, self.spell_handlers)
+        else:
+            (self.spell_definitions, self.spells, self.spell_templates, self.matcher,
+             self.lookahead_matcher, self.summons_lookahead_matcher, self.spell_handlers) = shared
+
+    def fork(self) -> 'SpellBook':
+        """Return an independent copy of the spellbook for a forked match (see MatchData.fork()).
+
+        Spell data is shared, only SNAPSHOT_ATTRIBUTES (candidate spells and the stack) are copied.
+
+        Returns:
+            object: an instance of the same SpellBook-inherited class
+        """
+        spellbook = object.__new__(type(self))
+        spellbook.__dict__.update(self.__dict__)
+        for name in self.SNAPSHOT_ATTRIBUTES:
+            setattr(spellbook, name, copy(getattr(self, name)))
+        return spellbook
+
+    def get_snapshot_state(self) -> dict:
+        """Return spellbook state to be stored in a snapshot (see common/tools_snapshot.py).
+
+        Returns:
+            dict: attribute name -> value, for SNAPSHOT_ATTRIBUTES
+        """
+        return {name: getattr(self, name) for name in self.SNAPSHOT_ATTRIBUTES}
+
+    def set_snapshot_state(self, state: dict) -> None:
+        """Restore spellbook state from a snapshot into a new SpellBook instance.
+
+        Arguments:
+            state (dict): result of get_snapshot_state()
+        """
+        for name in self.SNAPSHOT_ATTRIBUTES:
+            setattr(self, name, state[name])
 
     def add_spell(self, spell_definition: dict, flags: dict) -> None:
         """Import spell information and populate self.spells.
@@ -127,14 +245,46 @@ class SpellBook:
             spell_definition (dict): basic spell info
             flags (dict): flags for Spellbook-specific spell states, like 'delayed'
         """
-        spell = Spell(spell_definition['id'],
-                      spell_definition['priority'],
-                      spell_definition['patterns'],
-                      spell_definition['default_target'],
-                      spell_definition['duration'],
-                      self.dictionary)
-        spell.flags = flags.copy()
+        # Spell-specific functions are looked up once, so that cast_spells() and resolve_spells()
+        # do not have to search definitions and build function names for every spell on the stack.
+        cast_function = getattr(type(self), 'cast_spell_' + spell_definition['code'], None)
+        resolve_function = getattr(type(self), 'resolve_spell_' + spell_definition['code'], None)
+        if cast_function is None or resolve_function is None:
+            raise ValueError(f"Spell definition {spell_definition['code']} has no cast or resolve function")
+        self.spell_handlers[spell_definition['id']] = (cast_function, resolve_function, spell_definition)
+
+        spell = SpellTemplate(spell_definition['id'],
+                              spell_definition['priority'],
+                              spell_definition['patterns'],
+                              spell_definition['default_target'],
+                              spell_definition['duration'],
+                              self.dictionary,
+                              flags)
         self.spells.append(spell)
+        self.spell_templates[spell.id] = spell
+        for pattern in spell.patterns:
+            self.matcher.add_pattern(spell, pattern, pattern['mainhand_reversed'], pattern['offhand_reversed'])
+            self.lookahead_matcher.add_pattern(spell, pattern, pattern['mainhand_reversed'][1:], 
+                                               pattern['offhand_reversed'][1:])
+            if spell.id in self.get_ids_summons():
+                self.summons_lookahead_matcher.add_pattern(spell, pattern, pattern['mainhand_reversed'][1:], 
+                                                           pattern['offhand_reversed'][1:])
+
+    def get_ids_summons(self) -> list[int]:
+        """Return a list of spell IDs that summon monsters. To be overridden by specific Spellbook.
+
+        Returns:
+            list: IDs of spells
+        """
+        return []
+
+    def get_ids_spells_permanentable(self) -> list[int]:
+        """Return a list of spell IDs that can be made permanent. To be overridden by specific Spellbook.
+
+        Returns:
+            list: IDs of spells
+        """
+        return []
 
     def select_spell_target(self, order_target_id: int, spell_default_target: str,
                             participant_id: int, match_data: 'MatchData', search_alive_only: bool=True) -> int:
@@ -176,14 +326,14 @@ class SpellBook:
         but we need this for JSON-fed version of engine.
         """
         self.stack = []
-        self.possible_spells_lh = []
-        self.possible_spells_rh = []
+        self.possible_spells_lh = {}
+        self.possible_spells_rh = {}
 
-    def add_spell_to_stack(self, spell: Spell) -> None:
+    def add_spell_to_stack(self, spell: SpellCast) -> None:
         """Add a spell to the self.stack to be cast this turn.
 
         Arguments:
-            spell (object): a Spell object to be added to the list
+            spell (object): a SpellCast object to be added to the list
         """
         self.stack.append(spell)
 
@@ -204,11 +354,9 @@ class SpellBook:
             match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
         """
         for spell in self.stack:
-            for d in self.spell_definitions:
-                if spell.id == d['id']:
-                    func_name = getattr(self, 'cast_spell_' + d['code'])
-                    func_name(spell, match_data)
-                    break
+            if spell.id in self.spell_handlers:
+                cast_function = self.spell_handlers[spell.id][0]
+                cast_function(self, spell, match_data)
 
     def resolve_spells(self, match_data: 'MatchData') -> None:
         """Resolve spells waiting in the queue, calling spell-specific function.
@@ -223,12 +371,9 @@ class SpellBook:
             match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
         """
         for spell in self.stack:
-            if spell.resolve:
-                for d in self.spell_definitions:
-                    if spell.id == d['id']:
-                        func_name = getattr(self, 'resolve_spell_' + d['code'])
-                        func_name(spell, match_data)
-                        break
+            if spell.resolve and spell.id in self.spell_handlers:
+                resolve_function = self.spell_handlers[spell.id][1]
+                resolve_function(self, spell, match_data)
 
     def match_spell_pattern(self, match_data: 'MatchData') -> None:
         """Check participant's gestures to form two lists of matched spells.
@@ -240,37 +385,46 @@ class SpellBook:
             match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
         """
         for participant_id in match_data.get_ids_participants():
-            # Cycle through all (reversed) patterns of all spells.
-            # Check these patterns against current player (reversed) pattern.
+            # Check all (reversed) patterns of all spells against current player (reversed) pattern
+            # in one pass over the compiled matcher.
             # If specific pattern is matches, add spell to the list of
             # possible spells for the respective hand.
             # The pattern is reversed and cut to max_spell_length,
             # or to the first antispell or death turn, whichever comes first
-            pov_id = -1
-            pattern_lh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
-                                                                                        Actor.PLAYER_LEFT_HAND_ID, 
-                                                                                        self.MAX_SPELL_LENGTH, 
-                                                                                        pov_id)
-            pattern_rh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
-                                                                                        Actor.PLAYER_RIGHT_HAND_ID, 
-                                                                                        self.MAX_SPELL_LENGTH, 
-                                                                                        pov_id)
-            for spell in self.spells:
-                for pattern in spell.patterns:
-                    # check spell pattern for LH as mainhand
-                    mainhand_match = pattern['mainhand_re'].search(pattern_lh_reversed)
-                    offhand_match = pattern['offhand_re'].search(pattern_rh_reversed)
-                    if mainhand_match and offhand_match:
-                        spell_tmp = spell.clone(pattern)
-                        spell_tmp.caster_id = participant_id
-                        self.possible_spells_lh.append(spell_tmp)
-                    # check spell pattern for RH as mainhand
-                    mainhand_match = pattern['mainhand_re'].search(pattern_rh_reversed)
-                    offhand_match = pattern['offhand_re'].search(pattern_lh_reversed)
-                    if mainhand_match and offhand_match:
-                        spell_tmp = spell.clone(pattern)
-                        spell_tmp.caster_id = participant_id
-                        self.possible_spells_rh.append(spell_tmp)
+            pattern_lh_reversed, pattern_rh_reversed = match_data.get_gesture_histories_for_matching(
+                participant_id, self.MAX_SPELL_LENGTH)
+            if match_data.instrumentation is not None:
+                match_data.instrumentation.count('pattern_searches', 2)
+            # check spell patterns for LH as mainhand
+            self.possible_spells_lh[participant_id] = SpellCandidates(
+                self.matcher.match(pattern_lh_reversed, pattern_rh_reversed))
+            # check spell patterns for RH as mainhand
+            self.possible_spells_rh[participant_id] = SpellCandidates(
+                self.matcher.match(pattern_rh_reversed, pattern_lh_reversed))
+
+    def get_spells_completable_next_turn(self, match_data: 'MatchData', participant_id: int) -> dict[int, list[int]]:
+        """Return IDs of spells that the participant can complete with the next gestures.
+
+        We match spell patterns without their final gesture against the current
+        gesture histories, so this is meant to be called between turns.
+
+        Arguments:
+            match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
+            participant_id (int): ID of the participant
+
+        Returns:
+            dict: lists of spell IDs for both hands {1: [...], 2: [...]}
+        """
+        spell_ids: dict[int, list[int]] = {Actor.PLAYER_LEFT_HAND_ID: [], Actor.PLAYER_RIGHT_HAND_ID: []}
+        pattern_lh_reversed, pattern_rh_reversed = match_data.get_gesture_histories_for_matching(
+            participant_id, self.MAX_SPELL_LENGTH)
+        for spell, pattern in self.lookahead_matcher.match(pattern_lh_reversed, pattern_rh_reversed):
+            if spell.id not in spell_ids[Actor.PLAYER_LEFT_HAND_ID]:
+                spell_ids[Actor.PLAYER_LEFT_HAND_ID].append(spell.id)
+        for spell, pattern in self.lookahead_matcher.match(pattern_rh_reversed, pattern_lh_reversed):
+            if spell.id not in spell_ids[Actor.PLAYER_RIGHT_HAND_ID]:
+                spell_ids[Actor.PLAYER_RIGHT_HAND_ID].append(spell.id)
+        return spell_ids
 
     def match_spell_pattern_monsters(self, match_data: 'MatchData', pov_id: int) -> list[int]:
         """Check hands of alive participants for potential summons.
@@ -284,48 +438,36 @@ class SpellBook:
         """
         hand_id_list = []
         for participant_id in match_data.get_ids_participants():
-            # Cycle through all (reversed) patterns of all spells.
-            # Check these patterns against current player (reversed) pattern.
+            # Check all (reversed) patterns of summon spells against current player (reversed) pattern.
+            # Summon patterns are stored without the last gesture of the pattern
+            # (= the first gesture of the reversed pattern), because we are interested
+            # in potential summons for the next turn.
             # If specific pattern is matches, add hand id to the list of valid targets
             # The pattern is reversed and cut to max_spell_length,
             # or to the first antispell or death turn, whichever comes first
-            pattern_lh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
-                                                                                        Actor.PLAYER_LEFT_HAND_ID, 
-                                                                                        self.MAX_SPELL_LENGTH, 
-                                                                                        pov_id)
-            pattern_rh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
-                                                                                        Actor.PLAYER_RIGHT_HAND_ID, 
-                                                                                        self.MAX_SPELL_LENGTH, 
-                                                                                        pov_id)
-            for spell in self.spells:
-                # We match only summon spell IDs cause this is used to determine hands
-                # that can summon a monster
-                if spell.id in self.get_ids_summons():
-                    for pattern in spell.patterns:
-                        # We remove the last gesture of the pattern = the first gesture of the reversed pattern
-                        # because we are interested in potential summons for the next turn,
-                        # so we are matching the spell pattern without the final gesture.
-                        # Check spell pattern for LH as mainhand
-                        mainhand_match = re.search('^' + pattern['mainhand_reversed'][1:]
-                                                   + '.*$', pattern_lh_reversed)
-                        offhand_match = re.search('^' + pattern['offhand_reversed'][1:]
-                                                  + '.*$', pattern_rh_reversed)
-                        if mainhand_match and offhand_match:
-                            hand_id_list.append(
-                                match_data.get_actor_by_id(participant_id).lh_id)
-
-                        # check spell pattern for RH as mainhand
-                        mainhand_match = re.search('^' + pattern['mainhand_reversed'][1:]
-                                                   + '.*$', pattern_rh_reversed)
-                        offhand_match = re.search('^' + pattern['offhand_reversed'][1:]
-                                                  + '.*$', pattern_lh_reversed)
-                        if mainhand_match and offhand_match:
-                            hand_id_list.append(
-                                match_data.get_actor_by_id(participant_id).rh_id)
+            if pov_id == -1:
+                pattern_lh_reversed, pattern_rh_reversed = match_data.get_gesture_histories_for_matching(
+                    participant_id, self.MAX_SPELL_LENGTH)
+            else:
+                pattern_lh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
+                                                                                            Actor.PLAYER_LEFT_HAND_ID, 
+                                                                                            self.MAX_SPELL_LENGTH, 
+                                                                                            pov_id)
+                pattern_rh_reversed = match_data.get_gesture_history_reversed_for_matching(participant_id, 
+                                                                                            Actor.PLAYER_RIGHT_HAND_ID, 
+                                                                                            self.MAX_SPELL_LENGTH, 
+                                                                                            pov_id)
+            participant = match_data.get_participant_by_id(participant_id)
+            # check summon patterns for LH as mainhand
+            if self.summons_lookahead_matcher.match(pattern_lh_reversed, pattern_rh_reversed):
+                hand_id_list.append(participant.lh_id)
+            # check summon patterns for RH as mainhand
+            if self.summons_lookahead_matcher.match(pattern_rh_reversed, pattern_lh_reversed):
+                hand_id_list.append(participant.rh_id)
 
         return hand_id_list
 
-    def search_spell_set_by_id(self, hand: int, ordered_spell_id: int, caster_id: int) -> Spell | None:
+    def search_spell_set_by_id(self, hand: int, ordered_spell_id: int, caster_id: int) -> SpellCast | None:
         """Search previously formed spell lists by ID.
 
         This is used to choose the spell to cast if
@@ -338,28 +480,24 @@ class SpellBook:
             caster_id (int): ID of the participant that cast this spell
 
         Returns:
-            object: an instance of Spell class if spell is found, None otherwise.
+            object: an instance of SpellCast class if spell is found, None otherwise.
         """
-        selected_spell = None
         if hand == Actor.PLAYER_LEFT_HAND_ID:
-            for spell in self.possible_spells_lh:
-                if (spell.id == ordered_spell_id) and (spell.caster_id == caster_id):
-                    # return fresh instance of Spell since possible_spells_lh is mutable
-                    selected_spell = spell.clone(spell.used_pattern)
-                    selected_spell.caster_id = spell.caster_id
-                    selected_spell.used_hand = hand
-                    break
+            possible_spells = self.possible_spells_lh
         elif hand == Actor.PLAYER_RIGHT_HAND_ID:
-            for spell in self.possible_spells_rh:
-                if (spell.id == ordered_spell_id) and (spell.caster_id == caster_id):
-                    # return fresh instance of Spell since possible_spells_rh is mutable
-                    selected_spell = spell.clone(spell.used_pattern)
-                    selected_spell.caster_id = spell.caster_id
-                    selected_spell.used_hand = hand
-                    break
-        return selected_spell
-
-    def search_spell_set_by_length(self, hand: int, selected_spell: Spell | None, hand_count: int, caster_id: int) -> Spell | None:
+            possible_spells = self.possible_spells_rh
+        else:
+            return None
+        candidates = possible_spells.get(caster_id)
+        if candidates is None:
+            return None
+        candidate = candidates.get_by_id(ordered_spell_id)
+        if candidate is None:
+            return None
+        return SpellCast(candidate[0], candidate[1], caster_id, hand)
+
+    def search_spell_set_by_length(self, hand: int, selected_spell: SpellCast | None,
+                                   hand_count: int, caster_id: int) -> SpellCast | None:
         """Search previously formed spell lists by length and number of hands.
 
         This is used to choose the spell to cast if
@@ -369,25 +507,229 @@ class SpellBook:
 
         Arguments:
             hand (int): 1: left hand, 2: right hand
-            selected_spell (object): Spell instance previously selected by other means
+            selected_spell (object): SpellCast instance previously selected by other means
             hand_count (int): 1: only 1-handed patterns, 2: only 2-handed patterns
             caster_id (int): ID of the participant that cast this spell
 
         Returns:
-            object: an instance of Spell class if spell is found, None otherwise.
+            object: an instance of SpellCast class if spell is found, None otherwise.
         """
         # default to RH
         if hand == Actor.PLAYER_LEFT_HAND_ID:
             possible_spells = self.possible_spells_lh
         else:
             possible_spells = self.possible_spells_rh
-        for spell in possible_spells:
-            if ((spell.used_pattern['hands_required'] == hand_count)
-                    and (spell.caster_id == caster_id)):
-                if ((selected_spell is None) or (selected_spell.used_pattern['length']
-                                                 < spell.used_pattern['length'])):
-                    # return fresh instance of Spell since possible_spells is mutable
-                    selected_spell = spell.clone(spell.used_pattern)
-                    selected_spell.caster_id = spell.caster_id
-                    selected_spell.used_hand = hand
+        candidates = possible_spells.get(caster_id)
+        if candidates is None:
+            return selected_spell
+        candidate = candidates.get_longest(hand_count)
+        if candidate is None:
+            return selected_spell
+        if selected_spell is None or selected_spell.used_pattern['length'] < candidate[1]['length']:
+            return SpellCast(candidate[0], candidate[1], caster_id, hand)
         return selected_spell
+
+    # ORDER SPACE functions
+
+    def get_effective_gestures(self, match_data: 'MatchData', participant: Actor,
+                               gesture_pairs: list[tuple[str, str]]) -> dict[tuple[str, str], tuple[str, str]]:
+        """Return gestures the engine would record this turn for ordered gestures of a participant.
+
+        To be overridden by specific Spellbook to apply effects the same way as determine_gestures().
+
+        Arguments:
+            match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
+            participant (object): an instance of Spellbook-specific Participant class
+            gesture_pairs (list): ordered (LH, RH) gestures
+
+        Returns:
+            dict: ordered (LH, RH) gestures -> recorded (LH, RH) gestures
+        """
+        return {pair: pair for pair in gesture_pairs}
+
+    def check_charm_person_orders(self, match_data: 'MatchData', participant: Actor) -> bool:
+        """Check if the gesture of a charmed participant is chosen by the charmer's orders this turn.
+
+        To be overridden by specific Spellbook if Charm Person may work without orders.
+
+        Arguments:
+            match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
+            participant (object): an instance of Spellbook-specific Participant class, affected by Charm Person
+
+        Returns:
+            bool: True if the charmer's orders choose the gesture
+        """
+        return True
+
+    def get_spell_selection(self, candidates_lh: SpellCandidates, candidates_rh: SpellCandidates,
+                            order_spell_lh: int, order_spell_rh: int) -> tuple[tuple[int, int], ...]:
+        """Return spells that would be selected for the stack, the same way as select_spells_for_stack() does.
+
+        Arguments:
+            candidates_lh (object): SpellCandidates matched with LH as mainhand
+            candidates_rh (object): SpellCandidates matched with RH as mainhand
+            order_spell_lh (int): spell ID ordered for LH, -1 if none
+            order_spell_rh (int): spell ID ordered for RH, -1 if none
+
+        Returns:
+            tuple: (hand type, spell ID) of selected spells, sorted by hand type
+        """
+        cast_lh = candidates_lh.get_by_id(order_spell_lh) if order_spell_lh > 0 else None
+        cast_rh = candidates_rh.get_by_id(order_spell_rh) if order_spell_rh > 0 else None
+        cast_bh = None
+        if cast_lh is None and cast_rh is None:
+            candidate = candidates_lh.get_longest(2)
+            if candidate is not None:
+                cast_bh = (Actor.PLAYER_LEFT_HAND_ID, candidate)
+            candidate = candidates_rh.get_longest(2)
+            if candidate is not None and (cast_bh is None or cast_bh[1][1]['length'] < candidate[1]['length']):
+                cast_bh = (Actor.PLAYER_RIGHT_HAND_ID, candidate)
+        if cast_bh is not None:
+            return ((cast_bh[0], cast_bh[1][0].id),)
+        if cast_lh is None:
+            cast_lh = candidates_lh.get_longest(1)
+        if cast_rh is None:
+            cast_rh = candidates_rh.get_longest(1)
+        spells = []
+        if cast_lh is not None:
+            spells.append((Actor.PLAYER_LEFT_HAND_ID, cast_lh[0].id))
+        if cast_rh is not None:
+            spells.append((Actor.PLAYER_RIGHT_HAND_ID, cast_rh[0].id))
+        return tuple(spells)
+
+    def get_hand_choices(self, match_data: 'MatchData', participant: Actor, gestures: tuple[str, str],
+                         spells: tuple[tuple[int, int], ...], spell_targets: list[int],
+                         attack_targets: list[int]) -> list[list[dict]]:
+        """Return alternatives for targets and spell options of a hand option.
+
+        Targets are listed only for hands that cast a spell or stab, delay and permanency
+        only if the participant is affected by the respective effect.
+
+        Arguments:
+            match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
+            participant (object): an instance of Spellbook-specific Participant class
+            gestures (tuple): recorded (LH, RH) gestures
+            spells (tuple): (hand type, spell ID) of spells cast this turn
+            spell_targets (list): IDs of valid spell targets, including 0 (nobody)
+            attack_targets (list): IDs of valid stab targets, including 0 (nobody)
+
+        Returns:
+            list: lists of alternative partial JSON orders
+        """
+        choices = []
+        spell_hands = [hand for hand, spell_id in spells]
+        # If both hands stab, the dagger is in RH (see check_stabs())
+        if gestures[1] == '>':
+            stab_hand = Actor.PLAYER_RIGHT_HAND_ID
+        elif gestures[0] == '>':
+            stab_hand = Actor.PLAYER_LEFT_HAND_ID
+        else:
+            stab_hand = Actor.PLAYER_NO_HAND_ID
+        for hand, key in [(Actor.PLAYER_LEFT_HAND_ID, 'orderTargetLH'), (Actor.PLAYER_RIGHT_HAND_ID, 'orderTargetRH')]:
+            if hand in spell_hands:
+                choices.append([{key: target_id} for target_id in spell_targets])
+            elif hand == stab_hand:
+                choices.append([{key: target_id} for target_id in attack_targets])
+
+        hand_ids = {Actor.PLAYER_LEFT_HAND_ID: participant.lh_id, Actor.PLAYER_RIGHT_HAND_ID: participant.rh_id}
+        if spells and participant.affected_by_delay_effect(match_data.current_turn):
+            choices.append([{}] + [{'delaySpell': hand_ids[hand]} for hand in spell_hands])
+        permanentable_hands = [hand for hand, spell_id in spells if spell_id in self.get_ids_spells_permanentable()]
+        if permanentable_hands and participant.affected_by_permanency(match_data.current_turn):
+            choices.append([{}] + [{'makeSpellPermanent': hand_ids[hand]} for hand in permanentable_hands])
+        return choices
+
+    def get_order_space(self, match_data: 'MatchData', participant_id: int) -> OrderSpace | None:
+        """Enumerate distinct meaningful orders of a participant for the current turn.
+
+        Meant to be called between turns, while orders for the current turn are collected.
+        Ordered gestures are filtered by effects known before the turn (see get_effective_gestures()),
+        spells are matched against the gesture history and selected the same way as the engine does,
+        and orders that lead to the same outcome are listed once: f.e. gestures replaced by Amnesia,
+        ordered spells that would be selected anyway, or targets of hands that neither cast nor stab.
+        Default targets (-1) are not listed, since they resolve to one of the listed targets.
+
+        Effects that depend on orders of other participants this turn (the hand chosen by the caster
+        of a new Paralysis or Charm Person, Antispell, etc) are unknown and not applied,
+        and attack orders for monsters summoned this turn are not listed.
+
+        Arguments:
+            match_data (object): an instance of Spellbook-specific MatchData-inherited class, match data
+            participant_id (int): ID of the participant
+
+        Returns:
+            object: OrderSpace instance, None if the participant does not act this turn
+        """
+        if participant_id not in match_data.get_ids_participants_active():
+            return None
+        participant = match_data.get_participant_by_id(participant_id)
+        turn_num = match_data.current_turn
+        order_space = OrderSpace(match_data.match_id, turn_num, participant_id)
+
+        spell_targets = [0] + match_data.get_ids_targets(self.SPELL_TARGETS_ALIVE_ONLY)
+        attack_targets = [0] + match_data.get_ids_participants() + match_data.get_ids_monsters()
+        history_break = match_data.check_gesture_history_break(participant, turn_num)
+        history_lh, history_rh = match_data.get_gesture_histories_for_matching(participant_id, self.MAX_SPELL_LENGTH)
+
+        # One pair of ordered gestures per pair of recorded gestures, preferably the same gestures
+        order_space.effective_gestures = self.get_effective_gestures(
+            match_data, participant, [(lh, rh) for lh in self.valid_gestures for rh in self.valid_gestures])
+        ordered_gestures: dict[tuple[str, str], tuple[str, str]] = {}
+        for ordered, effective in order_space.effective_gestures.items():
+            if effective not in ordered_gestures or ordered == effective:
+                ordered_gestures[effective] = ordered
+
+        no_candidates = SpellCandidates()
+        for effective, ordered in ordered_gestures.items():
+            if history_break:
+                candidates_lh = candidates_rh = no_candidates
+            else:
+                candidates_lh = SpellCandidates(self.matcher.match(effective[0] + history_lh, effective[1] + history_rh))
+                candidates_rh = SpellCandidates(self.matcher.match(effective[1] + history_rh, effective[0] + history_lh))
+            # Spell orders that select the same spells, the first one (no order, if possible) is kept
+            selections: dict[tuple, tuple[int, int]] = {}
+            for order_spell_lh in [-1] + list(candidates_lh.by_id):
+                for order_spell_rh in [-1] + list(candidates_rh.by_id):
+                    spells = self.get_spell_selection(candidates_lh, candidates_rh, order_spell_lh, order_spell_rh)
+                    if spells not in selections:
+                        selections[spells] = (order_spell_lh, order_spell_rh)
+            for spells, (order_spell_lh, order_spell_rh) in selections.items():
+                order: dict[str, str | int] = {'gestureLH': ordered[0], 'gestureRH': ordered[1]}
+                if order_spell_lh > 0:
+                    order['orderSpellLH'] = order_spell_lh
+                if order_spell_rh > 0:
+                    order['orderSpellRH'] = order_spell_rh
+                order_space.hand_options.append(HandOption(
+                    order, effective, spells,
+                    self.get_hand_choices(match_data, participant, effective, spells, spell_targets, attack_targets)))
+
+        # Attack orders for monsters controlled by the participant (monsters that attack all ignore them)
+        for m in match_data.monster_list:
+            if m.is_alive and m.controller_id == participant_id and not m.attack_all:
+                order_space.choices.append([{'attackOrders': {str(m.id): target_id}} for target_id in attack_targets])
+
+        # Orders for participants affected by the participant's mindspells (ignored on timestopped turns)
+        if not match_data.is_current_turn_timestopped():
+            for p in match_data.participant_list:
+                if not p.is_alive:
+                    continue
+                # The hand is chosen on the first turn of Paralysis, then it stays the same
+                if (p.affected_by_paralysis(turn_num)
+                        and p.states[turn_num]['paralyzed_by_id'] == participant_id
+                        and p.states[turn_num - 1]['paralyzed_by_id'] != participant_id):
+                    order_space.choices.append([{'paralyzeOrders': {str(hand_id): 1}} for hand_id in [p.lh_id, p.rh_id]])
+                if (p.affected_by_charm_person(turn_num)
+                        and p.states[turn_num]['charmed_by_id'] == participant_id
+                        and self.check_charm_person_orders(match_data, p)):
+                    charm_choices: list[dict] = [{}]
+                    charm_choices.extend({'charmOrders': {str(hand_id): gesture}}
+                                         for hand_id in [p.lh_id, p.rh_id]
+                                         for gesture in self.valid_gestures)
+                    order_space.choices.append(charm_choices)
+
+        # Special actions
+        if participant.get_delayed_spell(turn_num) is not None:
+            order_space.choices.append([{}, {'castDelayedSpell': 1}])
+        if participant.affected_by_permanent_mindspell(turn_num):
+            order_space.choices.append([{}, {'commitSuicide': 1}])
+        return order_space
@@ -0,0 +1,232 @@
+from typing import Mapping
+
+
+class SpellMatcher:
+    """Prefix trie over reversed spell patterns.
+
+    Spell patterns are matched against reversed gesture histories, so a pattern
+    matches when its reversed mainhand notation is a prefix of the reversed history
+    of the mainhand. The trie is keyed by the reversed mainhand notation; every node
+    keeps the patterns that end there together with their offhand requirements.
+    A single walk over the reversed history of one hand finds all spells whose
+    mainhand part matches, no matter how many spells the spellbook defines.
+    """
+
+    def __init__(self) -> None:
+        """Init SpellMatcher with an empty trie."""
+        # Trie node is a tuple of (children dict, list of entries ending at this node)
+        self.root: tuple[dict, list] = ({}, [])
+        # Number of patterns added so far, used to keep the spellbook order of matches
+        self.patterns_count = 0
+
+    def add_pattern(self, spell: object, pattern: Mapping, mainhand_reversed: str, offhand_reversed: str) -> None:
+        """Add a single spell pattern to the trie.
+
+        Arguments:
+            spell (object): the object to be returned on match (usually a Spell instance)
+            pattern (Mapping): pattern to be returned on match
+            mainhand_reversed (string): reversed mainhand pattern, f.e. 'CDDWS'
+            offhand_reversed (string): reversed offhand pattern, f.e. 'C....'
+        """
+        node = self.root
+        for gesture in mainhand_reversed:
+            if gesture not in node[0]:
+                node[0][gesture] = ({}, [])
+            node = node[0][gesture]
+
+        # Offhand pattern is a sequence of wildcards ('.') with occasional
+        # two-handed gestures, so we store only the positions that must match.
+        offhand_checks = tuple((position, gesture) for position, gesture in enumerate(offhand_reversed)
+                               if gesture != '.')
+        node[1].append((self.patterns_count, spell, pattern, len(offhand_reversed), offhand_checks))
+        self.patterns_count += 1
+
+    def match(self, mainhand_history: str, offhand_history: str) -> list[tuple[object, Mapping]]:
+        """Find all patterns matching the given pair of reversed gesture histories.
+
+        Arguments:
+            mainhand_history (string): reversed gesture history of the hand checked as mainhand
+            offhand_history (string): reversed gesture history of the other hand
+
+        Returns:
+            list: a list of (spell, pattern) tuples, in the order the patterns were added
+        """
+        matched: list[tuple] = []
+        offhand_length = len(offhand_history)
+        node = self.root
+        self.check_offhand(node[1], offhand_history, offhand_length, matched)
+        for gesture in mainhand_history:
+            next_node = node[0].get(gesture)
+            if next_node is None:
+                break
+            node = next_node
+            self.check_offhand(node[1], offhand_history, offhand_length, matched)
+
+        if len(matched) > 1:
+            matched.sort(key=lambda entry: entry[0])
+        return [(entry[1], entry[2]) for entry in matched]
+
+    @staticmethod
+    def check_offhand(entries: list[tuple], offhand_history: str, offhand_length: int,
+                      matched: list[tuple]) -> None:
+        """Check offhand requirements of trie node entries and collect the matching ones.
+
+        Arguments:
+            entries (list): entries of a trie node reached by the mainhand history
+            offhand_history (string): reversed gesture history of the offhand
+            offhand_length (int): length of offhand_history
+            matched (list): a list to append matching entries to
+        """
+        for entry in entries:
+            if entry[3] > offhand_length:
+                continue
+            for position, gesture in entry[4]:
+                if offhand_history[position] != gesture:
+                    break
+            else:
+                matched.append(entry)
+
+
+class SpellMatchState:
+    """Incremental reversed gesture history of a single participant, used for spell matching.
+
+    The state keeps gestures of turns that are already over (and thus cannot be antispelled
+    or otherwise changed anymore), cut to the matching window of max_spell_length + 1 turns.
+    Every turn it gets advanced by at most one gesture pair per finished turn
+    and reset on turns that break the history (antispell, death, etc).
+    """
+
+    def __init__(self, max_spell_length: int, current_turn: int) -> None:
+        """Init SpellMatchState.
+
+        Arguments:
+            max_spell_length (int): max spell length defined by the spellbook
+            current_turn (int): turn on which the state is created
+        """
+        self.max_spell_length = max_spell_length
+        # The last turn that was added to the state (or that reset it)
+        self.checked_turn = current_turn - max_spell_length - 1
+        # Reversed gesture histories of finished turns for both hands
+        self.history_lh = ''
+        self.history_rh = ''
+        # List of (turn_num, gesture_lh, gesture_rh) stored in histories, the oldest first
+        self.gestures: list[tuple[int, str, str]] = []
+
+    def fork(self) -> 'SpellMatchState':
+        """Return an independent copy of the state for a forked match.
+
+        Returns:
+            object: SpellMatchState instance
+        """
+        state = SpellMatchState.__new__(SpellMatchState)
+        state.max_spell_length = self.max_spell_length
+        state.checked_turn = self.checked_turn
+        state.history_lh = self.history_lh
+        state.history_rh = self.history_rh
+        state.gestures = self.gestures[:]
+        return state
+
+    def reset(self, turn_num: int) -> None:
+        """Drop all stored gestures, f.e. after an antispelled or death turn.
+
+        Arguments:
+            turn_num (int): turn that broke the history
+        """
+        self.checked_turn = turn_num
+        self.history_lh = ''
+        self.history_rh = ''
+        self.gestures = []
+
+    def add_gestures(self, turn_num: int, gesture_lh: str, gesture_rh: str) -> None:
+        """Add gestures of a finished turn to the state.
+
+        Arguments:
+            turn_num (int): turn number
+            gesture_lh (string): left hand gesture
+            gesture_rh (string): right hand gesture
+        """
+        self.checked_turn = turn_num
+        self.history_lh = gesture_lh + self.history_lh
+        self.history_rh = gesture_rh + self.history_rh
+        self.gestures.append((turn_num, gesture_lh, gesture_rh))
+
+    def cut_to_window(self, current_turn: int) -> None:
+        """Drop gestures that are too old to be a part of a spell cast on current_turn.
+
+        Arguments:
+            current_turn (int): current turn number
+        """
+        first_turn = current_turn - self.max_spell_length
+        while self.gestures and self.gestures[0][0] < first_turn:
+            turn_num, gesture_lh, gesture_rh = self.gestures.pop(0)
+            self.history_lh = self.history_lh[:len(self.history_lh) - len(gesture_lh)]
+            self.history_rh = self.history_rh[:len(self.history_rh) - len(gesture_rh)]
+
+
+class SpellCandidates:
+    """Spells matched for one hand of one caster on a specific turn.
+
+    Candidates are indexed as they are added: by spell ID (the first matched pattern
+    of each spell) and by the number of required hands (the longest pattern,
+    the first one added among patterns of the same length), so that spell selection
+    does not have to scan the list.
+    """
+
+    __slots__ = ('candidates', 'by_id', 'longest')
+
+    def __init__(self, candidates: list[tuple] | None=None) -> None:
+        """Init SpellCandidates.
+
+        Arguments:
+            candidates (list, optional): (spell, pattern) tuples in the spellbook order, f.e. from SpellMatcher.match()
+        """
+        self.candidates: list[tuple] = []
+        # Spell ID -> (spell, pattern)
+        self.by_id: dict[int, tuple] = {}
+        # Number of hands required -> (spell, pattern) with the longest pattern
+        self.longest: dict[int, tuple] = {}
+        for spell, pattern in candidates or []:
+            self.add(spell, pattern)
+
+    def add(self, spell: object, pattern: Mapping) -> None:
+        """Add a matched spell pattern.
+
+        Arguments:
+            spell (object): matched spell (usually a SpellTemplate instance)
+            pattern (Mapping): matched pattern of the spell
+        """
+        candidate = (spell, pattern)
+        self.candidates.append(candidate)
+        if spell.id not in self.by_id:
+            self.by_id[spell.id] = candidate
+        longest = self.longest.get(pattern['hands_required'])
+        if longest is None or longest[1]['length'] < pattern['length']:
+            self.longest[pattern['hands_required']] = candidate
+
+    def get_by_id(self, spell_id: int) -> tuple | None:
+        """Return the candidate for a spell.
+
+        Arguments:
+            spell_id (int): spell ID
+
+        Returns:
+            tuple: (spell, pattern) if the spell was matched, None otherwise
+        """
+        return self.by_id.get(spell_id)
+
+    def get_longest(self, hands_required: int) -> tuple | None:
+        """Return the candidate with the longest pattern for the number of hands.
+
+        Arguments:
+            hands_required (int): 1: one-handed patterns, 2: two-handed patterns
+
+        Returns:
+            tuple: (spell, pattern) if any was matched, None otherwise
+        """
+        return self.longest.get(hands_required)
+
+    def __iter__(self):
+        return iter(self.candidates)
+
+    def __len__(self) -> int:
+        return len(self.candidates)
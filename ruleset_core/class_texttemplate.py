@@ -0,0 +1,48 @@
+from string import Formatter
+
+
+class TextTemplate:
+    """Localized text string compiled for rendering.
+
+    Keeps the list of placeholders used by the string, so that the renderer
+    can prepare values only for those placeholders instead of all possible ones.
+    """
+
+    __slots__ = ('text', 'fields')
+
+    def __init__(self, text: str) -> None:
+        """Compile a localized text string.
+
+        Arguments:
+            text (string): localized unformatted string, f.e. '{name} casts {spellname}.'
+        """
+        self.text = text
+        fields = set()
+        for literal_text, field_name, format_spec, conversion in Formatter().parse(text):
+            if field_name is not None:
+                # Only the top-level name matters, f.e. 'name' for '{name.attr}' or '{name[0]}'
+                fields.add(field_name.split('.')[0].split('[')[0])
+        self.fields: frozenset[str] = frozenset(fields)
+
+    def render(self, values: dict) -> str:
+        """Format the string with prepared placeholder values.
+
+        Arguments:
+            values (dict): placeholder name -> value, for (at least) all placeholders in self.fields
+
+        Returns:
+            string: formatted string
+        """
+        return self.text.format(**values)
+
+
+def compile_text_templates(text_strings: dict[str, str]) -> dict[str, TextTemplate]:
+    """Compile all localized text strings.
+
+    Arguments:
+        text_strings (dict): text code -> localized unformatted string
+
+    Returns:
+        dict: text code -> TextTemplate
+    """
+    return {code: TextTemplate(text) for code, text in text_strings.items()}
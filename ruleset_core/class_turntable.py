@@ -0,0 +1,524 @@
+from array import array
+from collections.abc import (Callable, Container, ItemsView, Iterable, Iterator, KeysView, Mapping, MutableMapping,
+                             MutableSequence, Sequence, ValuesView)
+from typing import TypeVar
+
+
+class TurnRecord(MutableMapping):
+    """A single turn of TurnTable with dict-like access by field name.
+
+    The record does not store any values itself, it is a view of a row of the table storage,
+    created on first access. Changes of flagged fields update the flags bitmask of the turn in the table.
+    A turn that a forked table shares with its parent table is copied to the fork on the first change.
+    """
+
+    __slots__ = ('table', 'storage', 'offset', 'turn_num')
+
+    def __init__(self, table: 'TurnTable', storage: MutableSequence, offset: int, turn_num: int) -> None:
+        """Init TurnRecord.
+
+        Arguments:
+            table (object): TurnTable instance the record belongs to
+            storage (list or array): storage of the table that keeps the row (the table itself or a parent table)
+            offset (int): position of the first field of this turn in storage
+            turn_num (int): turn number
+        """
+        self.table = table
+        self.storage = storage
+        self.offset = offset
+        self.turn_num = turn_num
+
+    @property
+    def flags(self) -> int:
+        """Flags bitmask of this turn."""
+        return self.table.get_flags(self.turn_num)
+
+    def __getitem__(self, name: str):
+        return self.storage[self.offset + self.table.index[name]]
+
+    def __setitem__(self, name: str, value) -> None:
+        table = self.table
+        if self.storage is not table.data:
+            # The row belongs to a parent table (see TurnTable.fork()), so it is copied first
+            self.offset = table.copy_turn(self.turn_num)
+            self.storage = table.data
+        self.storage[self.offset + table.index[name]] = value
+        if name in table.flag_rules:
+            table.flags[self.turn_num] = table.update_flags(table.flags[self.turn_num], name, value)
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError('Fields of a turn record cannot be removed')
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.table.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.fields)
+
+    def __len__(self) -> int:
+        return len(self.table.fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def copy(self) -> dict:
+        """Return values of this turn as a regular dictionary.
+
+        Returns:
+            dict: field name -> value
+        """
+        return dict(self.items())
+
+
+class TurnTable(MutableMapping):
+    """Compact storage of per-turn records with a fixed set of fields.
+
+    Works as a dictionary of turn number -> TurnRecord, while values of all turns are kept
+    in a single flat storage (a typed array if typecode is provided, a list otherwise),
+    one row of fields per turn. Field names and their order come from a template dictionary,
+    which also provides default values for new turns. Besides the storage, the table keeps
+    two plain dictionaries (turn number -> row offset, turn number -> flags) and a cache of
+    TurnRecord views.
+
+    A fork of the table (see fork()) does not copy turns that do not change anymore: it refers to
+    the parent table for turns before the fork, and stores only rows of later turns and rows
+    it changed itself. So the cost of a fork does not grow with the number of turns.
+
+    Optional flag rules turn field values into bits of a per-turn flags bitmask,
+    so that checks like "is affected by A or B" become a single bit operation.
+    A rule is a (bit, values) pair: the bit is set while the field value is one of values
+    (or, if values is None, while the field value is truthy).
+    """
+
+    # Lookups of shared turns go through the chain of parent tables, so forks of deep forks are flattened
+    MAX_FORK_DEPTH = 8
+
+    __slots__ = ('fields', 'index', 'defaults', 'data', 'offsets', 'flags', 'records', 'flag_rules', 'default_flags',
+                 'base', 'base_turn', 'depth', 'last_turn')
+
+    def __init__(self, template: dict, typecode: str='',
+                 flag_rules: Mapping[str, Sequence[tuple[int, Container | None]]] | None=None) -> None:
+        """Init TurnTable.
+
+        Arguments:
+            template (dict): field names with default values
+            typecode (string, optional): array typecode for values (f.e. 'i' for integer effects)
+            flag_rules (dict, optional): field name -> list of (bit, values) rules for flags bitmask;
+                rules for fields that are not in template are ignored
+        """
+        self.fields = tuple(template)
+        self.index = {name: position for position, name in enumerate(self.fields)}
+        self.defaults: MutableSequence = array(typecode, template.values()) if typecode else list(template.values())
+        self.data: MutableSequence = array(typecode) if typecode else []
+        # Turn number -> position of the first field of the turn in self.data
+        self.offsets: dict[int, int] = {}
+        # Turn number -> flags bitmask
+        self.flags: dict[int, int] = {}
+        # Turn number -> TurnRecord, created on first access
+        self.records: dict[int, TurnRecord] = {}
+        # Field name -> (mask of all bits the field controls, tuple of (bit, values) rules)
+        self.flag_rules: dict[str, tuple[int, tuple[tuple[int, Container | None], ...]]] = {}
+        for name, rules in (flag_rules or {}).items():
+            if name in self.index:
+                field_mask = 0
+                for bit, values in rules:
+                    field_mask |= bit
+                self.flag_rules[name] = (field_mask, tuple(rules))
+        self.default_flags = 0
+        for name in self.flag_rules:
+            self.default_flags = self.update_flags(self.default_flags, name, template[name])
+        # Parent table of a fork, which stores turns before base_turn that the fork did not change
+        self.base: TurnTable | None = None
+        self.base_turn = 0
+        # Length of the chain of parent tables
+        self.depth = 0
+        # The highest turn number ever stored (turns of the parent table included)
+        self.last_turn = -1
+
+    def update_flags(self, flags: int, name: str, value) -> int:
+        """Recalculate bits of a flags bitmask that depend on the field value.
+
+        Arguments:
+            flags (int): current flags bitmask
+            name (string): field name
+            value: new field value
+
+        Returns:
+            int: updated flags bitmask
+        """
+        field_mask, rules = self.flag_rules[name]
+        flags &= ~field_mask
+        for bit, values in rules:
+            if (value if values is None else value in values):
+                flags |= bit
+        return flags
+
+    def find_turn(self, turn_num: int) -> tuple['TurnTable', int] | None:
+        """Find the table that stores the row of a turn: this table or one of its parent tables.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            tuple: (TurnTable instance, offset of the row in its storage), or None if there is no such turn
+        """
+        table = self
+        while True:
+            offset = table.offsets.get(turn_num)
+            if offset is not None:
+                return table, offset
+            if table.base is None or turn_num >= table.base_turn:
+                return None
+            table = table.base
+
+    def get_flags(self, turn_num: int) -> int:
+        """Return flags bitmask of a turn.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            int: flags bitmask
+        """
+        try:
+            return self.flags[turn_num]
+        except KeyError:
+            found = self.find_turn(turn_num)
+            if found is None:
+                raise
+            return found[0].flags[turn_num]
+
+    def add_row(self, table: 'TurnTable', offset: int, turn_num: int) -> int:
+        """Copy the row and flags of a turn from a table with the same fields to the end of storage.
+
+        Arguments:
+            table (object): TurnTable instance to copy from
+            offset (int): position of the row in storage of that table
+            turn_num (int): turn number
+
+        Returns:
+            int: position of the copied row in storage of this table
+        """
+        new_offset = len(self.data)
+        self.data.extend(table.data[offset:offset + len(self.fields)])
+        self.offsets[turn_num] = new_offset
+        self.flags[turn_num] = table.flags[turn_num]
+        if turn_num > self.last_turn:
+            self.last_turn = turn_num
+        return new_offset
+
+    def copy_turn(self, turn_num: int) -> int:
+        """Copy a turn shared with a parent table to this table, before it is changed.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            int: position of the row of the turn in storage of this table
+        """
+        found = self.find_turn(turn_num)
+        if found is None:
+            raise KeyError(turn_num)
+        table, offset = found
+        if table is self:
+            return offset
+        return self.add_row(table, offset, turn_num)
+
+    def init_turn(self, turn_num: int) -> TurnRecord:
+        """Add a turn with default values, or reset values of an existing turn to defaults.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            object: TurnRecord instance for this turn
+        """
+        offset = self.offsets.get(turn_num)
+        if offset is not None:
+            self.data[offset:offset + len(self.fields)] = self.defaults
+        else:
+            offset = len(self.data)
+            self.data.extend(self.defaults)
+            self.offsets[turn_num] = offset
+            if turn_num > self.last_turn:
+                self.last_turn = turn_num
+            if self.base is not None and turn_num in self.records:
+                # The record was a view of the row in a parent table
+                record = self.records[turn_num]
+                record.storage = self.data
+                record.offset = offset
+        self.flags[turn_num] = self.default_flags
+        return self[turn_num]
+
+    def branch(self, turns: Iterable[int], base: 'TurnTable | None', base_turn: int) -> 'TurnTable':
+        """Return a new table with the same fields, which stores copies of some turns of this table.
+
+        Arguments:
+            turns (iterable): numbers of turns to copy, turns that are not in the table are skipped
+            base (object): TurnTable instance to refer to for turns before base_turn, or None
+            base_turn (int): the first turn that is not looked up in base
+
+        Returns:
+            object: TurnTable instance
+        """
+        table = TurnTable.__new__(TurnTable)
+        table.fields = self.fields
+        table.index = self.index
+        table.defaults = self.defaults
+        table.flag_rules = self.flag_rules
+        table.default_flags = self.default_flags
+        table.data = self.defaults[:0]
+        table.offsets = {}
+        table.flags = {}
+        table.records = {}
+        table.base = base
+        table.base_turn = base_turn
+        table.depth = 0 if base is None else base.depth + 1
+        table.last_turn = self.last_turn
+        for turn_num in turns:
+            found = self.find_turn(turn_num)
+            if found is not None:
+                table.add_row(found[0], found[1], turn_num)
+        return table
+
+    def flatten(self) -> 'TurnTable':
+        """Return an independent copy of the table that stores all turns itself.
+
+        Returns:
+            object: TurnTable instance
+        """
+        return self.branch(list(self), None, 0)
+
+    def fork(self, turn_num: int) -> 'TurnTable':
+        """Return an independent branch of the table, f.e. for a forked match (see MatchData.fork()).
+
+        Turns before turn_num must not change in this table anymore: the branch refers to them
+        instead of copying them, and copies only rows of turn_num and later turns. Field definitions
+        and flag rules are never modified, so they are shared with the branch too.
+
+        Arguments:
+            turn_num (int): the first turn that may still change (the current turn of a match)
+
+        Returns:
+            object: TurnTable instance
+        """
+        base = self if self.depth < self.MAX_FORK_DEPTH else self.flatten()
+        return self.branch(range(turn_num, self.last_turn + 1), base, turn_num)
+
+    def __getstate__(self) -> tuple[None, dict]:
+        # Records are views that are created again on access, forks are stored without their parent tables
+        table = self if self.base is None else self.flatten()
+        return None, {name: ({} if name == 'records' else getattr(table, name)) for name in self.__slots__}
+
+    def __getitem__(self, turn_num: int) -> TurnRecord:
+        record = self.records.get(turn_num)
+        if record is None:
+            offset = self.offsets.get(turn_num)
+            if offset is not None:
+                record = self.records[turn_num] = TurnRecord(self, self.data, offset, turn_num)
+                return record
+            found = self.find_turn(turn_num)
+            if found is None:
+                raise KeyError(turn_num)
+            table, offset = found
+            record = self.records[turn_num] = TurnRecord(self, table.data, offset, turn_num)
+        return record
+
+    def __setitem__(self, turn_num: int, values: Mapping[str, object]) -> None:
+        # Values may be a record of this very turn (f.e. table[t] = table[t]), so read them before the reset
+        values = dict(values)
+        record = self.init_turn(turn_num)
+        for name in values:
+            record[name] = values[name]
+
+    def __delitem__(self, turn_num: int) -> None:
+        if turn_num not in self.offsets and turn_num in self:
+            raise TypeError('Turns shared with a parent table cannot be removed')
+        del self.offsets[turn_num]
+        del self.flags[turn_num]
+        self.records.pop(turn_num, None)
+
+    def __contains__(self, turn_num: object) -> bool:
+        return turn_num in self.offsets or (self.base is not None and isinstance(turn_num, int)
+                                            and self.find_turn(turn_num) is not None)
+
+    def __iter__(self) -> Iterator[int]:
+        if self.base is None:
+            return iter(self.offsets)
+        # Turns of a fork come in order, wherever they are stored
+        turns = {turn_num for turn_num in self.base if turn_num < self.base_turn}
+        turns.update(self.offsets)
+        return iter(sorted(turns))
+
+    def __len__(self) -> int:
+        if self.base is None:
+            return len(self.offsets)
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr({turn_num: self[turn_num].copy() for turn_num in self})
+
+
+V = TypeVar('V')
+
+
+class TurnHistory(dict[int, V]):
+    """Dictionary of turn number -> value, which is forked the same way as TurnTable.
+
+    Used for per-turn data of a match that is not a fixed set of fields (gestures, turn info,
+    cached visibility matrices). A fork (see fork()) refers to the parent history for turns before
+    the fork and stores only later turns and turns it changed itself. Stored turns are regular
+    dictionary items, so reading them costs as much as with a plain dictionary, and only turns
+    of the parent history are looked up through __missing__().
+    """
+
+    __slots__ = ('base', 'base_turn', 'depth', 'last_turn')
+
+    def __init__(self, values: Mapping[int, V] | None=None) -> None:
+        """Init TurnHistory.
+
+        Arguments:
+            values (dict, optional): turn number -> value
+        """
+        super().__init__()
+        # Parent history of a fork, which stores turns before base_turn that the fork did not change
+        self.base: TurnHistory[V] | None = None
+        self.base_turn = 0
+        # Length of the chain of parent histories
+        self.depth = 0
+        # The highest turn number ever stored (turns of the parent history included)
+        self.last_turn = -1
+        if values:
+            self.update(values)
+
+    def branch(self, turns: Iterable[int], base: 'TurnHistory[V] | None', base_turn: int,
+               copy_value: Callable[[V], V] | None=None) -> 'TurnHistory[V]':
+        """Return a new history, which stores some turns of this history.
+
+        Arguments:
+            turns (iterable): numbers of turns to store, turns that are not in the history are skipped
+            base (object): TurnHistory instance to refer to for turns before base_turn, or None
+            base_turn (int): the first turn that is not looked up in base
+            copy_value (function, optional): function to copy values of stored turns, values are shared if not provided
+
+        Returns:
+            object: TurnHistory instance
+        """
+        history: TurnHistory[V] = TurnHistory()
+        history.base = base
+        history.base_turn = base_turn
+        history.depth = 0 if base is None else base.depth + 1
+        history.last_turn = self.last_turn
+        for turn_num in turns:
+            if turn_num in self:
+                value = self[turn_num]
+                history[turn_num] = value if copy_value is None else copy_value(value)
+        return history
+
+    def flatten(self) -> 'TurnHistory[V]':
+        """Return a copy of the history that stores all turns itself (values are shared).
+
+        Returns:
+            object: TurnHistory instance
+        """
+        return self.branch(list(self), None, 0)
+
+    def fork(self, turn_num: int, copy_value: Callable[[V], V] | None=None) -> 'TurnHistory[V]':
+        """Return an independent branch of the history, f.e. for a forked match (see MatchData.fork()).
+
+        Turns before turn_num must not change in this history anymore: the branch refers to them
+        instead of copying them, and stores only turn_num and later turns.
+
+        Arguments:
+            turn_num (int): the first turn that may still change (the current turn of a match)
+            copy_value (function, optional): function to copy values that may still change,
+                values are shared if not provided (f.e. if they are always replaced as a whole)
+
+        Returns:
+            object: TurnHistory instance
+        """
+        base = self if self.depth < TurnTable.MAX_FORK_DEPTH else self.flatten()
+        return self.branch(range(turn_num, self.last_turn + 1), base, turn_num, copy_value)
+
+    def copy(self) -> 'TurnHistory[V]':
+        """Return a copy of the history that stores all turns itself (values are shared).
+
+        Returns:
+            object: TurnHistory instance
+        """
+        return self.flatten()
+
+    def count_stored(self) -> int:
+        """Return the number of turns stored in this history (not in parent histories).
+
+        Returns:
+            int: number of turns
+        """
+        return dict.__len__(self)
+
+    def __reduce__(self) -> tuple:
+        # Forks are stored with all their turns, without their parent histories
+        return type(self), (dict(self.items()),)
+
+    def __missing__(self, turn_num: int) -> V:
+        if self.base is None or turn_num >= self.base_turn:
+            raise KeyError(turn_num)
+        return self.base[turn_num]
+
+    def __setitem__(self, turn_num: int, value: V) -> None:
+        dict.__setitem__(self, turn_num, value)
+        if turn_num > self.last_turn:
+            self.last_turn = turn_num
+
+    def update(self, values: Mapping[int, V] | Iterable[tuple[int, V]]=()) -> None:  # type: ignore[override]
+        turns = dict(values)
+        dict.update(self, turns)
+        self.last_turn = max(self.last_turn, max(turns, default=-1))
+
+    def setdefault(self, turn_num: int, default: V) -> V:  # type: ignore[override]
+        if turn_num not in self:
+            self[turn_num] = default
+        return self[turn_num]
+
+    def get(self, turn_num: int, default=None):  # type: ignore[override]
+        return self[turn_num] if turn_num in self else default
+
+    def __delitem__(self, turn_num: int) -> None:
+        if not dict.__contains__(self, turn_num) and turn_num in self:
+            raise TypeError('Turns shared with a parent history cannot be removed')
+        dict.__delitem__(self, turn_num)
+
+    def __contains__(self, turn_num: object) -> bool:
+        return (dict.__contains__(self, turn_num)
+                or (self.base is not None and isinstance(turn_num, int) and turn_num < self.base_turn
+                    and turn_num in self.base))
+
+    def __iter__(self) -> Iterator[int]:
+        if self.base is None:
+            return dict.__iter__(self)
+        # Turns of a fork come in order, wherever they are stored
+        turns = {turn_num for turn_num in self.base if turn_num < self.base_turn}
+        turns.update(dict.keys(self))
+        return iter(sorted(turns))
+
+    def __len__(self) -> int:
+        if self.base is None:
+            return dict.__len__(self)
+        return sum(1 for _ in self)
+
+    def keys(self) -> KeysView[int]:  # type: ignore[override]
+        return KeysView(self)
+
+    def values(self) -> ValuesView[V]:  # type: ignore[override]
+        return ValuesView(self)
+
+    def items(self) -> ItemsView[int, V]:  # type: ignore[override]
+        return ItemsView(self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TurnHistory) and other.base is not None:
+            other = dict(other.items())
+        return dict.__eq__(dict(self.items()) if self.base is not None else self, other)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
@@ -0,0 +1,96 @@
+class VisibilityMatrix:
+    """Visibility between participants on a single turn.
+
+    Rows are observers (participant IDs, plus the public row with ID 0 for spectators,
+    which sees only what every participant sees), columns are participants whose actions
+    are observed. Global POV (-1) and participants observing themselves always see everything.
+
+    There are two rules of visibility. Actions (log entries about gestures) are hidden if the observer
+    is blind or the actor is invisible or out of time. Gestures are hidden the same way,
+    except that an observer who is out of time sees all gestures.
+    """
+
+    POV_GLOBAL = -1
+    POV_PUBLIC = 0
+
+    def __init__(self, participants: list, turn_num: int) -> None:
+        """Build the matrix from participants' effects and states on turn_num.
+
+        Arguments:
+            participants (list): Participant instances
+            turn_num (int): turn number
+        """
+        self.turn_num = turn_num
+        blind: dict[int, bool] = {}
+        hidden: dict[int, bool] = {}
+        timestopped: dict[int, bool] = {}
+        for p in participants:
+            blind[p.id] = p.affected_by_blindness(turn_num)
+            hidden[p.id] = p.affected_by_any(turn_num, p.EFFECT_INVISIBILITY | p.EFFECT_TIMESTOP)
+            timestopped[p.id] = p.affected_by_timestop(turn_num)
+        anyone_blind = any(blind.values())
+
+        # Observer ID -> actor ID -> visibility flag
+        self.actions: dict[int, dict[int, bool]] = {self.POV_PUBLIC: {}}
+        self.gestures: dict[int, dict[int, bool]] = {self.POV_PUBLIC: {}}
+        for actor_id in hidden:
+            visible = not anyone_blind and not hidden[actor_id]
+            self.actions[self.POV_PUBLIC][actor_id] = visible
+            self.gestures[self.POV_PUBLIC][actor_id] = visible
+        for observer_id in blind:
+            actions_row = {}
+            gestures_row = {}
+            for actor_id in hidden:
+                visible = actor_id == observer_id or not (blind[observer_id] or hidden[actor_id])
+                actions_row[actor_id] = visible
+                gestures_row[actor_id] = visible or timestopped[observer_id]
+            self.actions[observer_id] = actions_row
+            self.gestures[observer_id] = gestures_row
+
+    @staticmethod
+    def get_visibility_flags(participants: list, turn_num: int) -> tuple[int, ...]:
+        """Return flags of effects that the matrix depends on, to tell if a cached matrix is still valid.
+
+        Arguments:
+            participants (list): Participant instances
+            turn_num (int): turn number
+
+        Returns:
+            tuple: bitmask of Blindness, Invisibility and Timestop flags per participant
+        """
+        return tuple(p.get_effect_flags(turn_num) & (p.EFFECT_BLINDNESS | p.EFFECT_INVISIBILITY | p.EFFECT_TIMESTOP)
+                     for p in participants)
+
+    def check_action_visibility(self, observer_id: int, actor_id: int) -> bool:
+        """Check if observer sees actions (gesture log entries) of actor.
+
+        Arguments:
+            observer_id (int): ID of participant to output for (0 for public POV, -1 for global POV)
+            actor_id (int): ID of the participant who acts
+
+        Returns:
+            bool: True if visible, False otherwise
+        """
+        if observer_id == self.POV_GLOBAL or observer_id == actor_id:
+            return True
+        row = self.actions.get(observer_id)
+        if row is None:
+            return False
+        return row.get(actor_id, False)
+
+    def check_gesture_visibility(self, observer_id: int, actor_id: int) -> bool:
+        """Check if observer sees gestures of actor.
+
+        Arguments:
+            observer_id (int): ID of participant to output for (0 for public POV, -1 for global POV)
+            actor_id (int): ID of the participant who made the gesture
+
+        Returns:
+            bool: True if visible, False otherwise
+        """
+        if observer_id == self.POV_GLOBAL or observer_id == actor_id:
+            return True
+        row = self.gestures.get(observer_id)
+        if row is None:
+            return False
+        return row.get(actor_id, False)
@@ -26,10 +26,10 @@ class SpellbinderOrder(Order):
         self.commit_suicide = False
 
 
-class SpellbinderOrders(Orders):
+class SpellbinderOrders(Orders[SpellbinderOrder]):
     """Orders class for Spellbinder.
 
-    Contains a list of orders and methods that parse them.
+    Contains indexed orders and methods that parse them.
     """
 
     ORDER_INVALID_MATCH_ID: Final[int] = 1
@@ -39,7 +39,6 @@ class SpellbinderOrders(Orders):
     def __init__(self) -> None:
         """Init SpellbinderOrders."""
         super().__init__()
-        self.orders: list[SpellbinderOrder] = []
 
     def check_missing_orders(self, match_data: 'SpellbinderMatchData') -> list[int]:
         """Check for missing orders for the turn using submitted active participants list.
@@ -70,11 +69,10 @@ class SpellbinderOrders(Orders):
         Returns:
             Object: SpellbinderOrder instance if found, None otherwise
         """
-        for order in self.orders:
-            if ((order.match_id == match_id)
-                    and (order.turn_num == turn_num)
-                    and (order.participant_id == participant_id)):
-                return order
+        if self.instrumentation is not None:
+            self.instrumentation.count('order_lookups')
+        if turn_num in self.orders:
+            return self.orders[turn_num].get((match_id, participant_id))
         return None
 
     def parse_json_order(self, data: dict, hand_id_offset: int, valid_gestures: list[str], 
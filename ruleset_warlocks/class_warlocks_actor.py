@@ -1,10 +1,47 @@
+from typing import Final
 from ruleset_core.class_actor import Actor
-from ruleset_core.class_spellbook import Spell
+from ruleset_core.class_spellbook import SpellCast
+from ruleset_core.class_turntable import TurnTable
 
 
 class WarlocksActor(Actor):
     """Expands Actor class with Ravenblack's Warlocks-specific effects and states."""
 
+    # Bits of per-turn effect flags. The first group is set while an effect is active
+    # (the same way affected_by_* functions check it), the second one while an effect is permanent.
+    # Blindness, Invisibility and TimeStop bits are also set by the corresponding states.
+    EFFECT_PSHIELD: Final[int] = 1 << 0
+    EFFECT_PROTECTION: Final[int] = 1 << 1
+    EFFECT_MSHIELD: Final[int] = 1 << 2
+    EFFECT_MMIRROR: Final[int] = 1 << 3
+    EFFECT_HASTE: Final[int] = 1 << 4
+    EFFECT_TIMESTOP: Final[int] = 1 << 5
+    EFFECT_PARALYSIS: Final[int] = 1 << 6
+    EFFECT_AMNESIA: Final[int] = 1 << 7
+    EFFECT_FEAR: Final[int] = 1 << 8
+    EFFECT_MALADROITNESS: Final[int] = 1 << 9
+    EFFECT_CHARM_PERSON: Final[int] = 1 << 10
+    EFFECT_DISEASE: Final[int] = 1 << 11
+    EFFECT_POISON: Final[int] = 1 << 12
+    EFFECT_BLINDNESS: Final[int] = 1 << 13
+    EFFECT_INVISIBILITY: Final[int] = 1 << 14
+    EFFECT_PERMANENCY: Final[int] = 1 << 15
+    EFFECT_DELAY_EFFECT: Final[int] = 1 << 16
+
+    PERMANENT_PROTECTION: Final[int] = 1 << 17
+    PERMANENT_HASTE: Final[int] = 1 << 18
+    PERMANENT_RESIST_HEAT: Final[int] = 1 << 19
+    PERMANENT_RESIST_COLD: Final[int] = 1 << 20
+    PERMANENT_PARALYSIS: Final[int] = 1 << 21
+    PERMANENT_AMNESIA: Final[int] = 1 << 22
+    PERMANENT_FEAR: Final[int] = 1 << 23
+    PERMANENT_MALADROITNESS: Final[int] = 1 << 24
+    PERMANENT_CHARM_PERSON: Final[int] = 1 << 25
+    PERMANENT_MINDSPELL: Final[int] = (PERMANENT_PARALYSIS | PERMANENT_AMNESIA | PERMANENT_FEAR
+                                       | PERMANENT_MALADROITNESS | PERMANENT_CHARM_PERSON)
+
+    TURN_TABLES: tuple[str, ...] = ('effects', 'states')
+
     def __init__(self, actor_type: int, gender: int, hp: int, max_hp: int,
                  turn_created: int, attack_all: bool, attack_damage: int, damage_type: str,
                  turn_num: int, permanent_duration: int) -> None:
@@ -27,10 +64,13 @@ class WarlocksActor(Actor):
         self.turn_destroyed = -1
         self.turn_surrendered = -1
         self.gender = gender
-        self.effects: dict[int, dict] = {}
-        self.states: dict[int, dict] = {} 
-        # self.effects: dict[int, dict[str, int]] = {}
-        # self.states: dict[int, dict[str, int | bool | Spell | None]] = {}
+        # Effects and states by turn number. Both are fixed sets of fields stored compactly
+        # (effects are integer durations, so they are kept in a typed array),
+        # while still allowing to access them as self.effects[turn_num][effect_name].
+        # Both also keep a per-turn bitmask of active and permanent effects, see EFFECT_* constants.
+        self.effects: TurnTable = TurnTable(self.get_effects_template(), 'i',
+                                            self.get_effect_flag_rules(permanent_duration))
+        self.states: TurnTable = TurnTable(self.get_states_template(), '', self.get_state_flag_rules())
 
         # Attack type and damage (for stabs)
         self.attack_all = attack_all
@@ -59,9 +99,9 @@ class WarlocksActor(Actor):
             state_invisible = self.states[turn_num]['invisible']
             state_outatime = self.states[turn_num]['outatime']
 
-        self.effects[turn_num] = self.get_effects_template()
+        self.effects.init_turn(turn_num)
 
-        self.states[turn_num] = self.get_states_template()
+        self.states.init_turn(turn_num)
 
         if preserve_visibility:
             self.states[turn_num]['blind'] = state_blind
@@ -145,6 +185,83 @@ class WarlocksActor(Actor):
         self.effects[turn_num + 1]['Maladroitness'] = 0
         self.effects[turn_num + 1]['CharmPerson'] = 0
 
+    def get_effect_flag_rules(self, permanent_duration: int) -> dict[str, list[tuple[int, frozenset]]]:
+        """Return rules that map effect durations to bits of effect flags.
+
+        Arguments:
+            permanent_duration (int): constant value for permanent effect duration
+
+        Returns:
+            dict: effect name -> list of (bit, durations that set the bit)
+        """
+        active_now = frozenset([1])
+        active_now_or_permanent = frozenset([1, permanent_duration])
+        active_3_turns = frozenset([1, 2, 3, permanent_duration])
+        active_6_turns = frozenset([1, 2, 3, 4, 5, 6])
+        permanent = frozenset([permanent_duration])
+        return {
+            'PShield': [(self.EFFECT_PSHIELD, active_now)],
+            'Protection': [(self.EFFECT_PROTECTION, active_3_turns), (self.PERMANENT_PROTECTION, permanent)],
+            'MShield': [(self.EFFECT_MSHIELD, active_now)],
+            'MagicMirror': [(self.EFFECT_MMIRROR, active_now)],
+            'Haste': [(self.EFFECT_HASTE, active_3_turns), (self.PERMANENT_HASTE, permanent)],
+            'TimeStop': [(self.EFFECT_TIMESTOP, active_now)],
+            'ResistHeat': [(self.PERMANENT_RESIST_HEAT, permanent)],
+            'ResistCold': [(self.PERMANENT_RESIST_COLD, permanent)],
+
+            'Paralysis': [(self.EFFECT_PARALYSIS, active_now_or_permanent), (self.PERMANENT_PARALYSIS, permanent)],
+            'Amnesia': [(self.EFFECT_AMNESIA, active_now_or_permanent), (self.PERMANENT_AMNESIA, permanent)],
+            'Fear': [(self.EFFECT_FEAR, active_now_or_permanent), (self.PERMANENT_FEAR, permanent)],
+            'Maladroitness': [(self.EFFECT_MALADROITNESS, active_now_or_permanent),
+                             (self.PERMANENT_MALADROITNESS, permanent)],
+            'CharmPerson': [(self.EFFECT_CHARM_PERSON, active_now_or_permanent),
+                            (self.PERMANENT_CHARM_PERSON, permanent)],
+
+            'Disease': [(self.EFFECT_DISEASE, active_6_turns)],
+            'Poison': [(self.EFFECT_POISON, active_6_turns)],
+            'Blindness': [(self.EFFECT_BLINDNESS, active_3_turns)],
+            'Invisibility': [(self.EFFECT_INVISIBILITY, active_3_turns)],
+            'Permanency': [(self.EFFECT_PERMANENCY, active_3_turns)],
+            'DelayEffect': [(self.EFFECT_DELAY_EFFECT, active_3_turns)],
+        }
+
+    def get_state_flag_rules(self) -> dict[str, list[tuple[int, None]]]:
+        """Return rules that map states to bits of effect flags.
+
+        Returns:
+            dict: state name -> list of (bit, None), i.e. the bit is set while the state is truthy
+        """
+        return {
+            'blind': [(self.EFFECT_BLINDNESS, None)],
+            'invisible': [(self.EFFECT_INVISIBILITY, None)],
+            'outatime': [(self.EFFECT_TIMESTOP, None)],
+        }
+
+    def get_effect_flags(self, turn_num: int) -> int:
+        """Return combined bitmask of effect flags and flag-setting states.
+
+        Arguments:
+            turn_num (int): turn number
+
+        Returns:
+            int: bitmask of EFFECT_* and PERMANENT_* bits
+        """
+        return self.effects.get_flags(turn_num) | self.states.get_flags(turn_num)
+
+    def affected_by_any(self, turn_num: int, flags: int) -> bool:
+        """Check if actor is affected by any of the requested effects.
+
+        F.e. affected_by_any(turn_num, self.EFFECT_INVISIBILITY | self.EFFECT_TIMESTOP)
+
+        Arguments:
+            turn_num (int): turn number
+            flags (int): bitmask of EFFECT_* and PERMANENT_* bits
+
+        Returns:
+            bool: False: not affected, True: affected
+        """
+        return bool(self.get_effect_flags(turn_num) & flags)
+
     def affected_by_permanent_mindspell(self, turn_num: int) -> bool:
         """Check if actor is affected by a permanent mindspell.
 
@@ -154,13 +271,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        if (self.effects[turn_num]['Paralysis'] == self.permanent_duration
-                or self.effects[turn_num]['Amnesia'] == self.permanent_duration
-                or self.effects[turn_num]['Fear'] == self.permanent_duration
-                or self.effects[turn_num]['Maladroitness'] == self.permanent_duration
-                or self.effects[turn_num]['CharmPerson'] == self.permanent_duration):
-            return True
-        return False
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_MINDSPELL)
 
     def affected_by_blindness(self, turn_num: int) -> bool:
         """Check if actor is affected by Blindness.
@@ -171,7 +282,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Blindness'] in [1, 2, 3, self.permanent_duration] or self.states[turn_num]['blind']
+        return self.affected_by_any(turn_num, self.EFFECT_BLINDNESS)
 
     def affected_by_invisibility(self, turn_num: int) -> bool:
         """Check if actor is affected by Invisibility.
@@ -182,7 +293,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Invisibility'] in [1, 2, 3, self.permanent_duration] or self.states[turn_num]['invisible']
+        return self.affected_by_any(turn_num, self.EFFECT_INVISIBILITY)
 
     def affected_by_haste(self, turn_num: int) -> bool:
         """Check if actor is affected by Haste.
@@ -193,7 +304,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Haste'] in [1, 2, 3, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_HASTE)
 
     def affected_by_haste_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Haste permanently.
@@ -204,7 +315,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Haste'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_HASTE)
 
     def affected_by_timestop(self, turn_num: int) -> bool:
         """Check if actor is affected by Timestop.
@@ -215,7 +326,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['TimeStop'] in [1] or self.states[turn_num]['outatime']
+        return self.affected_by_any(turn_num, self.EFFECT_TIMESTOP)
 
     def affected_by_paralysis(self, turn_num: int) -> bool:
         """Check if actor is affected by Paralysis.
@@ -226,7 +337,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Paralysis'] in [1, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_PARALYSIS)
 
     def affected_by_paralysis_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Paralysis permanently.
@@ -237,7 +348,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Paralysis'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_PARALYSIS)
 
     def affected_by_fear(self, turn_num: int) -> bool:
         """Check if actor is affected by Fear.
@@ -248,7 +359,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Fear'] in [1, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_FEAR)
 
     def affected_by_fear_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Fear permanently.
@@ -259,7 +370,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Fear'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_FEAR)
 
     def affected_by_amnesia(self, turn_num: int) -> bool:
         """Check if actor is affected by Amnesia.
@@ -270,7 +381,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Amnesia'] in [1, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_AMNESIA)
 
     def affected_by_amnesia_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Amnesia permanently.
@@ -281,7 +392,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Amnesia'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_AMNESIA)
 
     def affected_by_maladroitness(self, turn_num: int) -> bool:
         """Check if actor is affected by Maladroitness.
@@ -292,7 +403,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Maladroitness'] in [1, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_MALADROITNESS)
 
     def affected_by_maladroitness_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Maladroitness permanently.
@@ -303,7 +414,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Maladroitness'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_MALADROITNESS)
 
     def affected_by_charm_person(self, turn_num: int) -> bool:
         """Check if actor is affected by Charm Person.
@@ -314,7 +425,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['CharmPerson'] in [1, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_CHARM_PERSON)
 
     def affected_by_charm_person_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Charm Person permanently.
@@ -325,7 +436,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['CharmPerson'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_CHARM_PERSON)
 
     def affected_by_resist_heat_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Resist Heat.
@@ -336,7 +447,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['ResistHeat'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_RESIST_HEAT)
 
     def affected_by_resist_cold_permanent(self, turn_num: int) -> bool:
         """Check if actor is affected by Resist Cold.
@@ -347,7 +458,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['ResistCold'] in [self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.PERMANENT_RESIST_COLD)
 
     def affected_by_pshield(self, turn_num: int, check_pshield: bool=True, check_protection: bool=True) -> bool:
         """Check if actor is affected by Shield or Protection.
@@ -362,10 +473,11 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        if check_pshield and self.effects[turn_num]['PShield'] in [1]:
+        flags = self.effects.get_flags(turn_num)
+        if check_pshield and flags & self.EFFECT_PSHIELD:
             return True
         else:
-            return (check_protection and self.effects[turn_num]['Protection'] in [1, 2, 3, self.permanent_duration])
+            return check_protection and bool(flags & self.EFFECT_PROTECTION)
 
     def affected_by_pshield_permanent(self, turn_num: int, check_pshield: bool=True, check_protection: bool=True) -> bool:
         """Check if actor is affected by Protection permanently.
@@ -378,7 +490,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return (check_protection and self.effects[turn_num]['Protection'] in [self.permanent_duration])
+        return check_protection and bool(self.effects.get_flags(turn_num) & self.PERMANENT_PROTECTION)
 
     def affected_by_mshield(self, turn_num: int) -> bool:
         """Check if actor is affected by MShield (Counter Spell).
@@ -389,7 +501,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['MShield'] in [1]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_MSHIELD)
 
     def affected_by_mmirror(self, turn_num: int) -> bool:
         """Check if actor is affected by MMirror (Magic Mirror).
@@ -400,7 +512,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['MagicMirror'] in [1]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_MMIRROR)
 
     def affected_by_permanency(self, turn_num: int) -> bool:
         """Check if actor is affected by Permanency.
@@ -411,7 +523,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Permanency'] in [1, 2, 3, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_PERMANENCY)
 
     def affected_by_delay_effect(self, turn_num: int) -> bool:
         """Check if actor is affected by Delay Effect.
@@ -425,7 +537,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['DelayEffect'] in [1, 2, 3, self.permanent_duration]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_DELAY_EFFECT)
 
     def affected_by_disease(self, turn_num: int) -> bool:
         """Check if actor is affected by Disease.
@@ -436,7 +548,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Disease'] in [1, 2, 3, 4, 5, 6]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_DISEASE)
 
     def affected_by_poison(self, turn_num: int) -> bool:
         """Check if actor is affected by Poison.
@@ -447,7 +559,7 @@ class WarlocksActor(Actor):
         Returns:
             bool: False: not affected, True: affected
         """
-        return self.effects[turn_num]['Poison'] in [1, 2, 3, 4, 5, 6]
+        return bool(self.effects.get_flags(turn_num) & self.EFFECT_POISON)
 
 
 class WarlocksParticipant(WarlocksActor):
@@ -576,23 +688,23 @@ class WarlocksParticipant(WarlocksActor):
         """Set flag to destroy participant at the end of this turn."""
         self.destroy_eot = True
 
-    def set_delayed_spell(self, turn_num: int, spell: Spell | None) -> None:
+    def set_delayed_spell(self, turn_num: int, spell: SpellCast | None) -> None:
         """Save a spell for future cast.
 
         Arguments:
             turn_num (int): turn number
-            spell (object): an instance of Spell class
+            spell (object): an instance of SpellCast class
         """
         self.states[turn_num]['delayed_spell'] = spell
 
-    def get_delayed_spell(self, turn_num: int) -> Spell | None:
+    def get_delayed_spell(self, turn_num: int) -> SpellCast | None:
         """Load a stored spell to cast it.
 
         Arguments:
             turn_num (int): turn number
 
         Returns:
-            spell (object): an instance of Spell class
+            spell (object): an instance of SpellCast class
         """
         return self.states[turn_num]['delayed_spell'] # type: ignore[no-any-return]
 
@@ -699,10 +811,6 @@ class WarlocksMonster(WarlocksActor):
             'fireballed': 0,
         }
 
-    def destroy_now(self) -> None:
-        """Destroy monster immediately."""
-        self.is_alive = False
-
     def set_destroy_before_attack(self) -> None:
         """Flag monster to be destroyed this turn before attack phase."""
         self.destroy_before_attack = True
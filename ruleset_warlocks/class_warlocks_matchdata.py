@@ -1,13 +1,15 @@
 from typing import Final
 from ruleset_core.class_actor import Actor
 from ruleset_core.class_matchdata import MatchData
+from ruleset_core.class_spellmatcher import SpellMatchState
+from ruleset_core.class_turntable import TurnHistory
 from ruleset_warlocks.class_warlocks_actor import WarlocksParticipant, WarlocksMonster
 
 
 class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
     """Expands MatchData with Warlocks-specific data.
 
-    turns_info (dictionary): with additional info about each turn, described in get_turn_info_template()
+    turns_info (TurnHistory): with additional info about each turn, described in get_turn_info_template()
     hand_id_offset (int): offset that is used to calculate hand IDs [11,12,21,22,31,32,..]
     monster_id_offset (int): offset that is used to calculate monster IDs [101,102,...]
     permanent_duration (int): a constant that is used to mark permanent spells
@@ -34,7 +36,7 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
         """
         super().__init__(match_id)
 
-        self.turns_info: dict[int, dict[str, int]] = {}
+        self.turns_info: TurnHistory[dict[str, int]] = TurnHistory()
         self.turns_info[0] = self.get_turn_info_template()
         self.turns_info[1] = self.get_turn_info_template()
 
@@ -62,6 +64,19 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
             'elementals_clash': 0
         }
 
+    def fork(self) -> 'WarlocksMatchData':
+        """Return an independent branch of the match (see MatchData.fork()).
+
+        Turn info is changed only for the current and the next turn, so only these turns are copied
+        and info of older turns is shared (see TurnHistory.fork()).
+
+        Returns:
+            object: WarlocksMatchData instance
+        """
+        match_data = super().fork()
+        match_data.turns_info = self.turns_info.fork(self.current_turn, dict.copy)
+        return match_data
+
     # INIT and ADD functions
 
     def create_participant(self, player_id: int, player_gender: int, player_name: str, team_id: int) -> WarlocksParticipant:
@@ -189,12 +204,12 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
         name = ''
         target: WarlocksParticipant | WarlocksMonster | None = None
         search_alive_only = False
-        if actor_id in self.get_ids_participants(search_alive_only):
+        if actor_id in self.participants_by_id:
             target = self.get_participant_by_id(actor_id, search_alive_only)
             if target is None:
                 return ''        
             name = target.name
-        elif search_hands and actor_id in self.get_ids_hands(search_alive_only):
+        elif search_hands and actor_id in self.participants_by_hand_id:
             target = self.get_participant_by_id(actor_id // self.DATA_HAND_ID_OFFSET)
             if target is None:
                 return ''
@@ -202,37 +217,46 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
                 name = (target.name + ' ' + self.get_text_strings_by_code('nameLH'))
             else:
                 name = (target.name + ' ' + self.get_text_strings_by_code('nameRH'))
-        elif actor_id in self.get_ids_monsters(search_alive_only):
-            target = self.get_monster_by_id(actor_id, search_alive_only)
-            if target is None:
-                return ''
-            name_code = -1
-            name_multiplier = 0
-            if target.monster_type in [self.MONSTER_TYPE_FIREELEM, self.MONSTER_TYPE_ICEELEM]:
-                name_code = 0
-                name_multiplier = 0
-            elif target.monster_type in [self.MONSTER_TYPE_GOBLIN, self.MONSTER_TYPE_OGRE, self.MONSTER_TYPE_TROLL, self.MONSTER_TYPE_GIANT]:
-                count = 0
-                for m in self.monster_list:
-                    if m.id == target.id:
-                        break
-                    if m.monster_type == target.monster_type:
-                        count += 1
-                size = len(self.monster_name_codes[target.monster_type])
-                name_code = count % size
-                name_multiplier = count // size
-
-            if name_code == -1:
-                name = self.get_text_strings_by_code('nameNobody')
-            else:
-                name = ((self.get_text_strings_by_code('nameMonsterExtra') + ' ') * name_multiplier
-                        + self.monster_names[target.monster_type][name_code] + ' '
-                        + self.monster_classes[target.monster_type])
+        elif actor_id in self.monsters_by_id:
+            # Monster names do not change during the match, so they are cached until re-localization
+            if actor_id in self.monster_display_names:
+                return self.monster_display_names[actor_id]
+            name = self.get_monster_display_name(self.monsters_by_id[actor_id])
+            self.monster_display_names[actor_id] = name
         else:
             name = self.get_text_strings_by_code('nameNobody')
 
         return name
 
+    def get_monster_display_name(self, monster: WarlocksMonster) -> str:
+        """Return a localized name of a monster.
+
+        Goblins, ogres, trolls and giants get names from the list of localized names
+        in the order they were summoned, elementals are named by class only.
+
+        Arguments:
+            monster (object): WarlocksMonster instance
+
+        Returns:
+            string: monster's name or 'nobody' in appropriate locale
+        """
+        name_code = -1
+        name_multiplier = 0
+        if monster.monster_type in [self.MONSTER_TYPE_FIREELEM, self.MONSTER_TYPE_ICEELEM]:
+            name_code = 0
+            name_multiplier = 0
+        elif monster.monster_type in [self.MONSTER_TYPE_GOBLIN, self.MONSTER_TYPE_OGRE, self.MONSTER_TYPE_TROLL, self.MONSTER_TYPE_GIANT]:
+            count = self.monster_type_ordinals[monster.id]
+            size = len(self.monster_name_codes[monster.monster_type])
+            name_code = count % size
+            name_multiplier = count // size
+
+        if name_code == -1:
+            return self.get_text_strings_by_code('nameNobody')
+        return ((self.get_text_strings_by_code('nameMonsterExtra') + ' ') * name_multiplier
+                + self.monster_names[monster.monster_type][name_code] + ' '
+                + self.monster_classes[monster.monster_type])
+
     def get_gesture_log_entry(self, gesture_lh: str, gesture_rh: str) -> tuple[str, str]:
         """Get codes for localized strings for LH and RH gestures to use in log.
 
@@ -394,46 +418,10 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
         Returns:
             bool: True for visible gesture, False otherwise
         """
-        # Determine visibility
-        print_flag = True
         # If we use global vision or if actor is pov
         if (pov_id == -1 or participant_id == pov_id):
-            print_flag = True
-        # If we use common vision
-        elif pov_id == 0:
-            search_alive_only = False
-            log_actor = self.get_participant_by_id(
-                participant_id, search_alive_only)
-            if log_actor is None:
-                return False
-            if (log_actor.affected_by_invisibility(turn_num)
-                    or log_actor.affected_by_timestop(turn_num)):
-                print_flag = False
-            else:
-                print_flag = True
-                for participant in self.participant_list:
-                    if participant.affected_by_blindness(turn_num):
-                        print_flag = False
-                        break
-        # If we use POV of specific participant
-        else:
-            # Check visibility between actors
-            search_alive_only = False
-            pov_actor = self.get_participant_by_id(
-                pov_id, search_alive_only)
-            log_actor = self.get_participant_by_id(
-                participant_id, search_alive_only)
-            if pov_actor is None or log_actor is None:
-                return False
-            if pov_actor.affected_by_timestop(turn_num):
-                print_flag = True
-            elif (pov_actor.affected_by_blindness(turn_num)
-                    or log_actor.affected_by_invisibility(turn_num)
-                    or log_actor.affected_by_timestop(turn_num)):
-                print_flag = False
-            else:
-                print_flag = True
-        return print_flag
+            return True
+        return self.get_visibility_matrix(turn_num).check_gesture_visibility(pov_id, participant_id)
 
     def get_gesture_filtered(self, participant_id: int, turn_num: int, hand: int, 
                                 respect_antispell: bool=True, respect_spaces: bool=False, pov_id: int=-1) -> str:
@@ -551,6 +539,60 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
                 g += self.get_gesture_filtered(participant_id, turn_num, hand, respect_antispell, respect_spaces, pov_id)
         return g
 
+    def check_gesture_history_break(self, participant: WarlocksParticipant, turn_num: int) -> bool:
+        """Check if gestures made on this turn and before cannot be a part of a spell.
+
+        Arguments:
+            participant (object): WarlocksParticipant instance
+            turn_num (int): turn number
+
+        Returns:
+            bool: True if the gesture history is cut on this turn, False otherwise
+        """
+        return (turn_num not in participant.states 
+                or not participant.states[turn_num]['is_alive']
+                or participant.states[turn_num]['antispelled'])
+
+    def get_gesture_histories_for_matching(self, participant_id: int, max_spell_length: int) -> tuple[str, str]:
+        """Return reversed gesture histories of both hands of this participant, as seen by the engine.
+
+        This is an incremental equivalent of get_gesture_history_reversed_for_matching() with global POV.
+        Gestures of finished turns are stored in SpellMatchState and added once per turn,
+        while the current turn (that may still be antispelled) is checked on every call.
+
+        Arguments:
+            participant_id (int): ID of the participant who made the gestures
+            max_spell_length (int): max spell length defined by the spellbook
+
+        Returns:
+            tuple: reversed gesture history strings for left and right hands
+        """
+        participant = self.get_participant_by_id(participant_id)
+        if participant is None or participant_id not in self.match_gestures:
+            return '', ''
+
+        state = self.spell_match_states.get(participant_id)
+        if (state is None or state.max_spell_length != max_spell_length 
+                or state.checked_turn < self.current_turn - max_spell_length - 1):
+            state = SpellMatchState(max_spell_length, self.current_turn)
+            self.spell_match_states[participant_id] = state
+
+        participant_gestures = self.match_gestures[participant_id]
+        for turn_num in range(state.checked_turn + 1, self.current_turn):
+            if self.check_gesture_history_break(participant, turn_num):
+                state.reset(turn_num)
+            elif turn_num in participant_gestures:
+                state.add_gestures(turn_num, participant_gestures[turn_num]['gLH'], 
+                                   participant_gestures[turn_num]['gRH'])
+        state.cut_to_window(self.current_turn)
+
+        if self.check_gesture_history_break(participant, self.current_turn):
+            return '', ''
+        if self.current_turn in participant_gestures:
+            return (participant_gestures[self.current_turn]['gLH'] + state.history_lh, 
+                    participant_gestures[self.current_turn]['gRH'] + state.history_rh)
+        return state.history_lh, state.history_rh
+
     # TURN LOGIC functions
 
     def set_next_turn_type(self) -> None:
@@ -605,7 +647,7 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
                 continue
             p = self.get_participant_by_id(participant_id)
             if (p is not None and p.affected_by_permanent_mindspell(self.current_turn) and order.commit_suicide):
-                p.is_alive = False
+                self.set_actor_alive(p, False)
                 p.turn_destroyed = self.current_turn
                 self.add_log_entry(self.LOG_ACTOR_DEATH, 'resultActorSuicides',
                                    actor_id=p.id, pronoun_owner_id=p.id)
@@ -621,7 +663,7 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
             if (p.is_alive
                     and self.get_gesture_filtered(p.id, turn_num, Actor.PLAYER_LEFT_HAND_ID, respect_antispell) == 'P'
                     and self.get_gesture_filtered(p.id, turn_num, Actor.PLAYER_RIGHT_HAND_ID, respect_antispell) == 'P'):
-                p.is_alive = False
+                self.set_actor_alive(p, False)
                 p.turn_destroyed = self.current_turn
                 p.turn_surrendered = self.current_turn
                 self.add_log_entry(self.LOG_ACTOR_DEATH, 'resultActorSurrenders', actor_id=p.id)
@@ -990,16 +1032,20 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
             match_spellbook (object): WarlocksSpellBook instance, match spellbook
         """
         # Turn startup
-        self.process_turn_phase_startup()
+        with self.measure('startup'):
+            self.process_turn_phase_startup()
 
         # Spellcasting
-        self.process_turn_phase_cast(match_orders, match_spellbook)
+        with self.measure('cast'):
+            self.process_turn_phase_cast(match_orders, match_spellbook)
 
         # Combat
-        self.process_turn_phase_attack(match_orders)
+        with self.measure('attack'):
+            self.process_turn_phase_attack(match_orders)
 
         # Clean-up
-        self.process_turn_phase_cleanup(match_orders)
+        with self.measure('cleanup'):
+            self.process_turn_phase_cleanup(match_orders)
 
     def process_turn_phase_startup(self) -> None:
         """Process turn phase 0 - initiation."""
@@ -1020,38 +1066,49 @@ class WarlocksMatchData(MatchData[WarlocksParticipant, WarlocksMonster]):
             match_spellbook (object): WarlocksSpellBook instance, match spellbook
         """
         # Step 1.0 - clear stack
-        match_spellbook.clear_stack()
+        with self.measure('cast.1.0_clear_stack'):
+            match_spellbook.clear_stack()
 
         # Step 1.1 - determine gestures for the turn
-        match_spellbook.determine_gestures(match_orders, self)
+        with self.measure('cast.1.1_determine_gestures'):
+            match_spellbook.determine_gestures(match_orders, self)
 
         # Step 1.2 - log effects and gestures events for the turn
-        match_spellbook.log_effects_bot(match_orders, self)
-        match_spellbook.log_gesture_messages(self)
+        with self.measure('cast.1.2_log_effects_and_gestures'):
+            match_spellbook.log_effects_bot(match_orders, self)
+            match_spellbook.log_gesture_messages(self)
 
         # Step 1.3 - make a list of spells that match gestures for all participants
-        match_spellbook.match_spell_pattern(self)
+        with self.measure('cast.1.3_match_spell_pattern'):
+            match_spellbook.match_spell_pattern(self)
 
         # Step 1.4 - cast delayed spells, if any and if ordered, for all participants
-        match_spellbook.check_delayed_spell_cast(match_orders, self)
+        with self.measure('cast.1.4_check_delayed_spell_cast'):
+            match_spellbook.check_delayed_spell_cast(match_orders, self)
 
         # Step 1.5 - select spells to cast (and their targets) for all participants
-        match_spellbook.select_spells_for_stack(match_orders, self)
+        with self.measure('cast.1.5_select_spells_for_stack'):
+            match_spellbook.select_spells_for_stack(match_orders, self)
 
         # Step 1.6 - sort spell queue by priority
-        match_spellbook.sort_spells_by_priority()
+        with self.measure('cast.1.6_sort_spells_by_priority'):
+            match_spellbook.sort_spells_by_priority()
 
         # Step 1.7 - cast spells in queue
-        match_spellbook.cast_spells(self)
+        with self.measure('cast.1.7_cast_spells'):
+            match_spellbook.cast_spells(self)
 
         # Step 1.8 - pre-resolution checks (elem)
-        match_spellbook.check_elemental_spells_clash(self)
+        with self.measure('cast.1.8_check_elemental_spells_clash'):
+            match_spellbook.check_elemental_spells_clash(self)
 
         # Step 1.9 - resolve spells
-        match_spellbook.resolve_spells(self)
+        with self.measure('cast.1.9_resolve_spells'):
+            match_spellbook.resolve_spells(self)
 
         # Step 1.10 - post-resolution checks (mindspells)
-        match_spellbook.check_mindspells_clash(self)
+        with self.measure('cast.1.10_check_mindspells_clash'):
+            match_spellbook.check_mindspells_clash(self)
 
     def process_turn_phase_attack(self, match_orders: 'WarlocksOrders') -> None:
         """Process turn phase 2 - combat.
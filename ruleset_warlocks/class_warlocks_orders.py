@@ -27,10 +27,10 @@ class WarlocksOrder(Order):
         self.commit_suicide = False
 
 
-class WarlocksOrders(Orders):
+class WarlocksOrders(Orders[WarlocksOrder]):
     """Orders class for Warlocks.
 
-    Contains a list of orders and methods that parse them.
+    Contains indexed orders and methods that parse them.
     """
 
     ORDER_INVALID_MATCH_ID: Final[int] = 1
@@ -40,7 +40,6 @@ class WarlocksOrders(Orders):
     def __init__(self) -> None:
         """Init WarlocksOrders."""
         super().__init__()
-        self.orders: list[WarlocksOrder] = []
 
     def check_missing_orders(self, match_data: 'WarlocksMatchData') -> list[int]:
         """Check for missing orders for the turn using submitted active participants list.
@@ -71,11 +70,10 @@ class WarlocksOrders(Orders):
         Returns:
             Object: WarlocksOrder instance if found, None otherwise
         """
-        for order in self.orders:
-            if ((order.match_id == match_id)
-                    and (order.turn_num == turn_num)
-                    and (order.participant_id == participant_id)):
-                return order
+        if self.instrumentation is not None:
+            self.instrumentation.count('order_lookups')
+        if turn_num in self.orders:
+            return self.orders[turn_num].get((match_id, participant_id))
         return None
 
     def parse_json_order(self, data: dict, hand_id_offset: int, valid_gestures: list[str], 
@@ -1,6 +1,6 @@
 import random
 from typing import Final
-from ruleset_core.class_spellbook import Spell, SpellBook
+from ruleset_core.class_spellbook import SpellCast, SpellBook
 from ruleset_core.class_actor import Actor
 
 
@@ -110,8 +110,7 @@ class WarlocksSpellBook(SpellBook):
         ]
 
         default_flags = {'delayed': False}
-        for spell_definition in self.spell_definitions:
-            self.add_spell(spell_definition, flags=default_flags)
+        self.init_spells(default_flags)
 
     def get_spell_definition_by_id(self, spell_id: int) -> dict:
         """Get spell definition by ID.
@@ -122,33 +121,24 @@ class WarlocksSpellBook(SpellBook):
         Returns:
             dict: spell definition, if found
         """
-        for spell_definition in self.spell_definitions:
-            if spell_definition['id'] == spell_id:
-                return spell_definition
+        if spell_id in self.spell_handlers:
+            return self.spell_handlers[spell_id][2]
 
         return {}
 
-    def get_new_spell_by_id(self, spell_id: int) -> Spell | None:
-        """Return a spell template using spell definition found by spell_id.
+    def get_new_spell_by_id(self, spell_id: int) -> SpellCast | None:
+        """Return a new spell cast using spell template found by spell_id.
 
         Arguments:
             spell_id (id): spell ID
 
         Returns:
-            obj or None: Spell object if spell definition is found; None otherwise
+            obj or None: SpellCast object if spell template is found; None otherwise
         """
-        spell_definition = self.get_spell_definition_by_id(spell_id)
-
-        if not spell_definition:
+        if spell_id not in self.spell_templates:
             return None
 
-        new_spell = Spell(spell_definition['id'],
-                          spell_definition['priority'],
-                          spell_definition['patterns'],
-                          spell_definition['default_target'],
-                          spell_definition['duration'],
-                          self.dictionary)
-        return new_spell
+        return SpellCast(self.spell_templates[spell_id])
 
     def get_ids_spells_permanentable(self) -> list[int]:
         """Return a list of spell IDs that can be made permanent.
@@ -362,10 +352,10 @@ class WarlocksSpellBook(SpellBook):
             if not match_data.is_current_turn_timestopped():
                 # For Paralysis we check if the caster is active this turn
                 # This happens if caster is dead or not active during hasted or timestopped turn
+                paralyzed_hand_id = None
                 if (p.affected_by_paralysis(match_data.current_turn)
                         and p.states[match_data.current_turn]['paralyzed_by_id'] in match_data.get_ids_participants_active()):
-                    # If participant is affected by Para, alter gestures in
-                    # paralysed hand using spellbook rules
+                    # The paralysed hand is chosen by the caster on the first turn of Para, then it stays the same
                     if p.states[match_data.current_turn]['paralyzed_by_id'] == p.states[match_data.current_turn - 1]['paralyzed_by_id']:
                         p.states[match_data.current_turn]['paralyzed_hand_id'] = p.states[match_data.current_turn - 1]['paralyzed_hand_id']
                     else:
@@ -374,33 +364,9 @@ class WarlocksSpellBook(SpellBook):
                                                                     p.states[match_data.current_turn]['paralyzed_by_id'])
                         if order_opponent and p.id in order_opponent.paralyze_orders:
                             p.states[match_data.current_turn]['paralyzed_hand_id'] = order_opponent.paralyze_orders[p.id]
-                    respect_antispell = True
-                    if p.states[match_data.current_turn]['paralyzed_hand_id'] == p.get_lh_id():
-                        prev_gesture = match_data.get_gesture_filtered(
-                            participant_id, match_data.current_turn - 1, Actor.PLAYER_LEFT_HAND_ID, respect_antispell)
-                        gesture_lh = self.effect_paralysis(prev_gesture)
-                    # elif paralyzeHandID == p.get_rh_id():
-                    else:
-                        prev_gesture = match_data.get_gesture_filtered(
-                            participant_id, match_data.current_turn - 1, Actor.PLAYER_RIGHT_HAND_ID, respect_antispell)
-                        gesture_rh = self.effect_paralysis(prev_gesture)
-                if p.affected_by_amnesia(match_data.current_turn):
-                    # If participant is affected by Amnesia, for both hands
-                    # use their previous gestures
-                    respect_antispell = True
-                    gesture_lh = match_data.get_gesture_filtered(
-                        participant_id, match_data.current_turn - 1, Actor.PLAYER_LEFT_HAND_ID, respect_antispell)
-                    gesture_rh = match_data.get_gesture_filtered(
-                        participant_id, match_data.current_turn - 1, Actor.PLAYER_RIGHT_HAND_ID, respect_antispell)
-                if p.affected_by_fear(match_data.current_turn):
-                    # If participant is affected by Fear, alter gestures in
-                    # both hands using spellbook rules
-                    gesture_lh = self.effect_fear(gesture_lh)
-                    gesture_rh = self.effect_fear(gesture_rh)
-                if p.affected_by_maladroitness(match_data.current_turn):
-                    # If participant is affected by Maladroitness, use RH gesture
-                    # for both hands
-                    gesture_lh = gesture_rh
+                    paralyzed_hand_id = p.states[match_data.current_turn]['paralyzed_hand_id']
+                gesture_lh, gesture_rh = self.apply_gesture_effects(match_data, p, gesture_lh, gesture_rh,
+                                                                    paralyzed_hand_id)
                 # For Charm Person we check if the caster is active this turn
                 # This happens if caster is dead or not active during hasted or timestopped turn
                 if (p.affected_by_charm_person(match_data.current_turn)
@@ -430,7 +396,86 @@ class WarlocksSpellBook(SpellBook):
             match_data.add_gestures(
                 participant_id, match_data.current_turn, gesture_lh, gesture_rh)
 
-    def make_precast_target_checks(self, spell: Spell, match_data: 'WarlocksMatchData',
+    def apply_gesture_effects(self, match_data: 'WarlocksMatchData', participant: Actor, gesture_lh: str,
+                              gesture_rh: str, paralyzed_hand_id: int | None) -> tuple[str, str]:
+        """Alter ordered gestures of a participant by Paralysis, Amnesia, Fear and Maladroitness.
+
+        Used by determine_gestures() and get_effective_gestures(), does not change match data.
+
+        Arguments:
+            match_data (object): WarlocksMatchData instance, match data
+            participant (object): WarlocksParticipant instance
+            gesture_lh (str): ordered LH gesture
+            gesture_rh (str): ordered RH gesture
+            paralyzed_hand_id (int): ID of the hand affected by Paralysis this turn (any ID but LH ID means RH),
+                None if Paralysis does not apply
+
+        Returns:
+            tuple: (LH, RH) gestures
+        """
+        p = participant
+        turn_num = match_data.current_turn
+        respect_antispell = True
+        if paralyzed_hand_id is not None:
+            # If participant is affected by Para, alter gestures in
+            # paralysed hand using spellbook rules
+            if paralyzed_hand_id == p.get_lh_id():
+                prev_gesture = match_data.get_gesture_filtered(
+                    p.id, turn_num - 1, Actor.PLAYER_LEFT_HAND_ID, respect_antispell)
+                gesture_lh = self.effect_paralysis(prev_gesture)
+            else:
+                prev_gesture = match_data.get_gesture_filtered(
+                    p.id, turn_num - 1, Actor.PLAYER_RIGHT_HAND_ID, respect_antispell)
+                gesture_rh = self.effect_paralysis(prev_gesture)
+        if p.affected_by_amnesia(turn_num):
+            # If participant is affected by Amnesia, for both hands
+            # use their previous gestures
+            gesture_lh = match_data.get_gesture_filtered(
+                p.id, turn_num - 1, Actor.PLAYER_LEFT_HAND_ID, respect_antispell)
+            gesture_rh = match_data.get_gesture_filtered(
+                p.id, turn_num - 1, Actor.PLAYER_RIGHT_HAND_ID, respect_antispell)
+        if p.affected_by_fear(turn_num):
+            # If participant is affected by Fear, alter gestures in
+            # both hands using spellbook rules
+            gesture_lh = self.effect_fear(gesture_lh)
+            gesture_rh = self.effect_fear(gesture_rh)
+        if p.affected_by_maladroitness(turn_num):
+            # If participant is affected by Maladroitness, use RH gesture
+            # for both hands
+            gesture_lh = gesture_rh
+        return gesture_lh, gesture_rh
+
+    def get_effective_gestures(self, match_data: 'WarlocksMatchData', participant: Actor,
+                               gesture_pairs: list[tuple[str, str]]) -> dict[tuple[str, str], tuple[str, str]]:
+        """Return gestures the engine would record this turn for ordered gestures of a participant.
+
+        Applies effects the same way as determine_gestures() (see apply_gesture_effects()), without changing
+        match data. The hand chosen by the caster of a new Paralysis and gestures chosen by the caster
+        of Charm Person depend on orders given this turn, so these are not applied.
+
+        Arguments:
+            match_data (object): WarlocksMatchData instance, match data
+            participant (object): WarlocksParticipant instance
+            gesture_pairs (list): ordered (LH, RH) gestures
+
+        Returns:
+            dict: ordered (LH, RH) gestures -> recorded (LH, RH) gestures
+        """
+        if match_data.is_current_turn_timestopped():
+            return {pair: pair for pair in gesture_pairs}
+        p = participant
+        turn_num = match_data.current_turn
+        # Paralysis that continues from the previous turn keeps the same hand
+        paralyzed_hand_id = None
+        if (p.affected_by_paralysis(turn_num)
+                and p.states[turn_num]['paralyzed_by_id'] in match_data.get_ids_participants_active()
+                and p.states[turn_num]['paralyzed_by_id'] == p.states[turn_num - 1]['paralyzed_by_id']):
+            paralyzed_hand_id = p.states[turn_num - 1]['paralyzed_hand_id']
+        return {(gesture_lh, gesture_rh): self.apply_gesture_effects(match_data, p, gesture_lh, gesture_rh,
+                                                                     paralyzed_hand_id)
+                for gesture_lh, gesture_rh in gesture_pairs}
+
+    def make_precast_target_checks(self, spell: SpellCast, match_data: 'WarlocksMatchData',
                                    check_blindness: bool=True, check_invisibility: bool=True, 
                                    check_mmirror: bool=True) -> None:
         """Make pre-cast checks for the spell target.
@@ -439,7 +484,7 @@ class WarlocksSpellBook(SpellBook):
         The second type of checks is target visibility and mirrors.
 
         Arguments:
-            spell (object): Spell Instance, spell to be checked
+            spell (object): SpellCast Instance, spell to be checked
             match_data (object): WarlocksMatchData instance, match data
             check_blindness (bool, optional): flag to check Blindness
             check_invisibility (bool, optional): flag to check Invisibililty
@@ -729,7 +774,8 @@ class WarlocksSpellBook(SpellBook):
             if player_orders.cast_delayed_spell:
                 caster = match_data.get_participant_by_id(participant_id)
                 if caster.get_delayed_spell(match_data.current_turn) is not None:
-                    delayed_spell = caster.get_delayed_spell(match_data.current_turn)
+                    # The banked spell may be shared with forks of the match, so resolution changes a copy
+                    delayed_spell = caster.get_delayed_spell(match_data.current_turn).copy()
                     target = match_data.get_actor_by_id(delayed_spell.target_id)
                     if target is None:
                         delayed_spell.target_id = 0
@@ -846,11 +892,11 @@ class WarlocksSpellBook(SpellBook):
 
     All functions below that match patterns cast_spell_[spellcode] or resolve_spell_[spellcode]
     use the same Arguments:
-        spell (object): Spell instance, spell that is being cast
+        spell (object): SpellCast instance, spell that is being cast
         match_data (object): WarlocksMatchData instance, match data
     """
 
-    def cast_spell_dispel_magic(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_dispel_magic(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, False)
 
@@ -884,11 +930,11 @@ class WarlocksSpellBook(SpellBook):
             if m.is_alive:
                 m.set_destroy_eot()
 
-    def resolve_spell_dispel_magic(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_dispel_magic(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_counter_spell(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_counter_spell(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, False)
 
@@ -900,11 +946,11 @@ class WarlocksSpellBook(SpellBook):
             target.effects[match_data.current_turn]['PShield'] = 1
             target.effects[match_data.current_turn]['MShield'] = 1
 
-    def resolve_spell_counter_spell(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_counter_spell(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_magic_mirror(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_magic_mirror(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, False)
 
@@ -919,11 +965,11 @@ class WarlocksSpellBook(SpellBook):
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castMagicMirrorResolved', actor_id=spell.caster_id, target_id=target.id)
             target.effects[match_data.current_turn]['MagicMirror'] = 1
 
-    def resolve_spell_magic_mirror(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_magic_mirror(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_goblin(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_goblin(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
@@ -938,11 +984,11 @@ class WarlocksSpellBook(SpellBook):
             monster_type = match_data.MONSTER_TYPE_GOBLIN
             self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_goblin(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_goblin(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_ogre(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_ogre(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
@@ -957,11 +1003,11 @@ class WarlocksSpellBook(SpellBook):
             monster_type = match_data.MONSTER_TYPE_OGRE
             self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_ogre(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_ogre(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_troll(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_troll(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
@@ -976,11 +1022,11 @@ class WarlocksSpellBook(SpellBook):
             monster_type = match_data.MONSTER_TYPE_TROLL
             self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_troll(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_troll(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_giant(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_giant(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
@@ -995,39 +1041,39 @@ class WarlocksSpellBook(SpellBook):
             monster_type = match_data.MONSTER_TYPE_GIANT
             self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_giant(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_giant(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_fire_elemental(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_fire_elemental(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, False, False, False)
 
         monster_type = match_data.MONSTER_TYPE_FIREELEM
         self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_fire_elemental(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_fire_elemental(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def cast_spell_summon_ice_elemental(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_summon_ice_elemental(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, False, False, False)
 
         monster_type = match_data.MONSTER_TYPE_ICEELEM
         self.resolve_spell_summon_monster(spell, monster_type, match_data)
 
-    def resolve_spell_summon_ice_elemental(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_ice_elemental(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         return
 
-    def resolve_spell_summon_monster(self, spell: Spell, monster_type: int, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_summon_monster(self, spell: SpellCast, monster_type: int, match_data: 'WarlocksMatchData') -> None:
         """Template monster summon function.
 
         Called by specific monster summon functions.
 
         Arguments:
-            spell (object): Spell instance, spell that is being cast
+            spell (object): SpellCast instance, spell that is being cast
             monster_type (int): monster type
             match_data (object): WarlocksMatchData instance, match data
         """
@@ -1061,7 +1107,7 @@ class WarlocksSpellBook(SpellBook):
             new_monster.attack_id = match_data.get_random_opponent_id(
                 controller.id)
             # Add monster to the list and log the event
-            match_data.monster_list.append(new_monster)
+            match_data.add_monster(new_monster)
             match_data.add_log_entry(match_data.LOG_SUMMON_BASIC, 'castSummonMonsterResolved',
                                      actor_id=spell.caster_id, target_id=controller.id, attack_id=new_monster.id)
 
@@ -1077,18 +1123,16 @@ class WarlocksSpellBook(SpellBook):
             # Remove previous elem of the same type right now
             if monster_type == match_data.MONSTER_TYPE_FIREELEM and fire_elemental_exists:  # there are previous fire elems
                 for e in fire_elemental_ids:
-                    elem = match_data.get_monster_by_id(e)
-                    elem.destroy_now()
+                    match_data.set_destroy_monster_now_by_id(e)
             if monster_type == match_data.MONSTER_TYPE_ICEELEM and ice_elemental_exists:  # there are previous ice elems
                 for e in ice_elemental_ids:
-                    elem = match_data.get_monster_by_id(e)
-                    elem.destroy_now()
+                    match_data.set_destroy_monster_now_by_id(e)
 
             # Request and set ID
             monster_id = match_data.get_next_monster_id()
             new_monster.set_actor_id(monster_id)
             # Add monster to the list and log the event
-            match_data.monster_list.append(new_monster)
+            match_data.add_monster(new_monster)
             if monster_type == match_data.MONSTER_TYPE_FIREELEM:
                 match_data.add_log_entry(match_data.LOG_SUMMON_ELEM, 'castFireElementalResolved2', actor_id=spell.caster_id)
                 if fire_elemental_exists:  # there are previous fire elems
@@ -1112,11 +1156,11 @@ class WarlocksSpellBook(SpellBook):
                     match_data.set_destroy_monster_before_attack_by_id(e)
                 match_data.turns_info[match_data.current_turn]['elementals_clash'] = 1
 
-    def cast_spell_haste(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_haste(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_haste(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_haste(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
 
@@ -1132,11 +1176,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn + 1]['Haste'] = spell.duration
                 match_data.add_log_entry(match_data.LOG_SHIELDS, 'castHasteResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_time_stop(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_time_stop(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_time_stop(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_time_stop(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
 
@@ -1151,11 +1195,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['TimeStop'] = 1
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castTimeStopResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_protection(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_protection(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_protection(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_protection(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
 
@@ -1168,11 +1212,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Protection'] = spell.duration
                 match_data.add_log_entry(match_data.LOG_SHIELDS, 'castProtectionResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_resist_heat(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_resist_heat(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_resist_heat(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_resist_heat(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1186,11 +1230,11 @@ class WarlocksSpellBook(SpellBook):
             target.effects[match_data.current_turn]['ResistHeat'] = spell.duration
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castResistHeatResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_resist_cold(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_resist_cold(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_resist_cold(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_resist_cold(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1204,14 +1248,14 @@ class WarlocksSpellBook(SpellBook):
             target.effects[match_data.current_turn]['ResistCold'] = spell.duration
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castResistColdResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_mind_spell(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_mind_spell(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
         """First cast phase for all mind spells.
 
         Mind spells:
         Paralysis, Fear, Maladroitness, Amnesia, Charm Monster, Charm Person
 
         Arguments:
-            spell (object): Spell instance, spell that is being cast
+            spell (object): SpellCast instance, spell that is being cast
             match_data (object): WarlocksMatchData instance, match data
         """
         self.make_precast_target_checks(spell, match_data, True, True, True)
@@ -1219,11 +1263,11 @@ class WarlocksSpellBook(SpellBook):
         if target is not None:
             target.states[match_data.current_turn]['mindspells_this_turn'] += 1
 
-    def cast_spell_paralysis(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_paralysis(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_paralysis(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_paralysis(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1241,11 +1285,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Paralysis'] = spell.duration
             match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castParalysisResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_amnesia(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_amnesia(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_amnesia(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_amnesia(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1262,11 +1306,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Amnesia'] = spell.duration
             match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castAmnesiaResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_fear(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_fear(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_fear(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_fear(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1283,11 +1327,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Fear'] = spell.duration
             match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castFearResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_maladroitness(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_maladroitness(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_maladroitness(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_maladroitness(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1304,11 +1348,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Maladroitness'] = spell.duration
             match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castMaladroitnessResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_charm_monster(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_charm_monster(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_charm_monster(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_charm_monster(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         caster = match_data.get_actor_by_id(spell.caster_id)
         target = match_data.get_actor_by_id(spell.target_id)
@@ -1333,11 +1377,11 @@ class WarlocksSpellBook(SpellBook):
             else:
                 match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castCharmMonsterElemental', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_charm_person(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_charm_person(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.cast_spell_mind_spell(spell, match_data)
 
-    def resolve_spell_charm_person(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_charm_person(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         caster = match_data.get_actor_by_id(spell.caster_id)
         target = match_data.get_actor_by_id(spell.target_id)
@@ -1356,11 +1400,11 @@ class WarlocksSpellBook(SpellBook):
                 target.states[match_data.current_turn + 1]['charmed_by_id'] = caster.id
                 match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castCharmPersonResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def resolve_spell_sickness(self, spell: Spell, match_data: 'WarlocksMatchData', sickness_type: str) -> None:
+    def resolve_spell_sickness(self, spell: SpellCast, match_data: 'WarlocksMatchData', sickness_type: str) -> None:
         """Resolve Disease and Poison.
 
         Arguments:
-            spell (object): Spell instance, spell that is being cast
+            spell (object): SpellCast instance, spell that is being cast
             match_data (object): WarlocksMatchData instance, match data
             sickness_type (string): 'Disease' or 'Poison'
         """
@@ -1378,29 +1422,29 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn + 1][sickness_type] = spell.duration
                 match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castSicknessResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_disease(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_disease(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_disease(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_disease(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         sickness_type = 'Disease'
         self.resolve_spell_sickness(spell, match_data, sickness_type)
 
-    def cast_spell_poison(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_poison(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_poison(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_poison(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         sickness_type = 'Poison'
         self.resolve_spell_sickness(spell, match_data, sickness_type)
 
-    def resolve_spell_cure_wounds(self, spell: Spell, match_data: 'WarlocksMatchData', heal_amount: int) -> None:
+    def resolve_spell_cure_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData', heal_amount: int) -> None:
         """Resolve cure wounds.
 
         Arguments:
-            spell (object): Spell instance, spell that is being cast
+            spell (object): SpellCast instance, spell that is being cast
             match_data (object): WarlocksMatchData instance, match data
             heal_amount (int): Amount of HP healed
         """
@@ -1416,29 +1460,29 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn]['Disease'] = 0
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castCureWoundsResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_cure_light_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_cure_light_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_cure_light_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_cure_light_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         heal_amount = 1
         self.resolve_spell_cure_wounds(spell, match_data, heal_amount)
 
-    def cast_spell_cure_heavy_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_cure_heavy_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_cure_heavy_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_cure_heavy_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         heal_amount = 2
         self.resolve_spell_cure_wounds(spell, match_data, heal_amount)
 
-    def cast_spell_antispell(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_antispell(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_antispell(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_antispell(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1450,11 +1494,11 @@ class WarlocksSpellBook(SpellBook):
                 target.states[match_data.current_turn]['antispelled'] = 1
                 match_data.add_log_entry(match_data.LOG_MINDSPELLS, 'castAntiSpellResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_blindness(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_blindness(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_blindness(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_blindness(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1472,11 +1516,11 @@ class WarlocksSpellBook(SpellBook):
                     spell.target_id)
                 match_data.add_log_entry(match_data.LOG_ACTOR_DEATH, 'castBlindnessResolvedMonster', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_invisibility(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_invisibility(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_invisibility(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_invisibility(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1493,11 +1537,11 @@ class WarlocksSpellBook(SpellBook):
                 match_data.set_destroy_monster_before_attack_by_id(spell.target_id)
                 match_data.add_log_entry(match_data.LOG_ACTOR_DEATH, 'castInvisibilityResolvedMonster', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_permanency(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_permanency(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_permanency(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_permanency(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1510,11 +1554,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn + 1]['Permanency'] = spell.duration
                 match_data.add_log_entry(match_data.LOG_SHIELDS, 'castPermanencyAndDelayResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_delay_effect(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_delay_effect(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_delay_effect(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_delay_effect(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1528,11 +1572,11 @@ class WarlocksSpellBook(SpellBook):
                 target.effects[match_data.current_turn + 1]['DelayEffect'] = spell.duration
                 match_data.add_log_entry(match_data.LOG_SHIELDS, 'castPermanencyAndDelayResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_remove_enchantment(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_remove_enchantment(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_remove_enchantment(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_remove_enchantment(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1547,11 +1591,11 @@ class WarlocksSpellBook(SpellBook):
                 match_data.set_destroy_actor_eot_by_id(spell.target_id)
                 match_data.add_log_entry(match_data.LOG_ACTOR_DEATH, 'castRemoveEnchantmentResolvedMonster', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_shield(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_shield(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_shield(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_shield(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1562,11 +1606,11 @@ class WarlocksSpellBook(SpellBook):
             target.effects[match_data.current_turn]['PShield'] = 1
             match_data.add_log_entry(match_data.LOG_SHIELDS, 'castShieldResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_magic_missile(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_magic_missile(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_magic_missile(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_magic_missile(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         # ignore protection during timestopped turns, but still check shields
         check_pshield = True
@@ -1581,7 +1625,7 @@ class WarlocksSpellBook(SpellBook):
             target.decrease_hp(1)
             match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castMagicMissileResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def resolve_spell_cause_wounds(self, spell: Spell, match_data: 'WarlocksMatchData', damage_amount: int) -> None:
+    def resolve_spell_cause_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData', damage_amount: int) -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1592,29 +1636,29 @@ class WarlocksSpellBook(SpellBook):
             target.decrease_hp(damage_amount)
             match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castCauseWoundsResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_cause_light_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_cause_light_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_cause_light_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_cause_light_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         damage_amount = 2
         self.resolve_spell_cause_wounds(spell, match_data, damage_amount)
 
-    def cast_spell_cause_heavy_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_cause_heavy_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_cause_heavy_wounds(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_cause_heavy_wounds(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         damage_amount = 3
         self.resolve_spell_cause_wounds(spell, match_data, damage_amount)
 
-    def cast_spell_fireball(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_fireball(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_fireball(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_fireball(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1638,11 +1682,11 @@ class WarlocksSpellBook(SpellBook):
                 match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castFireballResolved',
                                          actor_id=spell.caster_id, target_id=target.id, pronoun_owner_id=target.id)
 
-    def cast_spell_lightning_bolt(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_lightning_bolt(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_lightning_bolt(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_lightning_bolt(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1653,11 +1697,11 @@ class WarlocksSpellBook(SpellBook):
             target.decrease_hp(5)
             match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castLightningBoltResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_clap_of_lightning(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_clap_of_lightning(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_clap_of_lightning(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_clap_of_lightning(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         caster = match_data.get_actor_by_id(spell.caster_id)
         if caster.states[match_data.current_turn]['clap_of_lightning'] > 0:
@@ -1673,11 +1717,11 @@ class WarlocksSpellBook(SpellBook):
                 target.decrease_hp(5)
                 match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castLightningBoltResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_finger_of_death(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_finger_of_death(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, True, True, True)
 
-    def resolve_spell_finger_of_death(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_finger_of_death(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         target = match_data.get_actor_by_id(spell.target_id)
         if target is None:
@@ -1686,13 +1730,13 @@ class WarlocksSpellBook(SpellBook):
             match_data.set_destroy_actor_eot_by_id(spell.target_id)
             match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castFingerOfDeathResolved', actor_id=spell.caster_id, target_id=target.id)
 
-    def cast_spell_fire_storm(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_fire_storm(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, False, False, False)
         # caster = match_data.get_participant_by_id(spell.caster_id)
         match_data.turns_info[match_data.current_turn]['fire_storms'] += 1
 
-    def resolve_spell_fire_storm(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_fire_storm(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         # target = match_data.get_actor_by_id(spell.target_id)
         match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castFireStormResolved', actor_id=spell.caster_id)
@@ -1717,13 +1761,13 @@ class WarlocksSpellBook(SpellBook):
                     m.decrease_hp(5)
                     match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'effectFireStormDamaged', actor_id=spell.caster_id, target_id=m.id)
 
-    def cast_spell_ice_storm(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def cast_spell_ice_storm(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         self.make_precast_target_checks(spell, match_data, False, False, False)
         # caster = match_data.get_participant_by_id(spell.caster_id)
         match_data.turns_info[match_data.current_turn]['ice_storms'] += 1
 
-    def resolve_spell_ice_storm(self, spell: Spell, match_data: 'WarlocksMatchData') -> None:
+    def resolve_spell_ice_storm(self, spell: SpellCast, match_data: 'WarlocksMatchData') -> None:
 
         # target = match_data.get_actor_by_id(spell.target_id)
         match_data.add_log_entry(match_data.LOG_DAMAGE_AND_POISON, 'castIceStormResolved')
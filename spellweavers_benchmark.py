@@ -0,0 +1,38 @@
+import argparse
+import json
+import sys
+from benchmarks.tools_benchmark import (DEFAULT_SCENARIOS, compare_results, format_results, load_results,
+                                        run_benchmarks, save_results)
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Measure engine performance on synthetic matches.')
+    parser.add_argument('--scenario', action='append', default=[],
+                        help='run only this scenario (see DEFAULT_SCENARIOS), can be repeated')
+    parser.add_argument('--scenarios', default='', help='JSON file with a list of custom scenarios')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the order generator')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per scenario (best is reported)')
+    parser.add_argument('--keep-orders', default='', help='directory to keep generated order files in')
+    parser.add_argument('--output', default='', help='file to write JSON results to')
+    parser.add_argument('--compare', default='', help='JSON results of a previous run to compare with')
+    args = parser.parse_args()
+
+    scenarios = DEFAULT_SCENARIOS
+    if args.scenarios:
+        with open(args.scenarios, 'r') as f:
+            scenarios = json.load(f)
+    if args.scenario:
+        scenarios = [s for s in scenarios if s['name'] in args.scenario]
+        if not scenarios:
+            sys.exit(f'Unknown scenario(s): {", ".join(args.scenario)}')
+
+    results = run_benchmarks(scenarios, args.seed, args.repeat, args.keep_orders)
+    comparison = None
+    if args.compare:
+        comparison = compare_results(load_results(args.compare), results)
+        results['comparison'] = comparison
+    if args.output:
+        save_results(results, args.output)
+
+    for line in format_results(results, comparison):
+        print(line)
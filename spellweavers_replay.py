@@ -0,0 +1,43 @@
+import argparse
+import json
+import sys
+from common.tools_replay import load_replay_tasks, replay_batch
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Replay many matches from JSON order files across a process pool.')
+    parser.add_argument('path', help='directory with JSON order files or a JSON manifest')
+    parser.add_argument('--spellbook', default='', help='spellbook code, f.e. Warlocks or Spellbinder')
+    parser.add_argument('--players', default='', help='JSON file with a list of players (match_players_init)')
+    parser.add_argument('--match-id', type=int, default=123456, help='match ID used in order files')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all CPUs)')
+    parser.add_argument('--pov', type=int, action='append', default=[],
+                        help='include logs and statuses for this POV (-1 sees everything), can be repeated')
+    parser.add_argument('--lang', default='en', help='language code for logs and statuses')
+    parser.add_argument('--streaming', action='store_true', help='read order files gradually, turn by turn')
+    parser.add_argument('--output', default='', help='file to write JSON results to (default: stdout)')
+    args = parser.parse_args()
+
+    match_players_init = None
+    if args.players:
+        with open(args.players, 'r') as f:
+            match_players_init = json.load(f)
+
+    try:
+        tasks = load_replay_tasks(args.path, args.spellbook, match_players_init, args.match_id,
+                                  args.lang, args.pov, args.streaming)
+    except ValueError as e:
+        parser.error(str(e))
+    replay_results = replay_batch(tasks, args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(replay_results, f, indent=1)
+    else:
+        json.dump(replay_results, sys.stdout, indent=1)
+        print()
+
+    summary = replay_results['summary']
+    print(f"Replayed {summary['total']} matches in {summary['duration']:.2f}s: "
+          f"{summary['passed']} passed, {summary['failed']} failed", file=sys.stderr)
+    sys.exit(1 if summary['failed'] else 0)
@@ -0,0 +1,30 @@
+import argparse
+import json
+import sys
+from common.tools_bots import BOTS
+from common.tools_selfplay import DEFAULT_MAX_TURNS, format_selfplay_results, run_selfplay
+
+# MAIN
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Play matches between bots headlessly and report win rates.')
+    parser.add_argument('bots', nargs='+', choices=list(BOTS), help='bot for every participant, in order of IDs')
+    parser.add_argument('--spellbook', default='Warlocks', choices=['Warlocks', 'Spellbinder'], help='spellbook code')
+    parser.add_argument('--matches', type=int, default=100, help='number of matches')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first match')
+    parser.add_argument('--teams', type=int, default=0, help='number of teams (default: every bot for themselves)')
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS,
+                        help='the last turn to play, longer matches are counted as unfinished')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all CPUs)')
+    parser.add_argument('--output', default='', help='file to write JSON results to')
+    args = parser.parse_args()
+
+    if len(args.bots) < 2:
+        sys.exit('At least 2 bots are needed for a match')
+    selfplay_results = run_selfplay(args.spellbook, args.bots, args.matches, args.seed, args.teams,
+                                    args.max_turns, args.workers)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(selfplay_results, f, indent=1)
+    for line in format_selfplay_results(selfplay_results):
+        print(line)
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import json
+from common.tools_server import MatchServer, run_load_test
+
+
+async def serve_forever(args: argparse.Namespace) -> None:
+    """Host matches until interrupted, printing statistics every stats_interval seconds."""
+    server = MatchServer(args.workers, args.lang)
+    listener = await server.serve(args.host, args.port, args.unix)
+    print('Listening on', args.unix or f'{args.host}:{listener.sockets[0].getsockname()[1]}')
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            print(json.dumps(server.get_stats()))
+    finally:
+        listener.close()
+        server.shutdown()
+
+# MAIN
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Host concurrent matches for clients talking JSON lines over TCP '
+                                                 'or a Unix socket (see MatchServer in common/tools_server.py).')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port')
+    parser.add_argument('--unix', default='', help='Unix socket path to listen on instead of TCP')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: all CPUs, 0: process turns in a thread)')
+    parser.add_argument('--lang', default='en', help='language of match logs')
+    parser.add_argument('--stats-interval', type=float, default=60, help='seconds between statistics prints')
+    parser.add_argument('--load-test', type=int, default=0,
+                        help='play this many concurrent matches with random orders against a local server and exit')
+    parser.add_argument('--spellbook', default='Warlocks', choices=['Warlocks', 'Spellbinder'],
+                        help='spellbook of load test matches')
+    parser.add_argument('--players', type=int, default=2, help='number of participants in load test matches')
+    parser.add_argument('--max-turns', type=int, default=50, help='the last turn of load test matches')
+    args = parser.parse_args()
+
+    if args.load_test:
+        stats = asyncio.run(run_load_test(args.load_test, args.spellbook, args.players, args.workers,
+                                          args.max_turns, args.unix))
+        latency = stats['latencyMs']
+        print(f"{stats['matchesCreated']} matches, {stats['turns']} turns in {stats['duration']:.2f}s: "
+              f"{stats['turnsPerSecond']:.1f} turns/s")
+        print(f"turn latency ms: mean {latency['mean']:.2f}, p50 {latency['p50']:.2f}, p95 {latency['p95']:.2f}, "
+              f"p99 {latency['p99']:.2f}, max {latency['max']:.2f}; worker time mean {stats['resolveMs']['mean']:.2f}")
+        for worker in stats['workers']:
+            print(f"worker {worker['pid']}: peak {worker['peakMatches']} matches")
+    else:
+        try:
+            asyncio.run(serve_forever(args))
+        except KeyboardInterrupt:
+            pass
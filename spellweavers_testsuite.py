@@ -1,67 +1,28 @@
-from tests_core.tests_engine_core import run_common_tests
-from tests_warlocks.tests_spellbook_warlocks import run_warlocks_tests, run_warlocks_attack_seed_test
-from tests_spellbinder.tests_spellbook_spellbinder import run_spellbinder_tests, run_spellbinder_tests_melee
+import argparse
+import json
+import sys
+from common.tools_testrunner import discover_tests, format_test_summary, run_tests_parallel, run_tests_sequential
 
 # MAIN
 if __name__ == '__main__':
 
-    match_id = 123456
-
-    available_spellbooks = {
-        1: {'code': 'Warlocks', 'title': "RavenBlack's Warlocks - ParaFC Maladroit"},
-        2: {'code': 'Spellbinder', 'title': "Bartle's Spellbinder - Original Ruleset"},
-        3: {'code': 'TBD', 'title': "TBD"},
-    }
-
-    lang_code = 'en'
-    # -1 sees everything (p1 | p2 | ...), 0 sees only public (p1 & p2 & ...), 1.. see from participant perspective
-    def_pov_id = -1
-
-    # 0 - no output code runs, 1 - output code runs but is silent, 2 - output code runs normally 
-    silent_run = 1
-
-    match_spellbook = 1
-
-    match_players_init = [
-        {'player_id': 2, 'player_name': 'TestWarlock',
-            'gender': 1, 'team_id': 1, 'lang': 'en'},
-        {'player_id': 3, 'player_name': 'TestFoe',
-            'gender': 0, 'team_id': 2, 'lang': 'en'},
-    ]
-
-    run_common_tests(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
-
-    run_warlocks_tests(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
-
-    match_players_init = [
-        {'player_id': 2, 'player_name': 'TestWarlock',
-            'gender': 1, 'team_id': 1, 'lang': 'en'},
-        {'player_id': 3, 'player_name': 'TestFoe',
-            'gender': 0, 'team_id': 2, 'lang': 'en'},
-        {'player_id': 4, 'player_name': 'TestAlly',
-            'gender': 2, 'team_id': 1, 'lang': 'en'},
-        {'player_id': 5, 'player_name': 'TestFoe2',
-            'gender': 2, 'team_id': 2, 'lang': 'en'},
-    ]
-
-    run_warlocks_attack_seed_test(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
-
-    match_spellbook = 2
-
-    match_players_init = [
-        {'player_id': 2, 'player_name': 'TestWarlock',
-            'gender': 1, 'team_id': 1, 'lang': 'en'},
-        {'player_id': 3, 'player_name': 'TestFoe',
-            'gender': 0, 'team_id': 2, 'lang': 'en'},
-    ]
-    run_spellbinder_tests(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
-
-    match_players_init = [
-        {'player_id': 2, 'player_name': 'TestWarlock',
-            'gender': 1, 'team_id': 1, 'lang': 'en'},
-        {'player_id': 3, 'player_name': 'TestFoe',
-            'gender': 0, 'team_id': 2, 'lang': 'en'},
-        {'player_id': 4, 'player_name': 'TestFoe2',
-            'gender': 2, 'team_id': 3, 'lang': 'en'},
-    ]
-    run_spellbinder_tests_melee(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    parser = argparse.ArgumentParser(description='Run engine tests (see TEST_GROUPS in common/tools_testrunner.py).')
+    parser.add_argument('--parallel', action='store_true',
+                        help='run every test separately across a pool of worker processes and print a summary')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all CPUs)')
+    parser.add_argument('--slowest', type=int, default=10, help='number of slowest tests to list in the summary')
+    parser.add_argument('--output', default='', help='file to write JSON results of a parallel run to')
+    args = parser.parse_args()
+
+    if not args.parallel:
+        # Run groups of tests one by one, stopping at the first failed assertion
+        run_tests_sequential()
+        sys.exit(0)
+
+    test_results = run_tests_parallel(discover_tests(), args.workers)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(test_results, f, indent=1)
+    for line in format_test_summary(test_results, args.slowest):
+        print(line)
+    sys.exit(1 if test_results['summary']['failed'] else 0)
@@ -1,11 +1,22 @@
+import asyncio
+import json
 import os
-from common.tools_engine import import_name
+import pickle
+from common.tools_registry import create_match, fork_match, play_turn
+from common.tools_replay import load_replay_tasks, replay_batch
+from common.tools_selfplay import play_selfplay_match
+from common.tools_server import MatchClient, MatchServer, get_hosted_matches, worker_close_match
+from common.tools_snapshot import restore_match, snapshot_match
+from ruleset_core.class_orderprovider import FileOrderProvider, QueueOrderProvider
+from ruleset_core.class_orders import Orders
+from ruleset_core.class_turntable import TurnHistory, TurnTable
 
 
-def match_process_json(match_id: int, spellbook_code: str, match_players_init: list[dict[str, str | int]], match_json_fname: str):
+def match_process_json(match_id: int, spellbook_code: str, match_players_init: list[dict[str, str | int]], match_json_fname: str,
+                       streaming_orders: bool=False, snapshot_each_turn: bool=False, fork_each_turn: bool=False):
     """Initiate game variables and play a game using JSON file as a source of orders.
 
-    Classes and variables are loaded dynamically from selected spellbook files.
+    Classes and variables are loaded dynamically from selected spellbook files (once per process).
     For example, for Warlocks spellbook and for English language we load the following:
     from class_warlocks_match_data import WarlocksMatchData
     from class_warlocks_spellbook import WarlocksSpellBook
@@ -24,23 +35,19 @@ def match_process_json(match_id: int, spellbook_code: str, match_players_init: l
         spellbook_code (str): selected spellbook code, f.e. "Warlocks"
         match_players_init (list): a list with basic participant info (usernames, etc.)
         match_json_fname (str): name of the json file to parse orders from
+        streaming_orders (bool, optional): flag to read orders file gradually, turn by turn (for huge archives)
+        snapshot_each_turn (bool, optional): flag to save match objects to a snapshot after every turn
+            and continue with objects restored from it (to test snapshots)
+        fork_each_turn (bool, optional): flag to fork match objects after every turn
+            and continue with the fork (to test forks)
 
     Returns:
         object: instance of spellbook-specific MatchData-inherited object
     """
-    lib_name = 'ruleset_' + spellbook_code.lower() + '.'
-
-    # Init match data
-    match_data = import_name(lib_name + 'class_' + spellbook_code.lower() + '_matchdata',
-                             spellbook_code + 'MatchData')(match_id)
-    # Init spellbook
-    match_spellbook = import_name(lib_name + 'class_' + spellbook_code.lower() + '_spellbook',
-                                  spellbook_code + 'SpellBook')()
-    # Init orders
-    match_orders = import_name(lib_name + 'class_' + spellbook_code.lower() + '_orders',
-                               spellbook_code + 'Orders')()
-
-    match_orders.set_filename(match_json_fname)
+    # Init match data, spellbook and orders
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+
+    match_orders.set_filename(match_json_fname, streaming_orders)
     # Init participants and start the match
     match_data.init_actors_tmp(match_players_init)
     match_data.process_match_start()
@@ -71,6 +78,14 @@ def match_process_json(match_id: int, spellbook_code: str, match_players_init: l
         if match_data.get_match_status_ongoing():
             match_data.set_current_turn(match_data.current_turn + 1)
 
+        if snapshot_each_turn:
+            match_data, match_spellbook, match_orders = restore_match(
+                snapshot_match(match_data, match_spellbook, match_orders))
+
+        if fork_each_turn:
+            match_data, match_spellbook, match_orders = fork_match(match_data, match_spellbook, match_orders)
+            match_orders.set_filename(match_json_fname, streaming_orders)
+
     return match_data
 
 
@@ -108,7 +123,558 @@ def test_template(available_spellbooks, match_spellbook, match_id, match_players
     assert (p2.hp == 15)
 
 
+def test_spells_completable_next_turn(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check spells that can be completed next turn after S, W, S with the right hand."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    print('Testing S-W-S (spells completable next turn)')
+
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    for turn_num, gesture in enumerate('SWS', 1):
+        for participant_id in [1, 2]:
+            match_orders.add_file_order({'matchID': match_id, 'turnNum': turn_num, 'participantID': participant_id,
+                                         'gestureLH': '-', 'gestureRH': gesture if participant_id == 1 else '-'})
+        assert (play_turn(match_data, match_spellbook, match_orders))
+
+    # Shield (P) for both hands, Magic Missile (SD) for the right hand
+    spell_ids = match_spellbook.get_spells_completable_next_turn(match_data, 1)
+    notations = {hand: [pattern['notation'] for spell_id in spell_ids[hand]
+                        for pattern in match_spellbook.spell_templates[spell_id].patterns] for hand in spell_ids}
+    assert (notations == {1: ['P'], 2: ['P', 'SD']})
+
+    # Spell templates are shared by all matches, so their patterns and flags are read-only
+    template = match_spellbook.spell_templates[spell_ids[2][-1]]
+    for mapping in [template.patterns[0], template.flags]:
+        error = None
+        try:
+            mapping['length'] = 0
+        except TypeError as e:
+            error = e
+        assert (error is not None)
+
+
+def test_streaming_orders(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that matches play the same with orders read from files gradually, in chunks much smaller than orders,
+    and that orders listed after orders for a later turn are ignored in streaming mode."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filenames = [os.path.join('tests_core', 'test_!template.json'),
+                            os.path.join('tests_' + spellbook_code.lower(), 'test_spell_04_summongoblin_A_deftarget.json')]
+    print('Testing', ', '.join(match_json_filenames), '(streaming orders)')
+
+    stream_chunk_size = Orders.STREAM_CHUNK_SIZE
+    # Every order, and most of the values, spans several chunks
+    Orders.STREAM_CHUNK_SIZE = 16
+    try:
+        for match_json_filename in match_json_filenames:
+            outputs = []
+            for streaming_orders in [False, True]:
+                match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename,
+                                                 streaming_orders=streaming_orders)
+                match_data.match_init_output(spellbook_code, lang_code)
+                outputs.append(match_data.print_match_log(def_pov_id, stay_silent=True)
+                               + match_data.print_actor_statuses(def_pov_id, stay_silent=True))
+            assert (outputs[0] == outputs[1])
+
+        # The turn 1 order of participant 2 comes after the turn 2 order of participant 1
+        match_json_filename = os.path.join('tests_core', 'test_!template_unsorted.json')
+        match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename)
+        assert (match_data.current_turn == 11)
+        match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename,
+                                        streaming_orders=True)
+        assert (match_data.current_turn == 1)
+        assert (match_data.get_match_status_ongoing())
+    finally:
+        Orders.STREAM_CHUNK_SIZE = stream_chunk_size
+
+
+def test_replay(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check replay tasks from a manifest and a directory, and pass / fail results of a batch replay."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    manifest_filename = os.path.join('tests_core', 'test_!replay_manifest.json')
+    print('Testing', manifest_filename, '(replay)')
+
+    tasks = load_replay_tasks(manifest_filename, spellbook_code, match_players_init)
+    assert ([task['orders_filename'] for task in tasks] == [os.path.join('tests_core', 'test_!template.json')] * 2
+            + [os.path.join('tests_core', 'test_!missing.json')])
+    assert (tasks[1]['expected'] == {'currentTurn': 5})
+
+    replay_results = [replay_batch(tasks, workers) for workers in [1, 2]]
+    for replay_result in replay_results:
+        assert ({**replay_result['summary'], 'duration': 0} == {'total': 3, 'passed': 1, 'failed': 2, 'duration': 0})
+        results = replay_result['results']
+        assert (results[0]['passed'] and results[0]['current_turn'] == 11)
+        assert (results[1]['failures'] == ['currentTurn is 11, expected 5'])
+        assert ('FileNotFoundError' in results[2]['error'])
+    assert ([{**r, 'duration': 0} for r in replay_results[0]['results']]
+            == [{**r, 'duration': 0} for r in replay_results[1]['results']])
+
+    # Files in a directory have no expectations, manifests are skipped, and the spellbook is required
+    tasks = load_replay_tasks('tests_core', spellbook_code, match_players_init)
+    assert ([os.path.basename(task['orders_filename']) for task in tasks]
+            == sorted(filename for filename in os.listdir('tests_core')
+                      if filename.endswith('.json') and filename != os.path.basename(manifest_filename)))
+    assert (all(task['expected'] == {} for task in tasks))
+    error = ''
+    try:
+        load_replay_tasks('tests_core')
+    except ValueError as e:
+        error = str(e)
+    assert (error.startswith('Spellbook code is required'))
+
+
+def test_visibility_cache(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that the visibility matrix of the current turn is cached until blindness changes or the turn ends."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filename = os.path.join('tests_core', 'test_!template.json')
+    print('Testing', match_json_filename, '(visibility cache)')
+
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+    match_orders.set_filename(match_json_filename)
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    while play_turn(match_data, match_spellbook, match_orders):
+        pass
+    turn_num = match_data.current_turn
+
+    matrix = match_data.get_visibility_matrix(turn_num)
+    assert (match_data.get_visibility_matrix(turn_num) is matrix)
+    assert (matrix.check_gesture_visibility(1, 2))
+    match_data.get_participant_by_id(1, False).states[turn_num]['blind'] = 1
+    matrix = match_data.get_visibility_matrix(turn_num)
+    assert (not matrix.check_gesture_visibility(1, 2))
+    assert (match_data.get_visibility_matrix(turn_num) is matrix)
+    match_data.set_current_turn(turn_num + 1)
+    assert (match_data.current_visibility_matrix is None)
+
+
+def test_turn_table(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check values and flags bitmasks of turn tables, resets of turns and forks of tables and turn histories."""
+    print('Testing TurnTable')
+
+    # Bit 1 is set while 'a' is truthy, bit 2 while 'b' is 3 or 4, bit 4 while 'b' is truthy
+    flag_rules: dict[str, list[tuple[int, frozenset | None]]] = {'a': [(1, None)], 'b': [(2, frozenset({3, 4})), (4, None)], 'missing': [(8, None)]}
+    for typecode in ['', 'i']:
+        table = TurnTable({'a': 0, 'b': 3, 'c': 7}, typecode, flag_rules)
+        assert (table.default_flags == 2 | 4)
+        table.init_turn(1)
+        assert (table[1].copy() == {'a': 0, 'b': 3, 'c': 7})
+        assert (table.get_flags(1) == table[1].flags == 2 | 4)
+
+        table[1]['a'] = 5
+        table[1]['b'] = 1
+        assert (table.get_flags(1) == 1 | 4)
+        table[1]['b'] = 0
+        assert (table.get_flags(1) == 1)
+        table[1]['c'] = 9
+        assert (table.get_flags(1) == 1)
+
+        # Assigning a turn replaces all of its values, missing fields get defaults
+        table[2] = {'b': 4}
+        assert (table[2].copy() == {'a': 0, 'b': 4, 'c': 7})
+        assert (table.get_flags(2) == 2 | 4)
+        table[2] = table[1]
+        assert (table[2].copy() == {'a': 5, 'b': 0, 'c': 9})
+        assert (table.get_flags(2) == 1)
+        # Assigning a turn to itself keeps it as it is
+        table[1] = table[1]
+        assert (table[1].copy() == {'a': 5, 'b': 0, 'c': 9})
+        assert (table.get_flags(1) == 1)
+
+        # A fork changes independently of the original: it refers to turns before the fork turn
+        # and copies them on the first change, later turns are copied by the fork itself
+        fork = table.fork(2)
+        assert (fork.offsets.keys() == {2} and fork[1].storage is table.data)
+        fork[1]['a'] = 0
+        fork[2]['c'] = 1
+        fork.init_turn(3)
+        assert (fork.get_flags(1) == 0)
+        assert (table[1]['a'] == 5 and table.get_flags(1) == 1 and table[2]['c'] == 9)
+        assert (3 not in table and list(fork) == [1, 2, 3])
+        # Forks of forks are flattened after a while, and forks are pickled without their parents
+        for turn_num in range(4, 4 + 2 * TurnTable.MAX_FORK_DEPTH):
+            fork = fork.fork(turn_num)
+            fork.init_turn(turn_num)['b'] = turn_num
+            assert (fork.depth <= TurnTable.MAX_FORK_DEPTH)
+        assert (list(fork) == list(range(1, 4 + 2 * TurnTable.MAX_FORK_DEPTH)) and fork[1]['a'] == 0)
+        restored = pickle.loads(pickle.dumps(fork))
+        assert (restored.base is None and repr(restored) == repr(fork))
+
+        # Init of an existing turn resets its values and flags to defaults
+        table.init_turn(1)
+        assert (table[1].copy() == {'a': 0, 'b': 3, 'c': 7})
+        assert (table.get_flags(1) == 2 | 4)
+        assert (table[2]['a'] == 5)
+        del table[2]
+        assert (list(table) == [1] and len(table) == 1)
+
+    # Turn histories are forked the same way: turns before the fork turn stay in the parent history
+    history = TurnHistory({1: {'x': 1}, 2: {'x': 2}})
+    fork_history = history.fork(2, dict.copy)
+    assert (fork_history.count_stored() == 1 and fork_history[1] is history[1] and fork_history[2] is not history[2])
+    fork_history[3] = {'x': 3}
+    history[2]['x'] = 0
+    assert (1 in fork_history and 3 not in history and fork_history.get(4) is None)
+    assert (list(fork_history) == [1, 2, 3] and fork_history == {1: {'x': 1}, 2: {'x': 2}, 3: {'x': 3}})
+    assert (pickle.loads(pickle.dumps(fork_history)) == fork_history)
+
+
+def test_snapshot_restore(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that a match restored from snapshots after every turn ends the same way as a regular one."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filename = os.path.join('tests_' + spellbook_code.lower(), 'test_spell_04_summongoblin_A_deftarget.json')
+    print('Testing', match_json_filename, '(snapshots)')
+
+    outputs = []
+    for snapshot_each_turn in [False, True]:
+        match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename,
+                                         snapshot_each_turn=snapshot_each_turn)
+        match_data.match_init_output(spellbook_code, lang_code)
+        outputs.append(match_data.print_match_log(def_pov_id, stay_silent=True)
+                       + match_data.print_actor_statuses(def_pov_id, stay_silent=True))
+    assert (outputs[0] == outputs[1])
+    assert (len(match_data.monster_list) == 1)
+
+
+def get_fork_size(match_data):
+    """Return the number of values a forked match stores itself (not in the original match)."""
+    return (sum(len(getattr(actor, name).data) for actor in match_data.participant_list + match_data.monster_list
+                for name in actor.TURN_TABLES)
+            + len(match_data.match_log.match_ids) + len(match_data.match_log.turn_ranges)
+            + sum(gestures.count_stored() for gestures in match_data.match_gestures.values())
+            + match_data.visibility_matrices.count_stored() + match_data.turns_info.count_stored())
+
+
+def test_fork(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that a match forked after every turn ends the same way as a regular one,
+    and that branches played with other orders (including a banked spell) do not change the original match."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filename = os.path.join('tests_' + spellbook_code.lower(), 'test_spell_04_summongoblin_A_deftarget.json')
+    print('Testing', match_json_filename, '(forks)')
+
+    outputs = []
+    for fork_each_turn in [False, True]:
+        match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename,
+                                         fork_each_turn=fork_each_turn)
+        match_data.match_init_output(spellbook_code, lang_code)
+        outputs.append(match_data.print_match_log(def_pov_id, stay_silent=True)
+                       + match_data.print_actor_statuses(def_pov_id, stay_silent=True))
+    assert (outputs[0] == outputs[1])
+
+    # 10 turns of _/_, then a branch where participant 1 surrenders (P/P) on turn 11
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+    match_orders.set_filename(os.path.join('tests_core', 'test_!template.json'))
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    fork_sizes = []
+    while play_turn(match_data, match_spellbook, match_orders):
+        fork_sizes.append(get_fork_size(fork_match(match_data, match_spellbook, match_orders)[0]))
+    assert (match_data.current_turn == 11)
+    # Forks refer to the history of the original match, so a fork stores as much on turn 11 as on turn 2
+    assert (len(fork_sizes) == 10 and len(set(fork_sizes)) == 1)
+    match_data.match_init_output(spellbook_code, lang_code)
+    log_before = match_data.print_match_log(def_pov_id, stay_silent=True)
+
+    branch_data, branch_spellbook, branch_orders = fork_match(match_data, match_spellbook, match_orders)
+    for participant_id in [1, 2]:
+        gesture = 'P' if participant_id == 1 else '-'
+        branch_orders.add_file_order({'matchID': match_id, 'turnNum': branch_data.current_turn,
+                                      'participantID': participant_id, 'gestureLH': gesture, 'gestureRH': gesture})
+    assert (play_turn(branch_data, branch_spellbook, branch_orders))
+    assert (branch_data.get_participant_by_id(1) is None)
+    assert (branch_data.get_match_status_finished())
+
+    assert (match_data.get_participant_by_id(1) is not None)
+    assert (match_data.get_match_status_ongoing())
+    assert (match_data.current_turn == 11)
+    assert (match_data.print_match_log(def_pov_id, stay_silent=True) == log_before)
+
+    # Participant 1 has Cause Light Wounds banked for turn 8. In a branch participant 2 casts Magic Mirror,
+    # which reflects the banked spell. The original match still has the spell as it was banked.
+    match_json_filename = os.path.join('tests_' + spellbook_code.lower(), 'test_spell_29_delayeffect_A_deftarget.json')
+    match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+    match_orders.set_filename(match_json_filename)
+    match_data.init_actors_tmp(match_players_init)
+    match_data.process_match_start()
+    while match_data.current_turn < 8:
+        assert (play_turn(match_data, match_spellbook, match_orders))
+    delayed_spell = match_data.get_participant_by_id(1).get_delayed_spell(8)
+    assert ((delayed_spell.caster_id, delayed_spell.target_id) == (1, 2))
+
+    branch_data, branch_spellbook, branch_orders = fork_match(match_data, match_spellbook, match_orders)
+    for turn_num, gesture, cast_delayed_spell in [(8, 'C', -1), (9, 'W', 1)]:
+        branch_orders.add_file_order({'matchID': match_id, 'turnNum': turn_num, 'participantID': 1,
+                                      'gestureLH': '-', 'gestureRH': '-', 'castDelayedSpell': cast_delayed_spell})
+        branch_orders.add_file_order({'matchID': match_id, 'turnNum': turn_num, 'participantID': 2,
+                                      'gestureLH': gesture, 'gestureRH': gesture})
+        assert (play_turn(branch_data, branch_spellbook, branch_orders))
+    assert ((branch_data.get_participant_by_id(1).hp, branch_data.get_participant_by_id(2).hp) == (13, 15))
+
+    assert ((delayed_spell.caster_id, delayed_spell.target_id) == (1, 2))
+    while play_turn(match_data, match_spellbook, match_orders):
+        pass
+    assert ((match_data.get_participant_by_id(1).hp, match_data.get_participant_by_id(2).hp) == (15, 13))
+
+
+def check_order_space(match_data, match_spellbook, match_orders, participant_id):
+    """Check that every hand option of the order space of a participant leads to the gestures and spells it lists.
+
+    Other participants show no gestures in the checked turn.
+    """
+    match_id = match_data.match_id
+    turn_num = match_data.current_turn
+    order_space = match_spellbook.get_order_space(match_data, participant_id)
+    assert (len(order_space.effective_gestures) == len(match_spellbook.valid_gestures) ** 2)
+    outcomes = [(option.gestures, option.spells) for option in order_space.hand_options]
+    assert (len(outcomes) == len(set(outcomes)))
+    assert (order_space.count() >= len(order_space.hand_options))
+
+    for option in order_space.hand_options:
+        branch_data, branch_spellbook, branch_orders = fork_match(match_data, match_spellbook, match_orders)
+        branch_orders.add_file_order(order_space.make_order((option.order,)
+                                                            + tuple(alternatives[0] for alternatives in option.choices)
+                                                            + tuple(alternatives[0] for alternatives in order_space.choices)))
+        for other_id in match_data.get_ids_participants_active():
+            if other_id != participant_id:
+                branch_orders.add_file_order({'matchID': match_id, 'turnNum': turn_num, 'participantID': other_id,
+                                              'gestureLH': '-', 'gestureRH': '-'})
+        assert (play_turn(branch_data, branch_spellbook, branch_orders))
+        assert ((branch_data.get_gesture(participant_id, turn_num, 1),
+                 branch_data.get_gesture(participant_id, turn_num, 2)) == option.gestures)
+        spells = sorted((spell.used_hand, spell.id) for spell in branch_spellbook.stack
+                        if spell.caster_id == participant_id and spell.cast_turn == turn_num)
+        assert (tuple(spells) == option.spells)
+    return order_space
+
+
+def test_order_space(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that every hand option of the order space leads to the gestures and spells it lists,
+    both in a turn with no effects and in turns when gestures of the participant are changed by
+    Fear, Amnesia and continuing Paralysis."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    tests_folder = 'tests_' + spellbook_code.lower()
+    # Match file, the turn to check (0 - after the last turn of the file), participant ID, effect
+    scenarios = [(os.path.join('tests_core', 'test_!template.json'), 0, 1, None),
+                 (os.path.join(tests_folder, 'test_spell_17_fear_A_deftarget.json'), 10, 2, 'fear'),
+                 (os.path.join(tests_folder, 'test_spell_16_amnesia_A_deftarget.json'), 10, 2, 'amnesia'),
+                 (os.path.join(tests_folder, 'test_spell_15_paralysis_A_deftarget.json'), 11, 2, 'paralysis')]
+
+    for match_json_filename, turn_num, participant_id, effect in scenarios:
+        print('Testing', match_json_filename, '(order space)')
+        match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+        match_orders.set_filename(match_json_filename)
+        match_data.init_actors_tmp(match_players_init)
+        match_data.process_match_start()
+        while (turn_num == 0 or match_data.current_turn < turn_num) and play_turn(match_data, match_spellbook, match_orders):
+            pass
+        assert (turn_num == 0 or match_data.current_turn == turn_num)
+        turn_num = match_data.current_turn
+
+        p = match_data.get_participant_by_id(participant_id, False)
+        if effect == 'fear':
+            assert (p.affected_by_fear(turn_num))
+        elif effect == 'amnesia':
+            assert (p.affected_by_amnesia(turn_num))
+        elif effect == 'paralysis':
+            # Paralysis continues from the previous turn, so the paralyzed hand is known before orders are given
+            assert (p.affected_by_paralysis(turn_num))
+            assert (p.affected_by_paralysis(turn_num - 1))
+
+        order_space = check_order_space(match_data, match_spellbook, match_orders, participant_id)
+        distinct_gestures = set(order_space.effective_gestures.values())
+        if effect is None:
+            assert (len(distinct_gestures) == len(order_space.effective_gestures))
+        else:
+            assert (len(distinct_gestures) < len(order_space.effective_gestures))
+
+
+def test_order_providers(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that a match plays the same with orders from the file, a file provider and a queue provider,
+    and that self-play of random bots is reproducible."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filename = os.path.join('tests_' + spellbook_code.lower(), 'test_spell_04_summongoblin_A_deftarget.json')
+    print('Testing', match_json_filename, '(order providers)')
+
+    outputs = []
+    for provider_type in ['', 'file', 'queue']:
+        match_data, match_spellbook, match_orders = create_match(match_id, spellbook_code)
+        if provider_type == 'file':
+            match_orders.set_provider(FileOrderProvider(match_json_filename))
+        elif provider_type == 'queue':
+            provider = QueueOrderProvider()
+            with open(match_json_filename, 'r') as f:
+                for data in json.load(f).values():
+                    provider.put(data)
+            match_orders.set_provider(provider)
+        else:
+            match_orders.set_filename(match_json_filename)
+        match_data.init_actors_tmp(match_players_init)
+        match_data.process_match_start()
+        while play_turn(match_data, match_spellbook, match_orders):
+            pass
+        match_data.match_init_output(spellbook_code, lang_code)
+        outputs.append(match_data.print_match_log(def_pov_id, stay_silent=True)
+                       + match_data.print_actor_statuses(def_pov_id, stay_silent=True))
+    assert (outputs[0] == outputs[1])
+    assert (outputs[0] == outputs[2])
+
+    task = {'spellbook': spellbook_code, 'bots': ['random', 'greedy'], 'teams': 0, 'seed': 1, 'max_turns': 10}
+    results = [play_selfplay_match(task) for run in range(2)]
+    assert (results[0]['turns'] > 1)
+    assert ({**results[0], 'duration': 0} == {**results[1], 'duration': 0})
+
+
+def test_turn_server(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
+    """Check that a match played through the turn server has the same log as a match played from the file,
+    also when processing of a turn fails and the turn is played again, and that invalid orders,
+    failed turns and closes during a turn do not leave matches hanging."""
+    spellbook_code = available_spellbooks[match_spellbook]['code']
+    match_json_filename = os.path.join('tests_' + spellbook_code.lower(), 'test_spell_04_summongoblin_A_deftarget.json')
+    print('Testing', match_json_filename, '(turn server)')
+    pov_id = 1
+
+    match_data = match_process_json(match_id, spellbook_code, match_players_init, match_json_filename)
+    match_data.match_init_output(spellbook_code, lang_code)
+    expected_log = match_data.print_match_log(pov_id, stay_silent=True)
+
+    with open(match_json_filename, 'r') as f:
+        file_orders = list(json.load(f).values())
+
+    def get_hit_points(match_data) -> list[tuple[int, int]]:
+        return [(actor.id, actor.hp) for actor in match_data.participant_list + match_data.monster_list]
+
+    def fail_once_after(resolve_function, failed: list[bool]):
+        def resolve_and_fail(*args):
+            resolve_function(*args)
+            if not failed:
+                failed.append(True)
+                raise RuntimeError('Spell handler failed')
+        return resolve_and_fail
+
+    async def play_match(fail_once: bool=False) -> list[str]:
+        server = MatchServer(workers=0, lang_code=lang_code)
+        listener = await server.serve()
+        client = MatchClient()
+        await client.connect(port=listener.sockets[0].getsockname()[1])
+        try:
+            state = await client.request({'type': 'create', 'spellbook': spellbook_code, 'players': match_players_init,
+                                          'matchID': match_id, 'povID': pov_id})
+            if fail_once:
+                # The first spell resolved fails after it takes effect, so the turn is left half-processed
+                hosted_spellbook = (await server.run_in_worker(0, get_hosted_matches))[match_id][1]
+                failed: list[bool] = []
+                hosted_spellbook.spell_handlers = {spell_id: (cast, fail_once_after(resolve, failed), definition)
+                                                   for spell_id, (cast, resolve, definition)
+                                                   in hosted_spellbook.spell_handlers.items()}
+            log: list[str] = state['log']
+            turns = 0
+            failures = 0
+            # Like match_process_json(), play until the match ends or the file has no orders for the turn
+            while not state['finished']:
+                turn_orders = [data for data in file_orders
+                               if data['turnNum'] == state['turnNum'] and data['participantID'] in state['activeIDs']]
+                if len(turn_orders) < len(state['activeIDs']):
+                    hosted_match_data = (await server.run_in_worker(0, get_hosted_matches))[match_id][0]
+                    assert (get_hit_points(hosted_match_data) == get_hit_points(match_data))
+                    await client.request({'type': 'close', 'matchID': match_id})
+                    break
+                for data in turn_orders:
+                    reply = await client.request({'type': 'order', 'order': data})
+                    assert (reply['type'] == 'accepted')
+                state = await client.next_turn(match_id)
+                if 'error' in state:
+                    # The same orders are given again
+                    failures += 1
+                    continue
+                log += state['log']
+                turns += 1
+            assert (failures == (1 if fail_once else 0))
+            stats = await client.request({'type': 'stats'})
+            assert (stats['matchesHosted'] == 0)
+            assert (stats['turns'] == turns)
+            return log
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+            server.shutdown()
+
+    assert (asyncio.run(play_match()) == expected_log)
+    assert (asyncio.run(play_match(fail_once=True)) == expected_log)
+
+    def make_order(state: dict, participant_id: int, gesture: str | None='-') -> dict:
+        return {'type': 'order', 'order': {'matchID': match_id, 'turnNum': state['turnNum'],
+                                           'participantID': participant_id, 'gestureLH': gesture, 'gestureRH': '-'}}
+
+    async def play_failures() -> None:
+        # Every server has its own hosted matches, so the same match ID is hosted again after a shutdown
+        for run in range(2):
+            server = MatchServer(workers=0, lang_code=lang_code)
+            listener = await server.serve()
+            client = MatchClient()
+            await client.connect(port=listener.sockets[0].getsockname()[1])
+            try:
+                state = await client.request({'type': 'create', 'spellbook': spellbook_code,
+                                              'players': match_players_init, 'matchID': match_id})
+                assert (state['type'] == 'created')
+                # Orders the worker cannot parse are rejected
+                reply = await client.request(make_order(state, 1, None))
+                assert (reply['type'] == 'error')
+
+                # A turn the worker fails to process is reported, then the orders can be given again
+                await server.run_in_worker(0, worker_close_match, match_id)
+                for participant_id in state['activeIDs']:
+                    assert ((await client.request(make_order(state, participant_id)))['type'] == 'accepted')
+                failed = await client.next_turn(match_id)
+                assert ('error' in failed and failed['resolvedTurnNum'] == 0)
+                assert (failed['missingIDs'] == sorted(state['activeIDs']))
+                assert ((await client.request(make_order(state, 1)))['type'] == 'accepted')
+
+                # A close that comes while the turn is processed waits for it
+                await client.request({'type': 'close', 'matchID': match_id})
+                state = await client.request({'type': 'create', 'spellbook': spellbook_code,
+                                              'players': match_players_init, 'matchID': match_id})
+                for participant_id in state['activeIDs']:
+                    await client.request(make_order(state, participant_id))
+                reply = await client.request({'type': 'close', 'matchID': match_id})
+                assert (reply['type'] == 'closed')
+                assert ((await client.next_turn(match_id))['resolvedTurnNum'] == state['turnNum'])
+                stats = await client.request({'type': 'stats'})
+                assert (stats['matchesHosted'] == 0 and stats['workers'][0]['matches'] == 0)
+                # The last match is left hosted for the next server
+                state = await client.request({'type': 'create', 'spellbook': spellbook_code,
+                                              'players': match_players_init, 'matchID': match_id})
+                assert (state['type'] == 'created')
+            finally:
+                await client.close()
+                listener.close()
+                await listener.wait_closed()
+                server.shutdown()
+
+    asyncio.run(play_failures())
+
+
 def run_common_tests(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run=1):
     """Run basic template reading test."""
     # General test, 10 turns of _/_
     test_template(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Orders read from files in streaming mode
+    test_streaming_orders(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Cache of visibility between participants
+    test_visibility_cache(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Turn tables of effects and states
+    test_turn_table(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Spell lookahead
+    test_spells_completable_next_turn(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Batch replay of order files
+    test_replay(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Snapshot and restore of the match state
+    test_snapshot_restore(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Forks of the match state
+    test_fork(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Enumeration of orders
+    test_order_space(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Order providers and self-play
+    test_order_providers(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)
+    # Turn server
+    test_turn_server(available_spellbooks, match_spellbook, match_id, match_players_init, lang_code, def_pov_id, silent_run)